@@ -0,0 +1,23 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, status
+
+from app.api.deps import require_roles
+from app.core import jobs
+from app.tasks.archive import ARCHIVE_COMPLETED_COURSES
+
+router = APIRouter()
+
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+def archive_completed_courses(
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of courses"),
+    _: dict = Depends(require_roles(["admin"])),
+):
+    """
+    Queue the archiving of courses that ended more than ARCHIVE_AFTER_DAYS
+    days ago. Their registrations, payments, schedules, exam results and
+    health check documents are moved to the archive tables.
+    """
+    job_id = jobs.enqueue(ARCHIVE_COMPLETED_COURSES, {"limit": limit})
+    return {"job_id": job_id}
@@ -2,8 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 import uuid
 from app.crud import course as crud_course
+from app.core.fields import Fields, project
+from app.core.serialization import json_response
 from app.schemas.course import Course, CourseCreate, CourseList, CourseUpdate
-from app.api.deps import get_db, require_roles
+from app.api.deps import conditional_get, get_db, get_read_db, require_roles, sparse_fields
+from typing import Any, Dict
+from logging import getLogger
+
+logger = getLogger(__name__)
 
 router = APIRouter()
 
@@ -27,19 +33,30 @@ def create_course(
 def list_course(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    fields: Fields = Depends(sparse_fields(Course)),
+    cache_headers: dict = Depends(conditional_get("courses", "license_types")),
 ):
     """
     Retrieve all courses.
+
+    ``fields`` limits each course to the listed attributes and the query to
+    their columns, e.g. ``?fields=id,course_name``.
     """
-    courses = crud_course.get_courses(db, skip=skip, limit=limit)
-    return courses
+    courses = crud_course.get_courses(db, skip=skip, limit=limit, fields=fields)
+    if fields is None:
+        return courses
+    return json_response(
+        Dict[str, Any],
+        {"items": project(Course, fields, courses["items"]), "total": courses["total"]},
+        headers=cache_headers,
+    )
 
 
 @router.get("/{course_id}", response_model=Course, summary="Get Course By ID")
 def get_course_by_id(
     course_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Get a specific course by ID.
@@ -66,9 +83,9 @@ def update_course(
 
     Only administrators can update courses.
     """
-    # Log the update request data
-    print(
-        f"Update request for course {course_id}: {course_in.model_dump(exclude_unset=True)}"
+    # Log the update request fields
+    logger.debug(
+        f"Update request for course {course_id}: {list(course_in.model_dump(exclude_unset=True))}"
     )
 
     try:
@@ -81,7 +98,7 @@ def update_course(
     except ValueError as e:
         # Provide more detailed error response
         error_msg = str(e)
-        print(f"Validation error for course {course_id}: {error_msg}")
+        logger.info(f"Validation error for course {course_id}: {error_msg}")
         raise HTTPException(
             status_code=422,
             detail={"message": error_msg, "error_type": "validation_error"},
@@ -89,7 +106,7 @@ def update_course(
     except Exception as e:
         # Log unexpected errors
         error_msg = str(e)
-        print(f"Unexpected error updating course {course_id}: {error_msg}")
+        logger.error(f"Unexpected error updating course {course_id}: {error_msg}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while updating the course",
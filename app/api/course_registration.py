@@ -1,4 +1,5 @@
 import uuid
+from datetime import date
 from fastapi import (
     APIRouter,
     Depends,
@@ -8,7 +9,10 @@ from fastapi import (
     Response,
 )
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, require_roles
+from app.api.deps import conditional_get, get_db, get_read_db, require_roles, sparse_fields
+from app.core import jobs
+from app.core.fields import Fields
+from app.core.serialization import json_response
 from app.crud import course_registration as crud_cousre_registration
 from app.schemas.course_registration import (
     CourseRegistration,
@@ -16,10 +20,28 @@ from app.schemas.course_registration import (
     CourseRegistrationResponse,
     CourseRegistrationUpdate,
 )
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 router = APIRouter()
 
+# Tables the registration list is built from, "thumbnails" is bumped when
+# new thumbnails are generated
+REGISTRATION_LIST_TABLES = (
+    "course_registrations",
+    "course_registrations_archive",
+    "students",
+    "users",
+    "personal_infor_documents",
+    "health_check_documents",
+    "health_check_documents_archive",
+    "health_check_schedules",
+    "schedules",
+    "schedules_archive",
+    "courses",
+    "license_types",
+    "thumbnails",
+)
+
 
 # Create a new course registration
 @router.post("/", response_model=Dict[str, Any])
@@ -32,6 +54,11 @@ def create_course_registration(
     result = crud_cousre_registration.create_course_registration(
         db=db, course_registration=course_registration
     )
+    # Thumbnails and other derived data are produced by the job worker
+    jobs.enqueue(
+        "registration.post_process",
+        {"registration_id": result["registration_id"]},
+    )
     response.status_code = result.get("status_code", 201)
     return result
 
@@ -79,19 +106,41 @@ def get_all_course_registrations(
     status: str = Query(
         "all", enum=["pending", "payment", "rejacted", "successful", "all"]
     ),
-    db: Session = Depends(get_db),
+    thumbnail: bool = Query(
+        False, description="Return thumbnail URLs instead of the original images"
+    ),
+    include_history: bool = Query(
+        False, description="Also return registrations of archived courses"
+    ),
+    created_from: Optional[date] = Query(
+        None, description="Only registrations created on or after this day"
+    ),
+    created_to: Optional[date] = Query(
+        None, description="Only registrations created on or before this day"
+    ),
+    newest_first: bool = Query(False, description="Order by registration date"),
+    db: Session = Depends(get_read_db),
+    fields: Fields = Depends(sparse_fields(CourseRegistrationResponse)),
+    cache_headers: dict = Depends(conditional_get(*REGISTRATION_LIST_TABLES)),
 ):
     db_course_registrations = crud_cousre_registration.get_all_course_registrations(
         db=db,
         type=type,
         status=status,
+        thumbnail=thumbnail,
+        fields=fields,
+        include_history=include_history,
+        created_from=created_from,
+        created_to=created_to,
+        newest_first=newest_first,
     )
     if not db_course_registrations:
         raise HTTPException(
             status_code=status_code.HTTP_404_NOT_FOUND,
             detail="No course registrations found",
         )
-    return db_course_registrations
+    response_type = list[CourseRegistrationResponse] if fields is None else list[Any]
+    return json_response(response_type, db_course_registrations, headers=cache_headers)
 
 
 # Update a course registration
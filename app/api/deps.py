@@ -1,7 +1,12 @@
-from app.core.database import SessionLocal
-from fastapi import Depends, HTTPException, status, Security
+from app.core import etag
+from app.core.fields import parse_fields
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, SessionLocal, replica_set
+from app.core.replicas import route_read_session
+from fastapi import Depends, HTTPException, Query, Request, Response, status, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from typing import Optional
 import uuid
 from app.core.security import verify_access_token
 
@@ -17,6 +22,18 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request):
+    """
+    Session for read-only endpoints, reading from a replica when one is
+    configured and healthy and the client has not just written something.
+    """
+    db = route_read_session(ReadSessionLocal(), replica_set, request.cookies)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def get_current_active_user(
     credentials: HTTPAuthorizationCredentials = Security(security),
 ):
@@ -33,7 +50,6 @@ def get_current_active_user(
 
 def require_roles(roles):
     def role_checker(current_user=Depends(get_current_active_user)):
-        print(f"Current user: {roles}")
         if current_user["role"] not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -42,3 +58,45 @@ def require_roles(roles):
         return current_user
 
     return role_checker
+
+
+def conditional_get(*tables: str):
+    """
+    Weak ETag for a list endpoint built from ``tables``. Answers 304 Not
+    Modified before the endpoint runs any query when the client's copy is
+    current, otherwise returns the caching headers of the response.
+    """
+
+    def check_etag(request: Request, response: Response) -> dict:
+        if not settings.ETAG_ENABLED:
+            return {}
+        current = etag.compute(f"{request.url.path}?{request.url.query}", tables)
+        headers = {"ETag": current, "Cache-Control": "no-cache"}
+        if etag.matches(request.headers.get("if-none-match", ""), current):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        response.headers.update(headers)
+        return headers
+
+    return check_etag
+
+
+def sparse_fields(schema):
+    """
+    ``fields`` query parameter selecting top-level fields of ``schema``.
+    Resolves to a tuple of field names, or None when all fields are wanted.
+    """
+
+    def parse(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated subset of: {', '.join(schema.model_fields)}",
+        ),
+    ):
+        try:
+            return parse_fields(fields, schema)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return parse
@@ -5,6 +5,8 @@ from app.schemas.health_check_document import (
     HealthCheckDocument,
     HealthCheckDocumentCreate,
     HealthCheckDocumentUpdate,
+    HealthCheckResultBatch,
+    HealthCheckResultSummary,
 )
 from app.crud import health_check_document as crud_health_check_document
 from app.api.deps import get_db, get_current_active_user, require_roles
@@ -84,7 +86,39 @@ async def update_health_check_document(
     # Update the health check document in the database
     health_check_document = crud_health_check_document.update_health_check_document(
         db=db,
-        document_id=document_id,
+        health_check_document_id=document_id,
         health_check_document=health_check_document,
     )
+    if health_check_document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Health check document not found",
+        )
     return health_check_document
+
+
+# record the results of a whole health check session
+@router.put(
+    "/schedule/{health_check_id}/results",
+    response_model=HealthCheckResultSummary,
+    status_code=status.HTTP_200_OK,
+    summary="Record the results of a health check session",
+)
+async def record_health_check_results(
+    health_check_id: uuid.UUID,
+    batch: HealthCheckResultBatch,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_roles(["admin", "staff"])),
+) -> HealthCheckResultSummary:
+    """
+    Update the status and document of the health check documents of many
+    students of one health check schedule in a single statement.
+
+    Students without a document for this health check are listed in
+    ``not_found``; the other results are still recorded.
+    """
+    return crud_health_check_document.record_health_check_results(
+        db=db,
+        health_check_id=health_check_id,
+        results=batch.results,
+    )
@@ -7,14 +7,44 @@ from app.schemas.health_check_schedule import (
     HealthCheckScheduleCreate,
     HealthCheckScheduleUpdate,
     HealthCheckScheduleList,
+    HealthCheckSlotAvailability,
+)
+from app.api.deps import get_db, get_current_active_user, get_read_db, require_roles
+from app.tasks.notification import (
+    HEALTH_CHECK_NOTIFY_FIELDS,
+    changed_fields,
+    notify_health_check_changed,
 )
-from app.api.deps import get_db, get_current_active_user, require_roles
 from typing import List, Dict, Any
+from logging import getLogger
 import uuid
 
+logger = getLogger(__name__)
+
 router = APIRouter()
 
 
+# Remaining places of the upcoming slots of a course, public for the
+# registration form. Declared before /{schedule_id} so it is matched first.
+@router.get(
+    "/availability",
+    response_model=List[HealthCheckSlotAvailability],
+    summary="Health Check Slot Availability",
+)
+def get_health_check_availability(
+    course_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Retrieve the remaining capacity of every upcoming health check slot of
+    a course, soonest first.
+
+    Args:
+        course_id: The ID of the course.
+    """
+    return crud_health_check_schedule.get_course_availability(db, course_id=course_id)
+
+
 # Check health check schedule by ID
 @router.get(
     "/{schedule_id}",
@@ -79,7 +109,8 @@ def create_health_check_schedule(
 def list_health_check_schedules(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    upcoming: bool = False,
+    db: Session = Depends(get_read_db),
 ):
     """
     Retrieve all health check schedules.
@@ -87,9 +118,10 @@ def list_health_check_schedules(
     Args:
         skip: Number of records to skip (for pagination)
         limit: Maximum number of records to return
+        upcoming: Only the scheduled slots still to come, soonest first
     """
     schedules = crud_health_check_schedule.get_health_check_schedules(
-        db, skip=skip, limit=limit
+        db, skip=skip, limit=limit, upcoming=upcoming
     )
     return schedules
 
@@ -120,11 +152,18 @@ def update_health_check_schedule(
         if course is None:
             raise HTTPException(status_code=404, detail="Course not found")
 
-    # Log the update request data
-    print(
-        f"Update request for schedule {schedule_id}: {schedule_in.model_dump(exclude_unset=True)}"
+    # Log the update request fields
+    logger.debug(
+        f"Update request for schedule {schedule_id}: {list(schedule_in.model_dump(exclude_unset=True))}"
     )
 
+    existing_schedule = crud_health_check_schedule.get_health_check_schedule(
+        db=db, health_check_schedule_id=schedule_id
+    )
+    if existing_schedule is None:
+        raise HTTPException(status_code=404, detail="Health check schedule not found")
+    before = {f: getattr(existing_schedule, f) for f in HEALTH_CHECK_NOTIFY_FIELDS}
+
     try:
         updated_schedule = crud_health_check_schedule.update_health_check_schedule(
             db=db, schedule_id=schedule_id, schedule_in=schedule_in
@@ -133,11 +172,17 @@ def update_health_check_schedule(
             raise HTTPException(
                 status_code=404, detail="Health check schedule not found"
             )
+
+        # Booked students are told about time and address changes
+        after = {f: getattr(updated_schedule, f) for f in HEALTH_CHECK_NOTIFY_FIELDS}
+        notify_health_check_changed(
+            schedule_id, changed_fields(before, after, HEALTH_CHECK_NOTIFY_FIELDS)
+        )
         return updated_schedule
     except ValueError as e:
         # Provide more detailed error response
         error_msg = str(e)
-        print(f"Validation error for schedule {schedule_id}: {error_msg}")
+        logger.info(f"Validation error for schedule {schedule_id}: {error_msg}")
         raise HTTPException(
             status_code=422,
             detail={"message": error_msg, "error_type": "validation_error"},
@@ -145,7 +190,7 @@ def update_health_check_schedule(
     except Exception as e:
         # Log unexpected errors
         error_msg = str(e)
-        print(f"Unexpected error updating schedule {schedule_id}: {error_msg}")
+        logger.error(f"Unexpected error updating schedule {schedule_id}: {error_msg}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while updating the health check schedule",
@@ -1,6 +1,6 @@
 from typing import List
 from fastapi import APIRouter, Depends
-from app.api.deps import get_db
+from app.api.deps import get_read_db
 from app.schemas.instructor import InstructorResponse
 from app.crud import instructor
 from sqlalchemy.orm import Session
@@ -13,6 +13,6 @@ router = APIRouter()
 async def list_instructors(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> List[InstructorResponse]:
     return instructor.list_instructors(db=db, skip=skip, limit=limit)
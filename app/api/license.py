@@ -1,20 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime
 import uuid
 
-from app.api.deps import get_db, get_current_active_user, require_roles
+from app.api.deps import get_db, get_current_active_user, get_read_db, require_roles
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, replica_set
+from app.core.license_registry import license_registry
+from app.core.replicas import route_read_session
+from app.core.serialization import type_adapter
 from app.crud import license as crud
 from app.schemas.license import (
+    ExpiringLicense,
     License,
     LicenseCreate,
+    LicenseIssuance,
     LicenseList,
     LicenseUpdate,
+    LicenseVerification,
 )
 
 router = APIRouter()
 
 
+def _check_manual_license_number(license_number: str) -> None:
+    # The counters would hand the same number out again
+    if crud.is_counter_license_number(license_number):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"License numbers of the form {settings.LICENSE_NUMBER_PREFIX}<year>NNNNNN "
+                "are allocated by the server, omit license_number to get one"
+            ),
+        )
+
+
 @router.post("/", response_model=License, status_code=status.HTTP_201_CREATED)
 def create_license(
     *,
@@ -26,18 +48,44 @@ def create_license(
     Create a new license.
     Only accessible by admin users.
     """
-    # Check if a license with the same number already exists
-    existing_license = crud.get_license_by_number(db, license_in.license_number)
-    if existing_license:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"License with number '{license_in.license_number}' already exists",
-        )
+    if license_in.license_number is not None:
+        _check_manual_license_number(license_in.license_number)
+        # Check if a license with the same number already exists
+        existing_license = crud.get_license_by_number(db, license_in.license_number)
+        if existing_license:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"License with number '{license_in.license_number}' already exists",
+            )
 
     # Create the new license
     return crud.create_license(db=db, license_obj=license_in)
 
 
+@router.post(
+    "/issue/course/{course_id}",
+    response_model=LicenseIssuance,
+    status_code=status.HTTP_201_CREATED,
+)
+def issue_course_licenses(
+    *,
+    db: Session = Depends(get_db),
+    course_id: uuid.UUID,
+    _: dict = Depends(require_roles("admin")),  # Only admin can issue
+):
+    """
+    Issue the licenses of every student of a course who passed the theory
+    and practice exams and has no license of the course's type yet.
+    Only accessible by admin users.
+    """
+    licenses = crud.issue_course_licenses(db, course_id=course_id)
+    if licenses is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Course not found"
+        )
+    return {"course_id": course_id, "issued": len(licenses), "licenses": licenses}
+
+
 @router.get("/")
 def list_licenses(
     *,
@@ -55,6 +103,59 @@ def list_licenses(
     return {"items": licenses, "total": total}
 
 
+@router.get("/expiring", response_model=List[ExpiringLicense])
+def list_expiring_licenses(
+    *,
+    request: Request,
+    within_days: int = Query(30, ge=1, le=366),
+    _: dict = Depends(require_roles(["admin", "staff"])),  # Admin or staff can access
+):
+    """
+    Stream the active licenses expiring in the next ``within_days`` days,
+    soonest first, as a JSON array.
+    Accessible by admin and staff users.
+    """
+    adapter = type_adapter(ExpiringLicense)
+
+    def stream():
+        # Own session: the ones of dependencies are closed before streaming
+        db = route_read_session(ReadSessionLocal(), replica_set, request.cookies)
+        try:
+            yield b"["
+            for n, row in enumerate(crud.iter_expiring_licenses(db, within_days)):
+                yield (b"," if n else b"") + adapter.dump_json(
+                    ExpiringLicense.model_validate(row)
+                )
+            yield b"]"
+        finally:
+            db.close()
+
+    return StreamingResponse(stream(), media_type="application/json")
+
+
+@router.get("/verify/{license_number}", response_model=LicenseVerification)
+def verify_license(
+    *,
+    db: Session = Depends(get_read_db),
+    license_number: str,
+):
+    """
+    Check a license number for the public verification page.
+    Answered from memory for unknown and recently verified numbers.
+    """
+    found = license_registry.lookup(db, license_number.strip())
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="License not found"
+        )
+    return LicenseVerification(
+        **found,
+        valid=found["status"] == crud.STATUS_ACTIVE
+        and found["expiration_date"] is not None
+        and found["expiration_date"] > datetime.utcnow(),
+    )
+
+
 @router.get("/{license_id}", response_model=License)
 def get_license(
     *,
@@ -147,6 +248,7 @@ def update_license(
         license_in.license_number
         and license_in.license_number != db_license.license_number
     ):
+        _check_manual_license_number(license_in.license_number)
         existing_license = crud.get_license_by_number(db, license_in.license_number)
         if existing_license:
             raise HTTPException(
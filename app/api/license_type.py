@@ -1,9 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List
 import uuid
 
-from app.api.deps import get_db, get_current_active_user, require_roles
+from app.api.deps import (
+    conditional_get,
+    get_current_active_user,
+    get_db,
+    get_read_db,
+    require_roles,
+    sparse_fields,
+)
+from app.core import cache
+from app.core.fields import Fields, project
+from app.core.serialization import json_response
 from app.crud import license_type as crud
 from app.schemas.license_type import (
     LicenseType,
@@ -41,24 +51,32 @@ def create_license_type(
 @router.get("/", response_model=LicenseTypeList)
 def list_license_types(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=100),
+    fields: Fields = Depends(sparse_fields(LicenseType)),
+    cache_headers: dict = Depends(conditional_get("license_types")),
 ):
     """
     Retrieve license types with pagination.
     Accessible by asll users without authentication.
     """
-    license_types = crud.get_license_types(db, skip=skip, limit=limit)
-    total = crud.count_license_types(db)
-
-    return {"items": license_types, "total": total}
+    license_types = cache.license_types.all(db)
+    page = license_types[skip : skip + limit]
+
+    if fields is None:
+        return {"items": page, "total": len(license_types)}
+    return json_response(
+        Dict[str, Any],
+        {"items": project(LicenseType, fields, page), "total": len(license_types)},
+        headers=cache_headers,
+    )
 
 
 @router.get("/{license_type_id}", response_model=LicenseType)
 def get_license_type(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     license_type_id: uuid.UUID,  # Any authenticated user can access
 ):
     """
@@ -1,12 +1,20 @@
-from typing import List
-from fastapi import APIRouter, Query
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Body, Query
 from fastapi import APIRouter, Depends, HTTPException, status
 import uuid
 from sqlalchemy.orm import Session
 from app.crud import payment as crud
-from app.crud.course_registration import get_course_registration_by_id
-from app.schemas.payment import PaymentCreate, PaymentUpdate, Payment, PaymentList
-from app.api.deps import get_db, require_roles
+from app.crud.course_registration import course_registration_exists
+from app.schemas.payment import (
+    PaymentCreate,
+    PaymentUpdate,
+    Payment,
+    PaymentLedger,
+    PaymentList,
+    ReconciliationSummary,
+)
+from app.api.deps import conditional_get, get_db, get_read_db, require_roles
 
 router = APIRouter()
 
@@ -19,6 +27,40 @@ def list_payments(
 ):
     return crud.get_payments(db=db, skip=skip, limit=limit)
 
+#Payments ledger: payments with their registration, student, course and method
+@router.get("/ledger", response_model=PaymentLedger)
+def get_payment_ledger(
+    date_from: Optional[date] = Query(None, description="Payments made on or after this day"),
+    date_to: Optional[date] = Query(None, description="Payments made on or before this day"),
+    course_id: Optional[uuid.UUID] = None,
+    payment_method_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(require_roles(["admin", "staff"])),
+    cache_headers: dict = Depends(
+        conditional_get(
+            "payments",
+            "payment_methods",
+            "course_registrations",
+            "personal_infor_documents",
+            "courses",
+        )
+    ),
+):
+    try:
+        return crud.get_payment_ledger(
+            db=db,
+            date_from=date_from,
+            date_to=date_to,
+            course_id=course_id,
+            payment_method_id=payment_method_id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 # # Get list payments by identity_number
 # @router.get("/{payment_id}", response_model=PaymentList)
 # def get_payment(
@@ -35,12 +77,31 @@ def create_payment(
     payment: PaymentCreate,
     db: Session = Depends(get_db),
 ):
-    exist_course_registration = get_course_registration_by_id(
+    if not course_registration_exists(
         db=db, course_registration_id=payment.course_registration_id
-    )
-    if not exist_course_registration:
+    ):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course registration not found",
         )
     return crud.create_payment(db=db, payment=payment)
+
+
+#confirm the payments of a bank statement
+@router.post("/reconciliation", response_model=ReconciliationSummary)
+def reconcile_payments(
+    statement: bytes = Body(..., media_type="text/csv"),
+    payment_method_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_roles(["admin", "staff"])),
+):
+    """
+    Import a bank statement (CSV request body with reference, amount and
+    description columns) and confirm the registrations it pays for.
+    """
+    try:
+        return crud.reconcile_bank_statement(
+            db=db, content=statement, payment_method_id=payment_method_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 import uuid
 
-from app.api.deps import get_db, get_current_active_user, require_roles
+from app.api.deps import get_db, get_current_active_user, get_read_db, require_roles
 from app.schemas.payment_method import PaymentMethodCreate, PaymentMethodUpdate, PaymentMethodList
 from app.crud import payment_method as crud
 
@@ -17,7 +17,7 @@ router = APIRouter()
 def list_payment_methods(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     payment_methods = crud.get_payment_methods(db, skip=skip, limit=limit)
     return payment_methods
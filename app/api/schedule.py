@@ -1,9 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, require_roles
+from app.api.deps import conditional_get, get_db, get_read_db, require_roles, sparse_fields
+from typing import Any, Dict
 import uuid
+from app.core.fields import Fields
+from app.core.serialization import json_response
 from app.crud import schedule as crud_schedule
-from app.schemas.schedule import Schedule, ScheduleCreate, ScheduleList, ScheduleUpdate
+from app.schemas.schedule import (
+    Schedule,
+    ScheduleCreate,
+    ScheduleList,
+    ScheduleResponse,
+    ScheduleUpdate,
+)
+from app.tasks.notification import (
+    SCHEDULE_NOTIFY_FIELDS,
+    changed_fields,
+    notify_schedule_changed,
+)
 
 router = APIRouter()
 
@@ -13,15 +27,27 @@ router = APIRouter()
 def get_schedule(
     start_time: str = "2023-10-01",
     end_time: str = "2023-10-07",
-    db: Session = Depends(get_db),
+    include_history: bool = Query(
+        False, description="Also return schedules of archived courses"
+    ),
+    db: Session = Depends(get_read_db),
+    fields: Fields = Depends(sparse_fields(ScheduleResponse)),
+    cache_headers: dict = Depends(
+        conditional_get("schedules", "schedules_archive", "courses", "license_types")
+    ),
 ):
     """
     Get a list of practice and theory classes during a week of the date passed.
     """
     db_schedule = crud_schedule.get_schedule(
-        db=db, start_time=start_time, end_time=end_time
+        db=db,
+        start_time=start_time,
+        end_time=end_time,
+        fields=fields,
+        include_history=include_history,
     )
-    return db_schedule
+    response_type = ScheduleList if fields is None else Dict[str, Any]
+    return json_response(response_type, db_schedule, headers=cache_headers)
 
 
 # create schedule
@@ -35,9 +61,7 @@ def create_schedule(
     Create a new schedule.
     """
     db_schedule = crud_schedule.create_schedule(db=db, schedule_in=schedule)
-    result = Schedule.model_validate(db_schedule)
-    print(result)
-    return result
+    return Schedule.model_validate(db_schedule)
 
 
 # update schedule
@@ -59,10 +83,19 @@ def update_schedule(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found"
         )
+    before = {f: getattr(existing_schedule, f) for f in SCHEDULE_NOTIFY_FIELDS}
         
     updated_schedule = crud_schedule.update_schedule(
         db=db, schedule_id=schedule_id, schedule_in=schedule
     )
+
+    # Students of the course are told about time and location changes
+    after = {f: getattr(existing_schedule, f) for f in SCHEDULE_NOTIFY_FIELDS}
+    notify_schedule_changed(
+        schedule_id,
+        existing_schedule.course_id,
+        changed_fields(before, after, SCHEDULE_NOTIFY_FIELDS),
+    )
     return Schedule.model_validate(updated_schedule, from_attributes=True)
 
 
@@ -4,7 +4,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.crud import student as crud_student
 from app.schemas.student import Student, StudentCreate, StudentUpdate
-from app.api.deps import get_db, get_current_active_user, require_roles
+from app.api.deps import (
+    get_current_active_user,
+    get_db,
+    get_read_db,
+    require_roles,
+    sparse_fields,
+)
+from app.core.fields import Fields
 from logging import getLogger
 
 logger = getLogger(__name__)
@@ -35,10 +42,11 @@ def read_student(
 
 @router.get("/")
 def list_student(
-    db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_active_user),
+    fields: Fields = Depends(sparse_fields(Student)),
 ):
-    students = crud_student.get_students(db=db, skip=0, limit=100)
-    print(students)
+    students = crud_student.get_students(db=db, skip=0, limit=100, fields=fields)
     if not len(students):
         raise HTTPException(status_code=404, detail="No students found")
     return students
@@ -46,7 +54,7 @@ def list_student(
 
 @router.get('/registered/')
 def list_registered_students(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     course_id: Optional[UUID] = None,
 ):
     students = crud_student.get_registered_students(db, course_id=course_id)
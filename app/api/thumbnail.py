@@ -0,0 +1,25 @@
+import time
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.core.thumbnails import signed_thumbnail_path
+
+router = APIRouter()
+
+
+# Thumbnails of identity documents and avatars, only reachable through the
+# signed URLs returned by the registration endpoints
+@router.get("/{shard}/{filename}", include_in_schema=False)
+def get_thumbnail(
+    shard: str,
+    filename: str,
+    expires: int = Query(...),
+    signature: str = Query(...),
+):
+    path = signed_thumbnail_path(filename, expires, signature)
+    if path is None or filename[:2] != shard:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    # Browsers may keep it until the URL expires, shared caches never
+    max_age = max(0, expires - int(time.time()))
+    return FileResponse(path, headers={"Cache-Control": f"private, max-age={max_age}"})
@@ -0,0 +1,139 @@
+"""
+In-process caches for small reference tables (license types, payment
+methods, active courses).
+
+Each cache loads its whole table at once and keeps plain dict snapshots of
+the column values, so cached rows are never bound to a session. CRUD writes
+call ``invalidate()``; REFERENCE_CACHE_TTL bounds staleness for writes made
+by other worker processes.
+
+``LRUCache`` is a bounded key/value cache with a TTL for everything else
+(license verifications, idempotent responses).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from logging import getLogger
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.course import Course
+from app.models.license_type import LicenseType
+from app.models.payment_method import PaymentMethod
+
+logger = getLogger(__name__)
+
+# Returned by LRUCache.get on a miss, so None can be cached
+MISSING = object()
+
+
+class LRUCache:
+    """Least recently used entries are evicted beyond ``maxsize``, any entry after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """The cached value, or MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ReferenceCache:
+    def __init__(self, name: str, model, *criteria, order_by=None):
+        self.name = name
+        self.model = model
+        self.criteria = criteria
+        self.order_by = order_by
+        self._rows: Optional[List[Dict[str, Any]]] = None
+        self._by_id: Dict[Any, Dict[str, Any]] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _expired(self) -> bool:
+        return (
+            self._rows is None
+            or time.monotonic() - self._loaded_at > settings.REFERENCE_CACHE_TTL
+        )
+
+    def load(self, db: Session) -> List[Dict[str, Any]]:
+        """Reload the table from the database."""
+        query = db.query(self.model).filter(*self.criteria)
+        if self.order_by is not None:
+            query = query.order_by(self.order_by)
+        columns = [attr.key for attr in inspect(self.model).column_attrs]
+        rows = [{key: getattr(obj, key) for key in columns} for obj in query.all()]
+        with self._lock:
+            self._rows = rows
+            self._by_id = {row["id"]: row for row in rows}
+            self._loaded_at = time.monotonic()
+        logger.debug(f"Loaded {len(rows)} rows into the {self.name} cache")
+        return rows
+
+    def all(self, db: Session) -> List[Dict[str, Any]]:
+        rows = self._rows
+        if rows is None or self._expired():
+            rows = self.load(db)
+        return rows
+
+    def get(self, db: Session, id: Any) -> Optional[Dict[str, Any]]:
+        if self._expired():
+            self.load(db)
+        return self._by_id.get(id)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._rows = None
+            self._by_id = {}
+
+
+license_types = ReferenceCache("license_types", LicenseType, order_by=LicenseType.type_name)
+payment_methods = ReferenceCache("payment_methods", PaymentMethod, order_by=PaymentMethod.id)
+active_courses = ReferenceCache(
+    "active_courses", Course, Course.status == "active", order_by=Course.start_date
+)
+
+CACHES = (license_types, payment_methods, active_courses)
+
+
+def preload(db: Session) -> None:
+    for cache in CACHES:
+        cache.load(db)
+
+
+def invalidate_all() -> None:
+    for cache in CACHES:
+        cache.invalidate()
@@ -0,0 +1,140 @@
+"""
+Response compression.
+
+Text responses larger than COMPRESSION_MINIMUM_SIZE are compressed with
+brotli when the client accepts it and the ``brotli`` package is installed,
+otherwise with gzip. Streaming responses are compressed chunk by chunk.
+"""
+
+import gzip
+import zlib
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"application/javascript",
+    b"application/xml",
+    b"text/",
+    b"image/svg+xml",
+)
+
+
+def _accepted_encoding(headers: List[Tuple[bytes, bytes]]) -> Optional[str]:
+    for name, value in headers:
+        if name == b"accept-encoding":
+            accepted = {
+                item.split(";")[0].strip() for item in value.decode("latin-1").split(",")
+            }
+            if brotli is not None and "br" in accepted:
+                return "br"
+            if "gzip" in accepted:
+                return "gzip"
+            return None
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(
+                settings.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+    def compress_all(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return brotli.compress(data, quality=settings.BROTLI_QUALITY)
+        return gzip.compress(data, compresslevel=settings.GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = (
+            settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _accepted_encoding(scope.get("headers", []))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk tells us the size
+                start_message = message
+                headers = dict(message.get("headers", []))
+                content_type = headers.get(b"content-type", b"")
+                passthrough = (
+                    b"content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                start, start_message = start_message, None
+                if passthrough or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers = []
+                vary = [b"Accept-Encoding"]
+                for name, value in start.get("headers", []):
+                    if name == b"vary":
+                        vary.insert(0, value)
+                    elif name != b"content-length":
+                        headers.append((name, value))
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", b", ".join(vary)))
+                if not more_body:
+                    body = compressor.compress_all(body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start, "headers": headers})
+
+            if passthrough:
+                await send(message)
+                return
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -3,9 +3,140 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = ""
+    # Create missing tables at startup. Disable in production, where the
+    # schema is managed by Alembic migrations.
+    DB_CREATE_TABLES: bool = True
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    # Read replicas for read-only endpoints, comma-separated URLs
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0
+    # Seconds a client's reads stay on the primary after it wrote something
+    READ_YOUR_WRITES_WINDOW: int = 5
+
+    # Courses ended this many days ago are moved to the archive tables
+    ARCHIVE_AFTER_DAYS: int = 180
+    ARCHIVE_BATCH_SIZE: int = 20
+
+    # Students a health check slot takes when created without a capacity
+    HEALTH_CHECK_DEFAULT_CAPACITY: int = 50
+    # A health check is in progress from its scheduled time for this long
+    HEALTH_CHECK_DURATION_MINUTES: int = 240
+    # Seconds between runs of the job moving health checks through their statuses
+    HEALTH_CHECK_STATUS_INTERVAL: float = 60.0
+
+    # Periodic jobs (see app.core.scheduler), run by one process per deployment:
+    # enable it on that process only
+    SCHEDULER_ENABLED: bool = False
+
+    # Licenses issued to the students of a course who passed both exams,
+    # exam scores are on a 0-10 scale
+    LICENSE_THEORY_PASS_SCORE: float = 8.0
+    LICENSE_PRACTICE_PASS_SCORE: float = 8.0
+    LICENSE_VALIDITY_YEARS: int = 10
+    # License numbers are the prefix, the year and a counter, e.g. DL2026000001
+    LICENSE_NUMBER_PREFIX: str = "DL"
+    # Seconds between runs of the job marking licenses past their date expired
+    LICENSE_EXPIRY_INTERVAL: float = 3600.0
+    # Public license verification (see app.core.license_registry): the bloom
+    # filter of license numbers is rebuilt every LICENSE_REGISTRY_TTL seconds,
+    # looked up licenses are cached for LICENSE_VERIFY_CACHE_TTL seconds
+    LICENSE_REGISTRY_TTL: int = 900
+    LICENSE_BLOOM_ERROR_RATE: float = 0.001
+    LICENSE_VERIFY_CACHE_SIZE: int = 10000
+    LICENSE_VERIFY_CACHE_TTL: int = 60
+
+    # Idempotency-Key replays (see app.core.idempotency): responses are kept
+    # IDEMPOTENCY_KEY_TTL seconds, a key whose request never finished can be
+    # reused after IDEMPOTENCY_LOCK_TIMEOUT seconds
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_KEY_TTL: int = 86400
+    IDEMPOTENCY_LOCK_TIMEOUT: int = 60
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_PURGE_INTERVAL: float = 3600.0
+
+    # Rate limits of the expensive public endpoints (see app.core.rate_limit),
+    # per client IP and per route. RATE_LIMIT_BACKEND is "memory" (per
+    # process) or "database" (shared by every process)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 10
+    RATE_LIMIT_REGISTRATION_PER_MINUTE: int = 5
+    RATE_LIMIT_CLIENT_BURST: int = 5
+    RATE_LIMIT_ROUTE_PER_SECOND: float = 20.0
+    RATE_LIMIT_ROUTE_BURST: int = 40
+    # Take the client IP from the last X-Forwarded-For entry, behind a proxy
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Expensive requests wait while more than ADMISSION_POOL_THRESHOLD of the
+    # connection pool is in use or ADMISSION_MAX_CONCURRENT of them are
+    # running (0: half the pool), at most ADMISSION_QUEUE_TIMEOUT seconds
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_POOL_THRESHOLD: float = 0.8
+    ADMISSION_MAX_CONCURRENT: int = 0
+    ADMISSION_QUEUE_SIZE: int = 20
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0
+
+    # Startup warm-up and shutdown
+    STARTUP_WARMUP: bool = True
+    REFERENCE_CACHE_TTL: int = 300
+    SHUTDOWN_TIMEOUT: float = 10.0
     SECRET_KEY: str = ""
     ALGORITHM: str = "HS256"
 
+    # Derived images (thumbnails) for registration uploads
+    THUMBNAIL_DIR: str = "media/thumbnails"
+    THUMBNAIL_URL_PREFIX: str = "/media/thumbnails"
+    # Index of source reference -> content hash, outside the thumbnail tree
+    THUMBNAIL_REF_DIR: str = "media/thumbnail_refs"
+    # Thumbnail URLs are signed with SECRET_KEY and valid for at least
+    # THUMBNAIL_URL_TTL seconds (at most twice that)
+    THUMBNAIL_URL_TTL: int = 3600
+    THUMBNAIL_SIZE: int = 160
+    THUMBNAIL_FETCH_TIMEOUT: int = 10
+    # Image references are data URIs, files under MEDIA_DIR, or URLs on one
+    # of THUMBNAIL_ALLOWED_HOSTS (comma-separated, none by default)
+    MEDIA_DIR: str = "media"
+    THUMBNAIL_ALLOWED_HOSTS: str = ""
+    THUMBNAIL_MAX_SOURCE_BYTES: int = 10 * 1024 * 1024
+    THUMBNAIL_REF_CACHE_SIZE: int = 10000
+
+    # Background jobs: "database" (jobs table) or "memory" (in-process)
+    JOB_BACKEND: str = "memory"
+    JOB_WORKER_IN_PROCESS: bool = True
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_VISIBILITY_TIMEOUT: int = 300
+    JOB_RETRY_BACKOFF: int = 30
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_BATCH_SIZE: int = 10
+
+    # Notifications sent to students, rates are messages per second
+    NOTIFICATION_CHANNELS: str = "email,sms"
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_EMAIL_RATE: float = 50.0
+    NOTIFICATION_SMS_RATE: float = 10.0
+
+    # Request profiling, exposed on /metrics
+    METRICS_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 20
+    DEBUG_QUERIES_ENABLED: bool = False
+
+    # HTTP caching and compression of list responses
+    ETAG_ENABLED: bool = True
+    ETAG_TTL: int = 60  # seconds, bounds staleness of writes from other processes
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    # Logging: LOG_LEVELS sets per-logger levels, e.g. "app.crud=DEBUG,sqlalchemy.engine=WARNING"
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    LOG_FORMAT: str = "json"  # json or text
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1
+
     class Config:
         env_file = ".env"
 
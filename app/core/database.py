@@ -1,16 +1,52 @@
-from sqlalchemy import create_engine
+from logging import getLogger
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.etag import track_table_versions
+from app.core.metrics import instrument_engine
+from app.core.replicas import ReplicaSet, RoutingSession
+
+logger = getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-print(f"SQLALCHEMY_DATABASE_URL: {SQLALCHEMY_DATABASE_URL}")
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+if SQLALCHEMY_DATABASE_URL:
+    logger.debug(
+        f"Database URL: {make_url(SQLALCHEMY_DATABASE_URL).render_as_string(hide_password=True)}"
     )
-else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+
+def _create_engine(url: str):
+    if url.startswith("sqlite"):
+        db_engine = create_engine(url, connect_args={"check_same_thread": False})
+    else:
+        db_engine = create_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    if settings.METRICS_ENABLED:
+        instrument_engine(db_engine)
+    return db_engine
+
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+track_table_versions(SessionLocal)
+
+# Sessions of read-only endpoints, see app.core.replicas
+replica_set = ReplicaSet(
+    [
+        _create_engine(url.strip())
+        for url in settings.DATABASE_REPLICA_URLS.split(",")
+        if url.strip()
+    ],
+    check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL,
+)
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
+track_table_versions(ReadSessionLocal)
 
 Base = declarative_base()
@@ -0,0 +1,95 @@
+"""
+Weak ETags for list endpoints, derived from in-process table versions.
+
+Every committed ORM write bumps a counter for each table it touched. An
+ETag combines the URL, the versions of the tables a response is built from,
+a random per-process epoch and a time bucket of ETAG_TTL seconds. Writes
+made by other worker processes or by raw SQL are not counted, so the time
+bucket bounds how long such changes can be answered with 304.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from typing import Dict, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_mapper
+
+from app.core.config import settings
+
+_epoch = uuid.uuid4().hex
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+
+_PENDING_KEY = "etag_pending_tables"
+
+
+def bump(*tables: str) -> None:
+    with _lock:
+        for table in tables:
+            _versions[table] = _versions.get(table, 0) + 1
+
+
+def version(table: str) -> int:
+    return _versions.get(table, 0)
+
+
+def compute(url: str, tables: Iterable[str]) -> str:
+    bucket = int(time.time() // settings.ETAG_TTL) if settings.ETAG_TTL else 0
+    key = "|".join(
+        [_epoch, url, str(bucket)] + [f"{t}={version(t)}" for t in sorted(tables)]
+    )
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _pending(session) -> set:
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+def _after_flush(session, flush_context) -> None:
+    pending = _pending(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        pending.update(table.name for table in object_mapper(obj).tables)
+
+
+def _do_orm_execute(orm_execute_state) -> None:
+    # Query.update()/delete() bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _pending(orm_execute_state.session).add(table.name)
+
+
+def _after_commit(session) -> None:
+    tables = session.info.pop(_PENDING_KEY, None)
+    if tables:
+        bump(*tables)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def track_table_versions(session_factory) -> None:
+    """Count committed writes made through sessions of ``session_factory``."""
+    if event.contains(session_factory, "after_flush", _after_flush):
+        return
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "do_orm_execute", _do_orm_execute)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
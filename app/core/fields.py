@@ -0,0 +1,85 @@
+"""
+Sparse fieldsets for list endpoints.
+
+``?fields=id,course_name`` selects top-level fields of the listed items.
+The same selection drives the SQL projection (``load_only`` of the mapped
+columns, eager loading of requested relationships only) and a trimmed
+response model, so unused columns are neither read, hydrated nor sent.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only
+
+Fields = Optional[Tuple[str, ...]]
+
+
+def parse_fields(value: Optional[str], schema: Type[BaseModel]) -> Fields:
+    """
+    Parse a comma-separated ``fields`` parameter against a response schema.
+
+    Returns:
+        The requested field names in order, or None when all fields are wanted
+
+    Raises:
+        ValueError: If a field is not part of the schema
+    """
+    if not value:
+        return None
+    requested = tuple(dict.fromkeys(f.strip() for f in value.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in schema.model_fields]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. "
+            f"Available: {', '.join(schema.model_fields)}"
+        )
+    return requested or None
+
+
+def wants(fields: Fields, name: str) -> bool:
+    return fields is None or name in fields
+
+
+@lru_cache(maxsize=256)
+def trimmed_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Copy of ``schema`` keeping only ``fields``, with the same types and aliases."""
+    definitions = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True, populate_by_name=True),
+        **definitions,
+    )
+
+
+def project(schema: Type[BaseModel], fields: Tuple[str, ...], rows: Iterable[Any]) -> List[BaseModel]:
+    """Validate ORM objects or dicts into the trimmed model of ``schema``."""
+    model = trimmed_model(schema, fields)
+    return [model.model_validate(row, from_attributes=True) for row in rows]
+
+
+def loader_options(model, fields: Fields, always: Iterable[str] = ()) -> list:
+    """
+    Loader options reading only the requested columns of ``model`` (plus its
+    primary key and ``always``) and eagerly loading requested relationships.
+    No options are returned when all fields are wanted.
+    """
+    if fields is None:
+        return []
+    mapper = inspect(model)
+    names = set(fields) | set(always)
+    columns = [attr.class_attribute for attr in mapper.column_attrs if attr.key in names]
+    columns += [
+        getattr(model, column.key) for column in mapper.primary_key
+        if column.key not in names
+    ]
+    options = [load_only(*columns)]
+    for relationship in mapper.relationships:
+        if relationship.key in names:
+            options.append(joinedload(relationship.class_attribute))
+    return options
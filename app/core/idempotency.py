@@ -0,0 +1,317 @@
+"""
+Idempotency keys for the POSTs clients retry on flaky networks.
+
+A client sends a unique ``Idempotency-Key`` header (a UUID) with a POST to
+one of IDEMPOTENT_ROUTES. The first request claims the key in the
+idempotency_keys table, runs, and its response is stored there and in an
+in-process LRU cache for IDEMPOTENCY_KEY_TTL seconds. A retry with the same
+key gets the stored response back, with an ``Idempotent-Replayed: true``
+header, without running the endpoint again: from the cache when it was
+answered by this process, else with one primary key lookup.
+
+- a retry while the first request is still running gets a 409, the client
+  should retry it later;
+- a retry with the same key but another body gets a 422;
+- only 2xx responses and the 4xx a retry would get again are stored; for
+  5xx and the transient 4xx of RETRYABLE_STATUSES (a conflict, a rate limit)
+  the key is released so the request can be retried;
+- requests without the header are not affected.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import MISSING, LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+logger = getLogger(__name__)
+
+IDEMPOTENT_ROUTES = {
+    ("POST", "/api/course_registration/"),
+    ("POST", "/api/payments/"),
+}
+
+# Client errors a retry of the same request may not get
+RETRYABLE_STATUSES = {401, 403, 408, 409, 423, 425, 429}
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+REPLAYS = metrics.counter(
+    "idempotent_replays_total",
+    "Responses replayed for a reused Idempotency-Key by where they were found",
+    ("answered_by",),
+)
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: Optional[int]
+    content_type: Optional[str]
+    body: bytes
+
+    @property
+    def in_progress(self) -> bool:
+        return self.status_code is None
+
+
+# Finished responses only, in-progress claims always go to the table
+responses = LRUCache(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_KEY_TTL)
+
+
+def is_replayable(status_code: int) -> bool:
+    """Whether a response is the one any retry of the request would get."""
+    if 200 <= status_code < 300:
+        return True
+    return 400 <= status_code < 500 and status_code not in RETRYABLE_STATUSES
+
+
+def request_hash(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def get_stored_response(db: Session, key: str) -> Optional[StoredResponse]:
+    row = (
+        db.query(
+            IdempotencyKey.request_hash,
+            IdempotencyKey.status_code,
+            IdempotencyKey.content_type,
+            IdempotencyKey.body,
+        )
+        .filter(IdempotencyKey.key == key, IdempotencyKey.expires_at > datetime.utcnow())
+        .first()
+    )
+    if row is None:
+        return None
+    return StoredResponse(
+        row.request_hash, row.status_code, row.content_type, row.body or b""
+    )
+
+
+def claim_key(db: Session, key: str, hash_: str) -> bool:
+    """
+    Insert the in-progress row of a key.
+
+    Expired keys, and claims older than IDEMPOTENCY_LOCK_TIMEOUT seconds
+    left by a crashed request, are taken over.
+
+    Returns:
+        False if the key is held by another request
+    """
+    now = datetime.utcnow()
+    db.execute(
+        delete(IdempotencyKey)
+        .where(
+            IdempotencyKey.key == key,
+            (IdempotencyKey.expires_at <= now)
+            | (
+                IdempotencyKey.status_code.is_(None)
+                & (
+                    IdempotencyKey.created_at
+                    <= now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+                )
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.add(
+        IdempotencyKey(
+            key=key,
+            request_hash=hash_,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def store_response(db: Session, key: str, response: StoredResponse) -> None:
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(
+            status_code=response.status_code,
+            content_type=response.content_type,
+            body=response.body,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def release_key(db: Session, key: str) -> None:
+    db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def purge_expired_keys(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Delete the expired idempotency keys.
+
+    Args:
+        db: Database session
+        now: Current time, defaults to datetime.utcnow()
+
+    Returns:
+        Number of keys deleted
+    """
+    purged = db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.expires_at <= (now or datetime.utcnow()))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return purged
+
+
+def _with_session(func, *args):
+    with SessionLocal() as db:
+        return func(db, *args)
+
+
+async def _send_response(
+    send,
+    status_code: int,
+    content_type: Optional[str],
+    body: bytes,
+    replayed: bool = False,
+) -> None:
+    headers = [(b"content-length", str(len(body)).encode())]
+    if content_type:
+        headers.append((b"content-type", content_type.encode("latin-1")))
+    if replayed:
+        headers.append((b"idempotent-replayed", b"true"))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_error(send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await _send_response(send, status_code, "application/json", body)
+
+
+class IdempotencyMiddleware:
+    """Replay the stored response of a POST retried with the same Idempotency-Key."""
+
+    def __init__(self, app, routes=IDEMPOTENT_ROUTES):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        header = dict(scope["headers"]).get(HEADER)
+        if header is None:
+            await self.app(scope, receive, send)
+            return
+        if not header.strip() or len(header) > MAX_KEY_LENGTH:
+            await _send_error(
+                send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+            )
+            return
+
+        # The body is part of the request identity, read it before the endpoint
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        hash_ = request_hash(scope["method"], scope["path"], body)
+        key = f"{scope['path']} {header.strip().decode('latin-1')}"
+
+        stored = responses.get(key)
+        answered_by = "cache"
+        if stored is MISSING:
+            stored = await run_in_threadpool(_with_session, get_stored_response, key)
+            answered_by = "database"
+        if stored is None:
+            if not await run_in_threadpool(_with_session, claim_key, key, hash_):
+                # Claimed between the lookup and the insert
+                stored = await run_in_threadpool(_with_session, get_stored_response, key)
+        if stored is not None:
+            if stored.request_hash != hash_:
+                await _send_error(
+                    send, 422, "Idempotency-Key was already used with another request"
+                )
+            elif stored.in_progress:
+                await _send_error(
+                    send, 409, "A request with this Idempotency-Key is being processed"
+                )
+            else:
+                REPLAYS.inc(answered_by)
+                responses.set(key, stored)
+                await _send_response(
+                    send, stored.status_code, stored.content_type, stored.body, replayed=True
+                )
+            return
+
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        start = {}
+        response_chunks = []
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_wrapper)
+        except Exception:
+            await run_in_threadpool(_with_session, release_key, key)
+            raise
+
+        status_code = start.get("status", 500)
+        if not is_replayable(status_code):
+            await run_in_threadpool(_with_session, release_key, key)
+            return
+        content_type = dict(start.get("headers", [])).get(b"content-type")
+        response = StoredResponse(
+            hash_,
+            status_code,
+            content_type.decode("latin-1") if content_type else None,
+            b"".join(response_chunks),
+        )
+        try:
+            await run_in_threadpool(_with_session, store_response, key, response)
+        except Exception as e:
+            # The response went out, a retry will get a 409 until the claim times out
+            logger.error(f"Could not store the response of idempotency key {key}: {e}")
+            return
+        responses.set(key, response)
@@ -0,0 +1,268 @@
+"""
+Index audit: compares the indexes declared in ``Base.metadata`` with the
+columns the application actually filters, joins and sorts on.
+
+QueryPatternRecorder listens to an engine and records, for every executed
+SELECT/UPDATE/DELETE, which columns of each table are used with equality
+(=, IN, IS, join conditions) or range (<, >, BETWEEN) predicates and in
+ORDER BY. propose_indexes() turns these patterns, plus the foreign keys,
+into index proposals: equality columns first, then one range column, as a
+B-tree can only use the columns after a range predicate for filtering.
+Raw text() statements cannot be analysed and are only counted.
+"""
+
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.dml import Delete, Update
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, ColumnClause, TextClause
+from sqlalchemy.sql.schema import MetaData, Table
+from sqlalchemy.sql.selectable import CompoundSelect, Select
+
+EQUALITY_OPERATORS = {operators.eq, operators.in_op, operators.is_}
+RANGE_OPERATORS = {operators.lt, operators.le, operators.gt, operators.ge, operators.between_op}
+
+
+@dataclass(frozen=True)
+class QueryPattern:
+    table: str
+    equality: Tuple[str, ...]
+    range: Tuple[str, ...] = ()
+
+    def candidate(self) -> Tuple[str, ...]:
+        return self.equality + self.range[:1]
+
+
+@dataclass
+class IndexProposal:
+    table: str
+    columns: Tuple[str, ...]
+    reason: str
+    hits: int = 0
+    replaces: Optional[Tuple[str, ...]] = None
+
+    @property
+    def name(self) -> str:
+        return f"ix_{self.table}_{'_'.join(self.columns)}"
+
+
+def _source_table(column) -> Optional[Table]:
+    table = getattr(column, "table", None)
+    # Aliases created by joinedload or aliased() point at the real table
+    while table is not None and not isinstance(table, Table):
+        table = getattr(table, "element", None)
+    return table
+
+
+def _column_side(expression: BinaryExpression):
+    """The (column, other side) of a predicate, or None if no side is a column."""
+    for column, other in (
+        (expression.left, expression.right),
+        (expression.right, expression.left),
+    ):
+        if isinstance(column, ColumnClause) and _source_table(column) is not None:
+            return column, other
+    return None
+
+
+def _column_name(column) -> Optional[Tuple[str, str]]:
+    table = _source_table(column)
+    if table is None or column.key not in table.c:
+        return None
+    return table.name, table.c[column.key].name
+
+
+def extract_patterns(statement) -> List[QueryPattern]:
+    """
+    Query patterns of a Core/ORM statement: one per filtered table with its
+    equality and range columns, and one per column of a join condition.
+    """
+    equality: Dict[str, Set[str]] = {}
+    ranges: Dict[str, Set[str]] = {}
+    joins: Set[Tuple[str, str]] = set()
+
+    def add(target: Dict[str, Set[str]], column) -> None:
+        name = _column_name(column)
+        if name is not None:
+            target.setdefault(name[0], set()).add(name[1])
+
+    for element in visitors.iterate(statement):
+        if not isinstance(element, BinaryExpression):
+            continue
+        sides = _column_side(element)
+        if sides is None:
+            continue
+        column, other = sides
+        if element.operator in EQUALITY_OPERATORS:
+            if isinstance(other, ColumnClause):
+                # Join condition, each side is looked up on its own
+                joins.update(
+                    name for name in (_column_name(column), _column_name(other)) if name
+                )
+            else:
+                add(equality, column)
+        elif element.operator in RANGE_OPERATORS and isinstance(other, BindParameter):
+            add(ranges, column)
+
+    # Sorting only matters on tables that are also filtered
+    for clause in getattr(statement, "_order_by_clauses", ()):
+        name = _column_name(clause) if isinstance(clause, ColumnClause) else None
+        if name and (name[0] in equality or name[0] in ranges):
+            ranges.setdefault(name[0], set()).add(name[1])
+
+    patterns = [
+        QueryPattern(
+            table,
+            tuple(sorted(equality.get(table, ()))),
+            tuple(sorted(ranges.get(table, set()) - equality.get(table, set()))),
+        )
+        for table in sorted(set(equality) | set(ranges))
+    ]
+    patterns += [QueryPattern(table, (column,)) for table, column in sorted(joins)]
+    return patterns
+
+
+class QueryPatternRecorder:
+    """Records query patterns of the statements executed on an engine."""
+
+    def __init__(self):
+        self.patterns: Counter = Counter()
+        self.text_statements = 0
+        self._engines = []
+
+    def attach(self, engine) -> "QueryPatternRecorder":
+        event.listen(engine, "before_execute", self._before_execute)
+        self._engines.append(engine)
+        return self
+
+    def detach(self) -> None:
+        for engine in self._engines:
+            event.remove(engine, "before_execute", self._before_execute)
+        self._engines = []
+
+    def _before_execute(self, conn, clauseelement, multiparams, params, execution_options):
+        if isinstance(clauseelement, TextClause):
+            self.text_statements += 1
+            return
+        if not isinstance(clauseelement, (Select, CompoundSelect, Update, Delete)):
+            return
+        for pattern in extract_patterns(clauseelement):
+            self.patterns[pattern] += 1
+
+
+def declared_indexes(table: Table) -> List[Tuple[str, ...]]:
+    """Column tuples of the indexes, primary key and unique constraints of a table."""
+    indexes = [tuple(c.name for c in index.columns) for index in table.indexes]
+    indexes += [
+        tuple(c.name for c in constraint.columns)
+        for constraint in table.constraints
+        if constraint.__class__.__name__ in ("PrimaryKeyConstraint", "UniqueConstraint")
+        and constraint.columns
+    ]
+    indexes += [(c.name,) for c in table.columns if c.unique]
+    return indexes
+
+
+def _covers(index: Tuple[str, ...], pattern: QueryPattern) -> bool:
+    """Whether ``index`` can serve every equality column (then the range) of a pattern."""
+    size = len(pattern.equality)
+    if set(index[:size]) != set(pattern.equality):
+        return False
+    if not pattern.range:
+        return True
+    return len(index) > size and index[size] in pattern.range
+
+
+def propose_indexes(
+    metadata: MetaData,
+    patterns: Optional[Dict[QueryPattern, int]] = None,
+    include_foreign_keys: bool = True,
+) -> List[IndexProposal]:
+    """
+    Indexes missing for the recorded query patterns and, optionally, for
+    foreign key columns. Patterns on tables not in ``metadata`` are ignored.
+    """
+    proposals: Dict[Tuple[str, Tuple[str, ...]], IndexProposal] = {}
+
+    # Widest patterns first, a narrower one may then be served by an index
+    # already proposed for a wider one
+    ordered = sorted(
+        (patterns or {}).items(), key=lambda item: (-len(item[0].candidate()), -item[1])
+    )
+    for pattern, hits in ordered:
+        table = metadata.tables.get(pattern.table)
+        if table is None or not pattern.candidate():
+            continue
+        indexes = declared_indexes(table)
+        if any(_covers(index, pattern) for index in indexes):
+            continue
+        covering = next(
+            (
+                proposal
+                for proposal in proposals.values()
+                if proposal.table == table.name and _covers(proposal.columns, pattern)
+            ),
+            None,
+        )
+        if covering is not None:
+            covering.hits += hits
+            continue
+        candidate = pattern.candidate()
+        # An existing index on a prefix of the proposal becomes redundant
+        prefix = next(
+            (
+                index
+                for index in indexes
+                if len(index) < len(candidate) and candidate[: len(index)] == index
+            ),
+            None,
+        )
+        proposals[(table.name, candidate)] = IndexProposal(
+            table.name, candidate, reason="query", hits=hits, replaces=prefix
+        )
+
+    if include_foreign_keys:
+        for table in metadata.sorted_tables:
+            leading = {index[0] for index in declared_indexes(table)}
+            leading |= {columns[0] for (name, columns) in proposals if name == table.name}
+            for fk in table.foreign_keys:
+                if fk.parent.name not in leading:
+                    leading.add(fk.parent.name)
+                    proposals[(table.name, (fk.parent.name,))] = IndexProposal(
+                        table.name, (fk.parent.name,), reason="foreign key"
+                    )
+
+    return sorted(proposals.values(), key=lambda p: (-p.hits, p.table, p.columns))
+
+
+def render_operations(proposals: Iterable[IndexProposal]) -> str:
+    """Alembic operations creating the proposed indexes."""
+    return "\n".join(
+        f'op.create_index("{p.name}", "{p.table}", {list(p.columns)!r})' for p in proposals
+    )
+
+
+def explain(connection, statement) -> str:
+    """
+    Query plan of a statement as text. Parameter values only matter for
+    the plan shape, UUIDs are passed as strings.
+    """
+    # Expanding IN parameters are rendered as one parameter per value
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    values = {
+        key: str(value) if isinstance(value, uuid.UUID) else value
+        for key, value in compiled.params.items()
+    }
+    if compiled.positional:
+        parameters = tuple(values[key] for key in compiled.positiontup)
+    else:
+        parameters = values
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    rows = connection.exec_driver_sql(prefix + str(compiled), parameters).fetchall()
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
@@ -0,0 +1,307 @@
+"""
+Lightweight background job queue.
+
+Two backends are available, selected by ``settings.JOB_BACKEND``:
+
+* ``database``: jobs are rows of the ``jobs`` table. Workers claim them with
+  ``SELECT ... FOR UPDATE SKIP LOCKED`` (PostgreSQL) and hold them for
+  ``JOB_VISIBILITY_TIMEOUT`` seconds, after which a crashed worker's job
+  becomes visible again.
+* ``memory``: jobs live in an in-process queue. Used for development and tests.
+
+Handlers are registered with the ``@job("name")`` decorator (see ``app.tasks``)
+and receive the JSON payload given to ``enqueue``. A handler may record its
+progress in the payload: a retry receives the payload as the failed attempt
+left it, so it can skip the work already done.
+"""
+
+import copy
+import heapq
+import itertools
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job
+
+logger = getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+
+
+def job(name: str):
+    """Register a function as the handler for jobs with the given name."""
+
+    def decorator(func: Callable[[Dict[str, Any]], None]):
+        _handlers[name] = func
+        return func
+
+    return decorator
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.JOB_RETRY_BACKOFF * attempts)
+
+
+def _run_handler(name: str, payload: Dict[str, Any]) -> None:
+    handler = _handlers.get(name)
+    if handler is None:
+        raise LookupError(f"No handler registered for job '{name}'")
+    handler(payload)
+
+
+class MemoryQueue:
+    """In-process job queue with retries, ordered by the time a job may run."""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def put(
+        self,
+        name: str,
+        payload: Dict[str, Any],
+        max_attempts: int,
+        run_at: datetime,
+        attempts: int = 0,
+    ) -> uuid.UUID:
+        job_id = uuid.uuid4()
+        with self._condition:
+            heapq.heappush(
+                self._heap,
+                (run_at, next(self._counter), job_id, name, payload, attempts, max_attempts),
+            )
+            self._condition.notify()
+        return job_id
+
+    def _pop_ready(self, timeout: Optional[float]):
+        with self._condition:
+            while True:
+                now = datetime.utcnow()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)
+                if timeout is not None and timeout <= 0:
+                    return None
+                wait = timeout
+                if self._heap:
+                    until_next = (self._heap[0][0] - now).total_seconds()
+                    wait = until_next if wait is None else min(wait, until_next)
+                self._condition.wait(wait)
+                if timeout is not None:
+                    timeout = 0
+
+    def _execute(self, item) -> None:
+        _, _, job_id, name, payload, attempts, max_attempts = item
+        attempts += 1
+        try:
+            _run_handler(name, payload)
+        except Exception as e:
+            if attempts >= max_attempts:
+                logger.error(f"Job {name} ({job_id}) failed after {attempts} attempts: {e}")
+                return
+            logger.warning(f"Job {name} ({job_id}) failed, retrying: {e}")
+            self.put(
+                name,
+                payload,
+                max_attempts,
+                datetime.utcnow() + _retry_delay(attempts),
+                attempts=attempts,
+            )
+
+    def process(self, timeout: Optional[float] = None) -> bool:
+        """Run the next ready job. Returns False if none became ready in time."""
+        item = self._pop_ready(timeout)
+        if item is None:
+            return False
+        self._execute(item)
+        return True
+
+    def drain(self, timeout: Optional[float] = None) -> int:
+        """
+        Synchronously run every job that is ready now, giving up after
+        ``timeout`` seconds when set. Used in tests and at shutdown.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        count = 0
+        while (deadline is None or time.monotonic() < deadline) and self.process(timeout=0):
+            count += 1
+        return count
+
+    def wake(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+memory_queue = MemoryQueue()
+
+
+def enqueue(
+    name: str,
+    payload: Optional[Dict[str, Any]] = None,
+    db: Optional[Session] = None,
+    delay: float = 0,
+    max_attempts: Optional[int] = None,
+) -> uuid.UUID:
+    """
+    Queue a job for background execution.
+
+    Args:
+        name: Name of the registered handler
+        payload: JSON-serialisable arguments for the handler
+        db: Session to add the job to. With the database backend the job is
+            then committed together with the caller's transaction; without it
+            the job is committed immediately in its own session.
+        delay: Seconds to wait before the job may run
+        max_attempts: Number of attempts before the job is marked failed
+
+    Returns:
+        The id of the queued job
+    """
+    payload = payload or {}
+    max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+    run_at = datetime.utcnow() + timedelta(seconds=delay)
+
+    if settings.JOB_BACKEND == "memory":
+        return memory_queue.put(name, payload, max_attempts, run_at)
+
+    db_job = Job(
+        id=uuid.uuid4(),
+        name=name,
+        payload=payload,
+        status=STATUS_QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=run_at,
+    )
+    if db is not None:
+        db.add(db_job)
+        return db_job.id
+
+    with SessionLocal() as session:
+        session.add(db_job)
+        session.commit()
+        return db_job.id
+
+
+def claim_jobs(db: Session, limit: int) -> List[Job]:
+    """
+    Claim up to ``limit`` runnable jobs for this worker.
+
+    A job is runnable when it is queued and due, or when it is running but its
+    visibility timeout expired (the worker holding it died).
+    """
+    now = datetime.utcnow()
+    query = (
+        db.query(Job)
+        .filter(
+            Job.run_at <= now,
+            or_(
+                Job.status == STATUS_QUEUED,
+                (Job.status == STATUS_RUNNING) & (Job.locked_until < now),
+            ),
+        )
+        .order_by(Job.run_at)
+        .limit(limit)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+
+    jobs = query.all()
+    for db_job in jobs:
+        db_job.status = STATUS_RUNNING
+        db_job.attempts += 1
+        db_job.locked_until = now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT)
+    db.commit()
+    return jobs
+
+
+def _finish_job(
+    db: Session, db_job: Job, error: Optional[str], payload: Dict[str, Any]
+) -> None:
+    if error is None:
+        db_job.status = STATUS_DONE
+        db_job.last_error = None
+    elif db_job.attempts >= db_job.max_attempts:
+        db_job.status = STATUS_FAILED
+        db_job.last_error = error
+    else:
+        db_job.status = STATUS_QUEUED
+        db_job.run_at = datetime.utcnow() + _retry_delay(db_job.attempts)
+        db_job.last_error = error
+        # Keep the progress the handler recorded for the retry
+        db_job.payload = payload
+        flag_modified(db_job, "payload")
+    db_job.locked_until = None
+    db.commit()
+
+
+def process_database_jobs(limit: Optional[int] = None) -> int:
+    """Claim and run one batch of jobs from the database. Returns the batch size."""
+    with SessionLocal() as db:
+        jobs = claim_jobs(db, limit or settings.JOB_BATCH_SIZE)
+        for db_job in jobs:
+            error = None
+            payload = copy.deepcopy(db_job.payload or {})
+            try:
+                _run_handler(db_job.name, payload)
+            except Exception as e:
+                error = "".join(traceback.format_exception_only(type(e), e)).strip()
+                logger.warning(f"Job {db_job.name} ({db_job.id}) failed: {error}")
+            _finish_job(db, db_job, error, payload)
+        return len(jobs)
+
+
+class Worker:
+    """Background thread running queued jobs for the configured backend."""
+
+    def __init__(self, poll_interval: Optional[float] = None):
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if settings.JOB_BACKEND == "memory":
+                    memory_queue.process(timeout=self.poll_interval)
+                elif not process_database_jobs():
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                logger.error(f"Job worker error: {e}")
+                self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        memory_queue.wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_forever(self) -> None:
+        self._run()
@@ -0,0 +1,207 @@
+"""
+License number lookups for the public "verify a license" page.
+
+Most numbers typed on that page are mistyped or made up. A bloom filter of
+every issued license number answers those without a query: a number the
+filter has never seen does not exist. Numbers the filter may have seen are
+looked up once and kept in an LRU cache for LICENSE_VERIFY_CACHE_TTL
+seconds, unknown ones included, so repeated checks of the same license do
+not reach the database either.
+
+The filter is rebuilt from the licenses table every LICENSE_REGISTRY_TTL
+seconds. Licenses issued by this process are added at once. Those issued
+by other worker processes since the rebuild are numbered above the
+license number counters read with it: a number missing from the filter
+but above its counter is checked against the counter row (one primary key
+read) and then the licenses table. Numbers not following the counter
+format (typed in by an admin) are only known after the next rebuild.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from logging import getLogger
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import MISSING, LRUCache
+from app.core.config import settings
+from app.models.license import License
+from app.models.license_number_counter import LicenseNumberCounter
+from app.models.license_type import LicenseType
+
+logger = getLogger(__name__)
+
+VERIFICATIONS = metrics.counter(
+    "license_verifications_total",
+    "License number verifications by how they were answered",
+    ("answered_by",),
+)
+
+# Rows fetched per round trip while building the filter
+LOAD_BATCH_SIZE = 10000
+
+# Issued numbers are the counter prefix followed by a 6-digit sequence
+SEQUENCE_DIGITS = 6
+
+
+class BloomFilter:
+    """Set membership with false positives at ``error_rate``, no false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: position i is h1 + i * h2
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class LicenseRegistry:
+    def __init__(self):
+        self._bloom: Optional[BloomFilter] = None
+        # License number counters when the filter was built, prefix -> last value
+        self._counters: Dict[str, int] = {}
+        self._loaded_at = 0.0
+        # Numbers added while the filter is being rebuilt, applied to the new one
+        self._added_while_loading: Optional[list] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.cache = LRUCache(
+            settings.LICENSE_VERIFY_CACHE_SIZE, settings.LICENSE_VERIFY_CACHE_TTL
+        )
+
+    def _expired(self) -> bool:
+        return (
+            self._bloom is None
+            or time.monotonic() - self._loaded_at > settings.LICENSE_REGISTRY_TTL
+        )
+
+    def load(self, db: Session) -> int:
+        """Rebuild the filter from the licenses table, returns the number of licenses."""
+        with self._lock:
+            self._added_while_loading = []
+        # Read first: every license numbered up to these values is committed
+        # and seen by the queries below
+        counters = dict(
+            db.query(LicenseNumberCounter.prefix, LicenseNumberCounter.last_value)
+        )
+        total = db.query(func.count(License.id)).scalar()
+        # Room for the licenses issued until the next rebuild
+        bloom = BloomFilter(int(total * 1.25) + 1000, settings.LICENSE_BLOOM_ERROR_RATE)
+        numbers = (
+            db.query(License.license_number)
+            .filter(License.license_number.isnot(None))
+            .yield_per(LOAD_BATCH_SIZE)
+        )
+        for (number,) in numbers:
+            bloom.add(number)
+        with self._lock:
+            for number in self._added_while_loading:
+                bloom.add(number)
+            self._added_while_loading = None
+            self._bloom = bloom
+            self._counters = counters
+            self._loaded_at = time.monotonic()
+        self.cache.clear()
+        logger.debug(f"Loaded {total} license numbers into the bloom filter")
+        return total
+
+    def might_exist(self, db: Session, license_number: str) -> bool:
+        if self._expired():
+            with self._load_lock:
+                if self._expired():
+                    self.load(db)
+        return license_number in self._bloom
+
+    def issued_since_load(self, db: Session, license_number: str) -> bool:
+        """
+        Whether a number missing from the filter may have been issued by
+        another process after the filter was built.
+        """
+        prefix = license_number[:-SEQUENCE_DIGITS]
+        sequence = license_number[-SEQUENCE_DIGITS:]
+        if not prefix or not sequence.isdigit():
+            return False
+        if int(sequence) <= self._counters.get(prefix, 0):
+            return False
+        last_value = (
+            db.query(LicenseNumberCounter.last_value)
+            .filter(LicenseNumberCounter.prefix == prefix)
+            .scalar()
+        )
+        return last_value is not None and int(sequence) <= last_value
+
+    def add(self, license_number: str) -> None:
+        """Make a license issued by this process verifiable at once."""
+        if not license_number:
+            return
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(license_number)
+            if self._added_while_loading is not None:
+                self._added_while_loading.append(license_number)
+        self.cache.pop(license_number)
+
+    def forget(self, license_number: str) -> None:
+        """Drop the cached verification of a changed or deleted license."""
+        self.cache.pop(license_number)
+
+    def lookup(self, db: Session, license_number: str) -> Optional[Dict[str, Any]]:
+        """
+        Number, type, status and expiration date of a license.
+
+        Args:
+            db: Database session, only used when the filter and the cache
+                cannot answer
+            license_number: License number to verify
+
+        Returns:
+            Dict of the license fields, or None if there is no such license
+        """
+        if not self.might_exist(db, license_number):
+            if not self.issued_since_load(db, license_number):
+                VERIFICATIONS.inc("bloom_filter")
+                return None
+        cached = self.cache.get(license_number)
+        if cached is not MISSING:
+            VERIFICATIONS.inc("cache")
+            return cached
+
+        VERIFICATIONS.inc("database")
+        row = (
+            db.query(
+                License.license_number,
+                License.status,
+                License.expiration_date,
+                LicenseType.type_name.label("license_type"),
+            )
+            .outerjoin(LicenseType, LicenseType.id == License.license_type_id)
+            .filter(License.license_number == license_number)
+            .first()
+        )
+        value = dict(row._mapping) if row is not None else None
+        self.cache.set(license_number, value)
+        return value
+
+
+license_registry = LicenseRegistry()
@@ -0,0 +1,118 @@
+"""
+Application lifespan: resources created before the first request is served
+and released when the server shuts down.
+
+At startup the connection pool is opened up to DB_POOL_SIZE, the reference
+caches are loaded and the hottest queries are executed once so SQLAlchemy
+has them in its compiled statement cache, then the job worker and the
+periodic job scheduler start. At shutdown the scheduler stops, the worker
+finishes its current job, ready in-memory jobs get SHUTDOWN_TIMEOUT seconds
+to run, and pooled connections (primary and replicas) are closed.
+"""
+
+import time
+import uuid
+from contextlib import asynccontextmanager
+from logging import getLogger
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from app.core import cache
+from app.core.config import settings
+from app.core.database import Base, SessionLocal, engine, replica_set
+from app.core.jobs import Worker, memory_queue
+from app.core.license_registry import license_registry
+from app.core.logging import shutdown_logging
+from app.core.scheduler import Scheduler
+from app.crud import course as course_crud
+from app.crud import health_check_schedule as health_check_schedule_crud
+from app.crud import license_type as license_type_crud
+from app.crud import user as user_crud
+
+logger = getLogger(__name__)
+
+job_worker = Worker()
+scheduler = Scheduler()
+
+
+def warm_pool() -> int:
+    """Open pool_size connections so the first requests don't pay for connecting."""
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def warm_statements(db) -> None:
+    """Run the hot lookups once so their compiled SQL is cached."""
+    missing = uuid.uuid4()
+    user_crud.get_user_by_username(db, username="")
+    course_crud.get_course(db, course_id=missing)
+    license_type_crud.get_license_type_by_id(db, license_type_id=missing)
+    health_check_schedule_crud.get_health_check_schedule(
+        db, health_check_schedule_id=missing
+    )
+
+
+def warm_up() -> None:
+    started = time.perf_counter()
+    connections = warm_pool()
+    with SessionLocal() as db:
+        cache.preload(db)
+        licenses = license_registry.load(db)
+        warm_statements(db)
+    healthy = replica_set.check_all()
+    logger.info(
+        f"Warm-up done in {(time.perf_counter() - started) * 1000:.0f}ms "
+        f"({connections} pooled connections, {licenses} license numbers, "
+        f"{healthy}/{len(replica_set)} replicas up)"
+    )
+
+
+def shutdown() -> None:
+    scheduler.stop(timeout=settings.SHUTDOWN_TIMEOUT)
+    job_worker.stop(timeout=settings.SHUTDOWN_TIMEOUT)
+    if settings.JOB_BACKEND == "memory" and len(memory_queue):
+        drained = memory_queue.drain(timeout=settings.SHUTDOWN_TIMEOUT)
+        if len(memory_queue):
+            logger.warning(
+                f"Shutting down with {len(memory_queue)} in-memory jobs not run "
+                f"({drained} drained)"
+            )
+    replica_set.dispose()
+    engine.dispose()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_CREATE_TABLES:
+        # Development convenience, production relies on Alembic migrations
+        Base.metadata.create_all(bind=engine)
+    if settings.STARTUP_WARMUP:
+        try:
+            await run_in_threadpool(warm_up)
+        except Exception as e:
+            # A cold start is slower, not fatal
+            logger.error(f"Warm-up failed: {e}")
+    if settings.JOB_WORKER_IN_PROCESS:
+        job_worker.start()
+    if settings.SCHEDULER_ENABLED:
+        if settings.JOB_BACKEND == "memory" and not settings.JOB_WORKER_IN_PROCESS:
+            # Nothing would ever take the jobs off this process's queue
+            logger.warning(
+                "Periodic job scheduler not started: the memory job backend "
+                "needs JOB_WORKER_IN_PROCESS"
+            )
+        else:
+            scheduler.start()
+
+    yield
+
+    await run_in_threadpool(shutdown)
+    shutdown_logging()
@@ -0,0 +1,251 @@
+"""
+Request and SQL instrumentation exposed in the Prometheus text format.
+
+``MetricsMiddleware`` measures every HTTP request, and the SQLAlchemy cursor
+events installed by ``instrument_engine`` add the number of statements and
+the time spent in the database to the request being served.
+"""
+
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+DEBUG_HEADER = "x-debug-queries"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            counts, total = self._values.get(
+                label_values, ([0] * (len(self.buckets) + 1), 0.0)
+            )
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[label_values] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    le = _format_labels(self.labels, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                cumulative += counts[-1]
+                le = _format_labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+_registry: List = []
+
+
+def counter(name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+    metric = Counter(name, documentation, labels)
+    _registry.append(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labels: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    metric = Histogram(name, documentation, labels, buckets)
+    _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REQUESTS = counter(
+    "http_requests_total", "HTTP requests served", ("method", "route", "status")
+)
+REQUEST_LATENCY = histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+REQUEST_STATEMENTS = histogram(
+    "http_request_db_statements",
+    "SQL statements executed per HTTP request",
+    ("method", "route"),
+    COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL per HTTP request",
+    ("method", "route"),
+)
+N_PLUS_ONE = counter(
+    "http_request_n_plus_one_total",
+    "Requests exceeding SQL_N_PLUS_ONE_THRESHOLD statements",
+    ("method", "route"),
+)
+DB_STATEMENT_LATENCY = histogram(
+    "db_statement_duration_seconds", "Latency of individual SQL statements"
+)
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_time: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Statistics of the HTTP request being served, if any."""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    elapsed = time.perf_counter() - started
+    DB_STATEMENT_LATENCY.observe(elapsed)
+
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += elapsed
+
+
+def instrument_engine(engine) -> None:
+    """Record every SQL statement executed through the engine."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_name(scope) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    # Do not create one label per unknown URL
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and SQL usage of every HTTP request.
+
+    When DEBUG_QUERIES_ENABLED is set, a request sending the X-Debug-Queries
+    header gets the statement count and DB time back in the same header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        debug = settings.DEBUG_QUERIES_ENABLED and any(
+            name == DEBUG_HEADER.encode() for name, _ in scope.get("headers", [])
+        )
+        stats = RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if debug:
+                    value = f"count={stats.statements}; db_ms={stats.db_time * 1000:.2f}"
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (DEBUG_HEADER.encode(), value.encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - stats.started
+            method = scope["method"]
+            route = _route_name(scope)
+            REQUESTS.inc(method, route, str(status_code))
+            REQUEST_LATENCY.observe(elapsed, method, route)
+            REQUEST_STATEMENTS.observe(stats.statements, method, route)
+            REQUEST_DB_TIME.observe(stats.db_time, method, route)
+            if stats.statements > settings.SQL_N_PLUS_ONE_THRESHOLD:
+                N_PLUS_ONE.inc(method, route)
+                logger.warning(
+                    f"Possible N+1 query pattern: {method} {route} executed "
+                    f"{stats.statements} SQL statements"
+                )
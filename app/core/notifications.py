@@ -0,0 +1,158 @@
+"""
+Notification delivery: messages are grouped per channel, sent in batches
+through pluggable senders and throttled by a token bucket per channel.
+
+Only local fake senders ship with the app; real providers register their
+own sender with ``register_sender``.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+logger = getLogger(__name__)
+
+CHANNEL_EMAIL = "email"
+CHANNEL_SMS = "sms"
+
+
+@dataclass
+class Message:
+    channel: str
+    recipient: str
+    subject: str
+    body: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.channel}:{self.recipient}"
+
+
+class Sender(ABC):
+    """Base class for a channel provider."""
+
+    @abstractmethod
+    def send_batch(self, messages: List[Message]) -> None:
+        """Send the messages, raising if the batch was not sent."""
+
+
+class FakeSender(Sender):
+    """Keeps sent messages in memory instead of calling a provider."""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.sent: List[Message] = []
+        self.batches = 0
+
+    def send_batch(self, messages: List[Message]) -> None:
+        self.sent.extend(messages)
+        self.batches += 1
+        logger.info(f"[{self.channel}] sent batch of {len(messages)} messages")
+
+
+class TokenBucket:
+    """Allows ``rate`` tokens per second with bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Take tokens if available. Returns 0, or the seconds to wait before retrying."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Block until the tokens are available."""
+        tokens = min(tokens, self.capacity)
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+_senders: Dict[str, Sender] = {
+    CHANNEL_EMAIL: FakeSender(CHANNEL_EMAIL),
+    CHANNEL_SMS: FakeSender(CHANNEL_SMS),
+}
+
+_rates = {
+    CHANNEL_EMAIL: settings.NOTIFICATION_EMAIL_RATE,
+    CHANNEL_SMS: settings.NOTIFICATION_SMS_RATE,
+}
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def register_sender(channel: str, sender: Sender) -> None:
+    _senders[channel] = sender
+
+
+def get_sender(channel: str) -> Sender:
+    return _senders[channel]
+
+
+def _bucket(channel: str) -> TokenBucket:
+    if channel not in _buckets:
+        rate = _rates.get(channel, settings.NOTIFICATION_EMAIL_RATE)
+        # Allow one full batch as a burst
+        _buckets[channel] = TokenBucket(rate, max(rate, settings.NOTIFICATION_BATCH_SIZE))
+    return _buckets[channel]
+
+
+def enabled_channels() -> List[str]:
+    return [c.strip() for c in settings.NOTIFICATION_CHANNELS.split(",") if c.strip()]
+
+
+def deliver(messages: Iterable[Message], delivered: Optional[List[str]] = None) -> int:
+    """
+    Send messages grouped by channel in batches of NOTIFICATION_BATCH_SIZE,
+    waiting for the channel's rate limit before each batch.
+
+    Args:
+        messages: Messages to send
+        delivered: Keys of the messages already sent, skipped. The keys of
+            each batch are appended once it is sent, so a job keeping the
+            list in its payload does not send them again when retried.
+
+    Returns:
+        The number of messages handed to senders
+    """
+    skipped = set(delivered or ())
+    by_channel: Dict[str, List[Message]] = {}
+    for message in messages:
+        if message.key not in skipped:
+            by_channel.setdefault(message.channel, []).append(message)
+
+    sent = 0
+    batch_size = settings.NOTIFICATION_BATCH_SIZE
+    for channel, channel_messages in by_channel.items():
+        sender = _senders.get(channel)
+        if sender is None:
+            logger.warning(f"No sender registered for channel '{channel}'")
+            continue
+        for start in range(0, len(channel_messages), batch_size):
+            batch = channel_messages[start : start + batch_size]
+            _bucket(channel).acquire(len(batch))
+            sender.send_batch(batch)
+            if delivered is not None:
+                delivered.extend(message.key for message in batch)
+            sent += len(batch)
+    return sent
@@ -0,0 +1,354 @@
+"""
+Rate limiting and admission control of the expensive public endpoints
+(login, sign-up and course registration hash passwords with bcrypt and write
+to several tables).
+
+``RateLimitMiddleware`` gives each client a token bucket per route, and
+each route a bucket shared by all clients; a request finding either empty
+gets a 429 with a Retry-After header. Clients are told apart by the user of
+their access token, else by IP; staff and admins entering registrations
+for walk-in students are only held by the route bucket. Buckets are kept by the backend
+selected with ``settings.RATE_LIMIT_BACKEND``:
+
+* ``memory``: in-process, the limits apply to each worker process;
+* ``database``: rows of the ``rate_limit_buckets`` table, shared by every
+  process, at the cost of a query per limited request. A stand-in for a
+  shared cache server.
+
+``ConcurrencyLimitMiddleware`` keeps the same routes from taking the whole
+connection pool. A request waits while ADMISSION_MAX_CONCURRENT of them are
+running or the pool is more than ADMISSION_POOL_THRESHOLD in use, and gets
+a 503 when ADMISSION_QUEUE_SIZE requests are already waiting or it waited
+ADMISSION_QUEUE_TIMEOUT seconds. Other endpoints keep the rest of the pool.
+
+Rejections are counted in ``http_requests_rejected_total``.
+"""
+
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.security import verify_access_token
+from app.models.rate_limit_bucket import RateLimitBucket
+
+logger = getLogger(__name__)
+
+REJECTIONS = metrics.counter(
+    "http_requests_rejected_total",
+    "Requests rejected by rate limiting and admission control",
+    ("route", "reason"),
+)
+ADMISSION_WAIT = metrics.histogram(
+    "admission_wait_seconds",
+    "Time expensive requests waited for the connection pool",
+    ("route",),
+)
+
+# Seconds between two admission checks of a waiting request
+ADMISSION_POLL_INTERVAL = 0.02
+
+# Roles without a per-client limit
+EXEMPT_ROLES = {"admin", "staff"}
+
+
+@dataclass(frozen=True)
+class Limit:
+    """``rate`` tokens per second, up to ``burst`` tokens saved."""
+
+    rate: float
+    burst: int
+
+    @classmethod
+    def per_minute(cls, count: int, burst: int) -> "Limit":
+        return cls(count / 60, burst)
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    per_client: Limit
+    route: Optional[Limit] = None
+
+
+def _route_limit(per_minute: int) -> RouteLimit:
+    return RouteLimit(
+        per_client=Limit.per_minute(per_minute, settings.RATE_LIMIT_CLIENT_BURST),
+        route=Limit(settings.RATE_LIMIT_ROUTE_PER_SECOND, settings.RATE_LIMIT_ROUTE_BURST),
+    )
+
+
+ROUTE_LIMITS: Dict[Tuple[str, str], RouteLimit] = {
+    ("POST", "/api/users/login"): _route_limit(settings.RATE_LIMIT_LOGIN_PER_MINUTE),
+    ("POST", "/api/users/"): _route_limit(settings.RATE_LIMIT_REGISTRATION_PER_MINUTE),
+    ("POST", "/api/course_registration/"): _route_limit(
+        settings.RATE_LIMIT_REGISTRATION_PER_MINUTE
+    ),
+}
+EXPENSIVE_ROUTES = set(ROUTE_LIMITS)
+
+
+class MemoryBackend:
+    """Token buckets of this process, the least recently used are dropped beyond ``max_keys``."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit) -> float:
+        """Take a token, returns 0 or the seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated_at) * limit.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                # A dropped bucket starts over full
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / limit.rate
+
+
+class DatabaseBackend:
+    """Token buckets shared by every process, refilled with one conditional UPDATE."""
+
+    def take(self, key: str, limit: Limit) -> float:
+        """Take a token, returns 0 or the seconds until one is available."""
+        with SessionLocal() as db:
+            try:
+                return self._take(db, key, limit)
+            except Exception:
+                db.rollback()
+                raise
+
+    def _take(self, db: Session, key: str, limit: Limit) -> float:
+        now = time.time()
+        refilled = RateLimitBucket.tokens + (now - RateLimitBucket.updated_at) * limit.rate
+        refilled = case((refilled > limit.burst, limit.burst), else_=refilled)
+        taken = db.execute(
+            update(RateLimitBucket)
+            .where(RateLimitBucket.key == key, refilled >= 1)
+            .values(tokens=refilled - 1, updated_at=now)
+            .returning(RateLimitBucket.key)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if taken is not None:
+            db.commit()
+            return 0.0
+
+        bucket = (
+            db.query(RateLimitBucket.tokens, RateLimitBucket.updated_at)
+            .filter(RateLimitBucket.key == key)
+            .first()
+        )
+        if bucket is None:
+            try:
+                db.execute(
+                    insert(RateLimitBucket).values(
+                        key=key, tokens=limit.burst - 1, updated_at=now
+                    )
+                )
+                db.commit()
+                return 0.0
+            except IntegrityError:
+                # Created by a concurrent request, take from it
+                db.rollback()
+                return self._take(db, key, limit)
+        db.rollback()
+        tokens = min(limit.burst, bucket.tokens + (now - bucket.updated_at) * limit.rate)
+        return max(1 - tokens, 0) / limit.rate
+
+
+def purge_idle_buckets(db: Session, idle_seconds: float = 3600) -> int:
+    """
+    Delete the database buckets unused for ``idle_seconds``, long enough for
+    any configured limit to refill them.
+
+    Returns:
+        Number of buckets deleted
+    """
+    purged = db.execute(
+        delete(RateLimitBucket)
+        .where(RateLimitBucket.updated_at < time.time() - idle_seconds)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return purged
+
+
+def client_ip(scope) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = dict(scope["headers"]).get(b"x-forwarded-for")
+        if forwarded:
+            # Appended by our proxy, the entries before it are sent by the client
+            return forwarded.decode("latin-1").split(",")[-1].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def token_payload(scope) -> Optional[dict]:
+    """Payload of a valid bearer token, None without one."""
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return verify_access_token(token.strip())
+    except HTTPException:
+        # Limited by IP, the endpoint answers the 401
+        return None
+
+
+def client_key(scope) -> Optional[str]:
+    """The per-client bucket of a request, None for the EXEMPT_ROLES."""
+    payload = token_payload(scope)
+    if payload is None or "sub" not in payload:
+        return f"ip {client_ip(scope)}"
+    if payload.get("role") in EXEMPT_ROLES:
+        return None
+    return f"user {payload['sub']}"
+
+
+def pool_usage(db_engine=None) -> Optional[float]:
+    """Share of the connection pool checked out, None when it has no fixed size."""
+    db_engine = db_engine or engine
+    if db_engine.url.get_backend_name() == "sqlite":
+        return None
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    return db_engine.pool.checkedout() / capacity
+
+
+async def _reject(send, status_code: int, retry_after: float, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-length", str(len(body)).encode()),
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """Answer 429 to the clients going over the limits of ROUTE_LIMITS."""
+
+    def __init__(self, app, limits: Optional[Dict[Tuple[str, str], RouteLimit]] = None):
+        self.app = app
+        self.limits = ROUTE_LIMITS if limits is None else limits
+        if settings.RATE_LIMIT_BACKEND == "database":
+            self.backend = DatabaseBackend()
+        else:
+            self.backend = MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+    async def _take(self, key: str, limit: Limit) -> float:
+        try:
+            if isinstance(self.backend, MemoryBackend):
+                return self.backend.take(key, limit)
+            return await run_in_threadpool(self.backend.take, key, limit)
+        except Exception as e:
+            # Better to serve the request than to fail it for the limiter
+            logger.warning(f"Rate limit backend error, request let through: {e}")
+            return 0.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_limit = self.limits.get((scope["method"], scope["path"]))
+        if route_limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        route = scope["path"]
+        reason = "client_rate"
+        retry_after = 0.0
+        client = client_key(scope)
+        if client is not None:
+            retry_after = await self._take(f"{route} {client}", route_limit.per_client)
+        if not retry_after and route_limit.route is not None:
+            reason = "route_rate"
+            retry_after = await self._take(route, route_limit.route)
+        if retry_after:
+            REJECTIONS.inc(route, reason)
+            await _reject(send, 429, retry_after, "Too many requests, retry later")
+            return
+        await self.app(scope, receive, send)
+
+
+class ConcurrencyLimitMiddleware:
+    """Queue, then shed, expensive requests while the connection pool is nearly exhausted."""
+
+    def __init__(self, app, routes=EXPENSIVE_ROUTES, db_engine=None):
+        self.app = app
+        self.routes = routes
+        self.engine = db_engine or engine
+        self.max_concurrent = settings.ADMISSION_MAX_CONCURRENT or max(
+            1, (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW) // 2
+        )
+        # Only changed on the event loop, between two awaits
+        self.active = 0
+        self.waiting = 0
+
+    def _admissible(self) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        usage = pool_usage(self.engine)
+        return usage is None or usage < settings.ADMISSION_POOL_THRESHOLD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+
+        route = scope["path"]
+        if not self._admissible():
+            if self.waiting >= settings.ADMISSION_QUEUE_SIZE:
+                REJECTIONS.inc(route, "queue_full")
+                await _reject(
+                    send, 503, settings.ADMISSION_QUEUE_TIMEOUT, "Server busy, retry later"
+                )
+                return
+            started = time.perf_counter()
+            deadline = started + settings.ADMISSION_QUEUE_TIMEOUT
+            self.waiting += 1
+            try:
+                while not self._admissible():
+                    if time.perf_counter() >= deadline:
+                        REJECTIONS.inc(route, "queue_timeout")
+                        await _reject(
+                            send,
+                            503,
+                            settings.ADMISSION_QUEUE_TIMEOUT,
+                            "Server busy, retry later",
+                        )
+                        return
+                    await asyncio.sleep(ADMISSION_POLL_INTERVAL)
+            finally:
+                self.waiting -= 1
+            ADMISSION_WAIT.observe(time.perf_counter() - started, route)
+
+        self.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
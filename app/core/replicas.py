@@ -0,0 +1,185 @@
+"""
+Read replicas.
+
+Read-only endpoints take their session from ``get_read_db``, which reads
+through one of the DATABASE_REPLICA_URLS engines, picked round-robin among
+the replicas that passed their last health check. Anything the session
+flushes or executes as INSERT/UPDATE/DELETE goes to the primary, and the
+session then stays on the primary to read its own writes.
+
+Replication is asynchronous, so a client that just wrote something would
+not necessarily see it on a replica. Successful POST/PUT/PATCH/DELETE
+responses therefore set a short-lived cookie pinning that client's reads to
+the primary for READ_YOUR_WRITES_WINDOW seconds.
+"""
+
+import itertools
+import threading
+import time
+from http.cookies import SimpleCookie
+from logging import getLogger
+from typing import List, Optional
+
+from sqlalchemy import event, make_url, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = getLogger(__name__)
+
+PIN_COOKIE = "db_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+READ_SESSIONS = metrics.counter(
+    "db_read_sessions_total", "Read-only sessions by database", ("target",)
+)
+REPLICA_FAILURES = metrics.counter(
+    "db_replica_health_failures_total", "Failed replica health checks", ("replica",)
+)
+
+
+class RoutingSession(Session):
+    """
+    Session reading through ``info["replica"]`` when set. Flushes and DML
+    statements are sent to the primary (the session's bind), after which
+    the session no longer uses the replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is not None:
+            if not self._flushing and not isinstance(clause, UpdateBase):
+                return replica
+            self.info["replica"] = None
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+class Replica:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.name = make_url(str(engine.url)).render_as_string(hide_password=True)
+        self.healthy = True
+        self.checked_at = 0.0
+
+    def check(self) -> bool:
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            healthy = True
+        except Exception as e:
+            REPLICA_FAILURES.inc(self.name)
+            logger.debug(f"Replica {self.name} health check failed: {e}")
+            healthy = False
+        if healthy != self.healthy:
+            log = logger.info if healthy else logger.warning
+            log(f"Replica {self.name} is {'up' if healthy else 'down'}")
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+        return healthy
+
+    def mark_down(self) -> None:
+        if self.healthy:
+            logger.warning(f"Replica {self.name} is down (connection lost)")
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping unhealthy ones."""
+
+    def __init__(self, engines: List[Engine], check_interval: float):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._on_error(replica))
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    @staticmethod
+    def _on_error(replica: Replica):
+        def handle_error(context) -> None:
+            if context.is_disconnect:
+                replica.mark_down()
+
+        return handle_error
+
+    def _due(self, replica: Replica) -> bool:
+        return time.monotonic() - replica.checked_at >= self.check_interval
+
+    def choose(self) -> Optional[Engine]:
+        """
+        Next healthy replica engine, or None when there is none. Replicas are
+        re-checked lazily, at most once per check interval, by the request
+        that picks them.
+        """
+        count = len(self.replicas)
+        for _ in range(count):
+            replica = self.replicas[next(self._counter) % count]
+            if self._due(replica) and self._lock.acquire(blocking=False):
+                try:
+                    if self._due(replica):
+                        replica.check()
+                finally:
+                    self._lock.release()
+            if replica.healthy:
+                return replica.engine
+        return None
+
+    def check_all(self) -> int:
+        """Check every replica now. Returns the number of healthy ones."""
+        return sum(replica.check() for replica in self.replicas)
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+
+def pinned_to_primary(cookies) -> bool:
+    """Whether the request carries a read-your-writes pin that has not expired."""
+    try:
+        return float(cookies.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def route_read_session(db: Session, replica_set: ReplicaSet, cookies) -> Session:
+    if replica_set and not pinned_to_primary(cookies):
+        db.info["replica"] = replica_set.choose()
+    READ_SESSIONS.inc("replica" if db.info.get("replica") is not None else "primary")
+    return db
+
+
+class ReadYourWritesMiddleware:
+    """Pin the client's reads to the primary after a successful write."""
+
+    def __init__(self, app, window: Optional[int] = None):
+        self.app = app
+        self.window = settings.READ_YOUR_WRITES_WINDOW if window is None else window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = SimpleCookie()
+                cookie[PIN_COOKIE] = str(int(time.time()) + self.window)
+                cookie[PIN_COOKIE]["max-age"] = self.window
+                cookie[PIN_COOKIE]["path"] = "/"
+                cookie[PIN_COOKIE]["httponly"] = True
+                cookie[PIN_COOKIE]["samesite"] = "Lax"
+                header = cookie.output(header="").strip().encode("latin-1")
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", [])) + [(b"set-cookie", header)],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,73 @@
+"""
+Periodic jobs.
+
+Jobs registered with ``periodic(name, interval)`` are enqueued on the job
+queue (see ``app.core.jobs``) every ``interval`` seconds by the scheduler
+thread, so they run on the workers with the usual retries. The scheduler
+only decides when; what a job does must be safe to repeat, as with a run
+overlapping the next, or SCHEDULER_ENABLED set on more than the one process
+meant to run the scheduler (it is off by default). With the memory job
+backend the scheduler only runs in processes running the job worker too,
+see app.core.lifespan.
+"""
+
+import threading
+import time
+from logging import getLogger
+from typing import Dict, Optional
+
+from app.core import jobs
+
+logger = getLogger(__name__)
+
+# Job name -> interval in seconds
+_periodic: Dict[str, float] = {}
+
+
+def periodic(name: str, interval: float) -> None:
+    """Enqueue the job with the given name every ``interval`` seconds."""
+    _periodic[name] = interval
+
+
+class Scheduler:
+    """Background thread enqueuing the periodic jobs when they are due."""
+
+    def __init__(self, tick: float = 1.0):
+        self.tick = tick
+        self._next_run: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_pending(self) -> int:
+        """Enqueue the jobs that are due, returns how many were enqueued."""
+        now = time.monotonic()
+        enqueued = 0
+        for name in list(_periodic):
+            # First run right after start, then every interval
+            if self._next_run.get(name, now) > now:
+                continue
+            self._next_run[name] = now + _periodic[name]
+            try:
+                jobs.enqueue(name)
+                enqueued += 1
+            except Exception as e:
+                logger.error(f"Could not enqueue periodic job {name}: {e}")
+        return enqueued
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(self.tick)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,47 @@
+"""
+Fast JSON responses for large lists.
+
+FastAPI validates a handler's return value against ``response_model`` and
+then converts it with ``jsonable_encoder`` before ``json.dumps``. When the
+handler already built the response models, that second validation is
+redundant, so list endpoints hand their result to ``json_response``, which
+serializes it in one pass with the pydantic-core serializer of the response
+type.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def json_response(
+    response_type: Any,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Serialize already validated content as ``response_type``.
+
+    Args:
+        response_type: Type declared as the endpoint's response_model
+        content: Instances of response_type
+        status_code: HTTP status of the response
+        headers: Extra response headers
+
+    Returns:
+        Response carrying the JSON bytes
+    """
+    return Response(
+        content=type_adapter(response_type).dump_json(content, by_alias=True),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
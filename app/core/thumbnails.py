@@ -0,0 +1,253 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from io import BytesIO
+from logging import getLogger
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from app.core import etag
+from app.core.cache import MISSING, LRUCache
+from app.core.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional, thumbnails are skipped without it
+    Image = None
+    ImageOps = None
+
+logger = getLogger(__name__)
+
+# Formats generated for every source image
+THUMBNAIL_FORMATS = {"jpg": "JPEG", "webp": "WEBP"}
+DEFAULT_FORMAT = "webp"
+
+# sha1 of source reference -> content hash, only successful lookups are kept.
+# The files under THUMBNAIL_REF_DIR hold the evicted ones.
+_ref_index = LRUCache(settings.THUMBNAIL_REF_CACHE_SIZE, float("inf"))
+
+_THUMBNAIL_NAME = re.compile(r"^([0-9a-f]{64})\.(\w+)$")
+
+if not settings.SECRET_KEY:
+    logger.warning("SECRET_KEY is not set, thumbnail URLs only work in this process")
+_signing_key = settings.SECRET_KEY.encode() or os.urandom(32)
+
+
+def ensure_thumbnail_dir() -> str:
+    """Create the thumbnail cache directories if needed and return the thumbnail one."""
+    os.makedirs(settings.THUMBNAIL_DIR, exist_ok=True)
+    os.makedirs(settings.THUMBNAIL_REF_DIR, exist_ok=True)
+    # The index used to live inside the thumbnail tree
+    legacy_dir = os.path.join(settings.THUMBNAIL_DIR, "refs")
+    if os.path.isdir(legacy_dir):
+        for name in os.listdir(legacy_dir):
+            os.replace(os.path.join(legacy_dir, name), _ref_path(name))
+        os.rmdir(legacy_dir)
+    return settings.THUMBNAIL_DIR
+
+
+def _ref_key(ref: str) -> str:
+    return hashlib.sha1(ref.encode("utf-8")).hexdigest()
+
+
+def _ref_path(ref_key: str) -> str:
+    return os.path.join(settings.THUMBNAIL_REF_DIR, ref_key)
+
+
+def _thumbnail_path(content_hash: str, ext: str) -> str:
+    return os.path.join(
+        settings.THUMBNAIL_DIR, content_hash[:2], f"{content_hash}.{ext}"
+    )
+
+
+def _allowed_host(url: str) -> bool:
+    allowed = {
+        host.strip().lower()
+        for host in settings.THUMBNAIL_ALLOWED_HOSTS.split(",")
+        if host.strip()
+    }
+    return (urlsplit(url).hostname or "").lower() in allowed
+
+
+class _AllowedHostsRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Only follow redirects to the allowed hosts."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not _allowed_host(newurl):
+            raise urllib.error.URLError(f"redirect to a host not allowed: {newurl}")
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_AllowedHostsRedirectHandler)
+
+
+def _media_path(ref: str) -> Optional[str]:
+    """Resolved path of a file under MEDIA_DIR, None for any other path."""
+    media_dir = os.path.realpath(settings.MEDIA_DIR)
+    path = os.path.realpath(ref)
+    if os.path.commonpath([media_dir, path]) != media_dir or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _load_source(ref: str) -> Optional[bytes]:
+    """
+    Read the original image bytes, at most THUMBNAIL_MAX_SOURCE_BYTES.
+
+    Image references come from the public registration form, so only data
+    URIs, files under MEDIA_DIR and URLs on THUMBNAIL_ALLOWED_HOSTS are read.
+    """
+    max_bytes = settings.THUMBNAIL_MAX_SOURCE_BYTES
+    if ref.startswith("data:"):
+        _, _, encoded = ref.partition(",")
+        # Base64 takes 4 characters for 3 bytes
+        if len(encoded) > (max_bytes + 2) // 3 * 4:
+            logger.warning("Image data URI too large for a thumbnail")
+            return None
+        try:
+            return base64.b64decode(encoded)
+        except ValueError:
+            return None
+    if ref.startswith(("http://", "https://")):
+        if not _allowed_host(ref):
+            logger.warning(
+                f"Image host not allowed for thumbnails: {urlsplit(ref).hostname}"
+            )
+            return None
+        try:
+            with _opener.open(
+                ref, timeout=settings.THUMBNAIL_FETCH_TIMEOUT
+            ) as response:
+                data = response.read(max_bytes + 1)
+        except OSError as e:
+            logger.warning(f"Could not fetch image for thumbnail: {e}")
+            return None
+        if len(data) > max_bytes:
+            logger.warning("Remote image too large for a thumbnail")
+            return None
+        return data
+    path = _media_path(ref)
+    if path is None or os.path.getsize(path) > max_bytes:
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def generate_thumbnails(ref: str) -> Optional[str]:
+    """
+    Generate the fixed-size JPEG and WebP thumbnails for an image reference.
+
+    Thumbnails are cached on disk keyed by the SHA-256 of the image content,
+    so the same picture uploaded twice is only processed once.
+
+    Args:
+        ref: Data URI, URL or media path of the original image
+
+    Returns:
+        The content hash of the image, or None if it could not be processed
+    """
+    if not ref or Image is None:
+        return None
+
+    data = _load_source(ref)
+    if not data:
+        return None
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    ensure_thumbnail_dir()
+    os.makedirs(os.path.dirname(_thumbnail_path(content_hash, "jpg")), exist_ok=True)
+
+    missing = {
+        ext: fmt
+        for ext, fmt in THUMBNAIL_FORMATS.items()
+        if not os.path.exists(_thumbnail_path(content_hash, ext))
+    }
+    if missing:
+        try:
+            with Image.open(BytesIO(data)) as img:
+                img = ImageOps.exif_transpose(img).convert("RGB")
+                img.thumbnail((settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE))
+                for ext, fmt in missing.items():
+                    # Write to a temporary name first so readers never see partial files
+                    path = _thumbnail_path(content_hash, ext)
+                    tmp_path = f"{path}.tmp"
+                    img.save(tmp_path, format=fmt, quality=80)
+                    os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not generate thumbnail: {e}")
+            return None
+
+    ref_key = _ref_key(ref)
+    with open(_ref_path(ref_key), "w") as f:
+        f.write(content_hash)
+    _ref_index.set(ref_key, content_hash)
+    # Listings returning thumbnail URLs change
+    etag.bump("thumbnails")
+    return content_hash
+
+
+def generate_for_refs(refs: Iterable[str]) -> None:
+    """Generate thumbnails for several image references, skipping failures."""
+    for ref in refs:
+        try:
+            generate_thumbnails(ref)
+        except Exception as e:
+            logger.error(f"Thumbnail generation failed: {e}")
+
+
+def _signature(filename: str, expires: int) -> str:
+    message = f"{filename}:{expires}".encode()
+    return hmac.new(_signing_key, message, hashlib.sha256).hexdigest()
+
+
+def thumbnail_url(ref: str, fmt: str = DEFAULT_FORMAT) -> Optional[str]:
+    """
+    Get the signed URL of the thumbnail generated for an image reference.
+
+    The expiry is rounded up to a multiple of THUMBNAIL_URL_TTL, so the URL
+    stays the same, and listing responses stay cacheable, within a period.
+
+    Returns None while the thumbnail has not been generated yet.
+    """
+    if not ref:
+        return None
+    ref_key = _ref_key(ref)
+    content_hash = _ref_index.get(ref_key)
+    if content_hash is MISSING:
+        try:
+            with open(_ref_path(ref_key)) as f:
+                content_hash = f.read().strip()
+        except OSError:
+            return None
+        _ref_index.set(ref_key, content_hash)
+    filename = f"{content_hash}.{fmt}"
+    ttl = settings.THUMBNAIL_URL_TTL
+    expires = (int(time.time()) // ttl + 2) * ttl
+    prefix = settings.THUMBNAIL_URL_PREFIX.rstrip("/")
+    return (
+        f"{prefix}/{content_hash[:2]}/{filename}"
+        f"?expires={expires}&signature={_signature(filename, expires)}"
+    )
+
+
+def signed_thumbnail_path(filename: str, expires: int, signature: str) -> Optional[str]:
+    """
+    Path of the thumbnail a signed URL points to.
+
+    Returns:
+        None if the signature is wrong or expired, or there is no such thumbnail
+    """
+    match = _THUMBNAIL_NAME.match(filename)
+    if match is None or match.group(2) not in THUMBNAIL_FORMATS:
+        return None
+    if expires < time.time():
+        return None
+    if not hmac.compare_digest(signature, _signature(filename, expires)):
+        return None
+    path = _thumbnail_path(match.group(1), match.group(2))
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,192 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from logging import getLogger
+from typing import Dict, List, Optional
+import uuid
+
+from sqlalchemy import delete, insert, literal, select, text
+from sqlalchemy.orm import Query, Session
+
+from app.core import etag
+from app.core.config import settings
+from app.models.archive import (
+    CourseRegistrationArchive,
+    ExamResultArchive,
+    HealthCheckDocumentArchive,
+    PaymentArchive,
+    ScheduleArchive,
+)
+from app.models.course import Course
+from app.models.course_registration import CourseRegistration
+from app.models.exam import Exam
+from app.models.exam_result import ExamResult
+from app.models.health_check_document import HealthCheckDocument
+from app.models.health_check_schedule import HealthCheckSchedule
+from app.models.payment import Payment
+from app.models.schedule import Schedule
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ArchivedTable:
+    model: type
+    archive: type
+    # Column holding the course id of a row, possibly on a joined table
+    course_column: object
+    join: Optional[tuple] = None
+
+    def select_ids(self, course_id: uuid.UUID):
+        query = select(self.model.id)
+        if self.join:
+            query = query.join(*self.join)
+        return query.where(self.course_column == course_id)
+
+
+# In the order rows are deleted from the hot tables: payments reference
+# course registrations
+ARCHIVED_TABLES: List[ArchivedTable] = [
+    ArchivedTable(
+        Payment,
+        PaymentArchive,
+        CourseRegistration.course_id,
+        (CourseRegistration, Payment.course_registration_id == CourseRegistration.id),
+    ),
+    ArchivedTable(CourseRegistration, CourseRegistrationArchive, CourseRegistration.course_id),
+    ArchivedTable(
+        ExamResult, ExamResultArchive, Exam.course_id, (Exam, ExamResult.exam_id == Exam.id)
+    ),
+    ArchivedTable(
+        HealthCheckDocument,
+        HealthCheckDocumentArchive,
+        HealthCheckSchedule.course_id,
+        (HealthCheckSchedule, HealthCheckDocument.health_check_id == HealthCheckSchedule.id),
+    ),
+    ArchivedTable(Schedule, ScheduleArchive, Schedule.course_id),
+]
+
+ARCHIVE_TABLE_NAMES = tuple(t.archive.__tablename__ for t in ARCHIVED_TABLES)
+
+
+def ensure_partitions(db: Session, year: int) -> None:
+    """Create the archive partitions of a course start year (PostgreSQL only)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ARCHIVE_TABLE_NAMES:
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {table}_y{year} "
+                f"PARTITION OF {table} FOR VALUES IN ({year})"
+            )
+        )
+
+
+def archive_course(db: Session, course: Course) -> Dict[str, int]:
+    """
+    Move the rows of a course from the hot tables to the archive tables.
+
+    Rows are copied with INSERT ... SELECT and deleted in the same
+    transaction, then the course is marked archived.
+
+    Args:
+        db: Database session
+        course: Course to archive
+
+    Returns:
+        Number of rows moved per hot table
+    """
+    year = course.start_date.year
+    archived_at = datetime.utcnow()
+    ensure_partitions(db, year)
+
+    moved = {}
+    for table in ARCHIVED_TABLES:
+        hot_columns = [column.name for column in table.model.__table__.columns]
+        values = [table.model.__table__.c[name] for name in hot_columns]
+        names = list(hot_columns)
+        if "course_id" not in names:
+            values.append(table.course_column)
+            names.append("course_id")
+        source = select(
+            *values, literal(year).label("course_year"), literal(archived_at).label("archived_at")
+        )
+        if table.join:
+            source = source.join(*table.join)
+        source = source.where(table.course_column == course.id)
+        db.execute(
+            insert(table.archive).from_select(names + ["course_year", "archived_at"], source)
+        )
+
+    for table in ARCHIVED_TABLES:
+        result = db.execute(
+            delete(table.model)
+            .where(table.model.id.in_(table.select_ids(course.id)))
+            .execution_options(synchronize_session=False)
+        )
+        moved[table.model.__tablename__] = result.rowcount
+
+    course.archived_at = archived_at
+    return moved
+
+
+def get_archivable_courses(db: Session, completed_before: date, limit: int) -> List[Course]:
+    return (
+        db.query(Course)
+        .filter(Course.end_date < completed_before, Course.archived_at.is_(None))
+        .order_by(Course.end_date)
+        .limit(limit)
+        .all()
+    )
+
+
+def archive_completed_courses(
+    db: Session,
+    completed_before: Optional[date] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Archive the courses that ended before ``completed_before``, one
+    transaction per course.
+
+    Args:
+        db: Database session
+        completed_before: Defaults to ARCHIVE_AFTER_DAYS days ago
+        limit: Maximum number of courses, defaults to ARCHIVE_BATCH_SIZE
+
+    Returns:
+        Number of courses archived and of rows moved per hot table
+    """
+    completed_before = completed_before or date.today() - timedelta(
+        days=settings.ARCHIVE_AFTER_DAYS
+    )
+    courses = get_archivable_courses(
+        db, completed_before, limit or settings.ARCHIVE_BATCH_SIZE
+    )
+
+    totals = {"courses": 0}
+    for course in courses:
+        moved = archive_course(db, course)
+        db.commit()
+        # INSERT ... FROM SELECT is not seen by the ETag session hooks
+        etag.bump(*ARCHIVE_TABLE_NAMES)
+        logger.info(f"Archived course {course.id}: {moved}")
+        totals["courses"] += 1
+        for table, count in moved.items():
+            totals[table] = totals.get(table, 0) + count
+    return totals
+
+
+def paginate_with_history(
+    hot: Query, archive: Optional[Query], skip: int, limit: int
+) -> list:
+    """
+    Page through the hot rows followed by the archived ones. Without an
+    archive query (history not requested) only the hot table is read.
+    """
+    rows = hot.offset(skip).limit(limit).all()
+    if archive is None or len(rows) >= limit:
+        return rows
+    # Hot rows are exhausted, count them only when the page started past them
+    hot_total = skip + len(rows) if rows else hot.count()
+    archive_skip = max(0, skip - hot_total)
+    return rows + archive.offset(archive_skip).limit(limit - len(rows)).all()
@@ -1,16 +1,27 @@
 from sqlalchemy.orm import Session, joinedload
+from app.core import cache
+from app.core.fields import Fields, loader_options
 from app.models.course import Course
 from app.schemas.course import CourseCreate, CourseUpdate, CourseList
 import uuid
 from datetime import date
+from logging import getLogger
+
+logger = getLogger(__name__)
 
 
 def get_course(db: Session, course_id: uuid.UUID):
     return db.query(Course).filter(Course.id == course_id).first()
 
 
-def get_courses(db: Session, skip: int = 0, limit: int = 100):
-    courses = db.query(Course).offset(skip).limit(limit).all()
+def get_courses(db: Session, skip: int = 0, limit: int = 100, fields: Fields = None):
+    courses = (
+        db.query(Course)
+        .options(*loader_options(Course, fields))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
     total = db.query(Course).count()
     return {"items": courses, "total": total}
 
@@ -32,6 +43,7 @@ def create_course(db: Session, course_in: CourseCreate):
     db.add(course)
     db.commit()
     db.refresh(course)
+    cache.active_courses.invalidate()
     return course
 
 
@@ -55,9 +67,6 @@ def update_course(db: Session, course_id: uuid.UUID, course_in: CourseUpdate):
     if course is None:
         return None
 
-    # Debug information
-    print(f"Original course data: {course.__dict__}")
-
     # Get only the fields that were explicitly set (not None)
     # In Pydantic v2, model_dump properly handles Optional fields
     try:
@@ -67,14 +76,14 @@ def update_course(db: Session, course_id: uuid.UUID, course_in: CourseUpdate):
             if value is not None:
                 update_data[key] = value
 
-        print(f"Fields to update: {update_data}")
+        logger.debug(f"Fields to update for course {course_id}: {list(update_data)}")
     except Exception as e:
-        print(f"Error during model_dump: {e}")
+        logger.warning(f"Error during model_dump: {e}")
         raise ValueError(f"Error processing update data: {e}")
 
     # If empty after filtering None values, return the course without changes
     if not update_data:
-        print("No fields to update (all were None or unset)")
+        logger.debug("No fields to update (all were None or unset)")
         return course
 
     # Date validations
@@ -105,11 +114,12 @@ def update_course(db: Session, course_id: uuid.UUID, course_in: CourseUpdate):
         db.add(course)
         db.commit()
         db.refresh(course)
-        print(f"Course updated successfully: {course.__dict__}")
+        cache.active_courses.invalidate()
+        logger.info(f"Course {course_id} updated")
         return course
     except Exception as e:
         db.rollback()
-        print(f"Database error during update: {e}")
+        logger.error(f"Database error during update of course {course_id}: {e}")
         raise ValueError(f"Database error: {e}")
 
 
@@ -137,6 +147,7 @@ def delete_course(db: Session, course_id: uuid.UUID) -> bool:
         # Store any data needed for the response
         result = db.query(Course).filter(Course.id == course_id).delete()
         db.commit()
+        cache.active_courses.invalidate()
         return result > 0
     except Exception as e:
         db.rollback()
@@ -1,11 +1,14 @@
-from venv import logger
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, load_only
 import uuid
-from datetime import datetime
-from typing import Dict, Any
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Any, Optional
 
+from app.core.fields import Fields, trimmed_model, wants
+from app.core.thumbnails import thumbnail_url
 from app.crud.health_check_document import create_health_check_document
+from app.crud.health_check_schedule import has_capacity
 from app.crud.personal_infor_document import create as create_personal_info
 from app.crud.student import create_student
 from app.crud.user import create_user
@@ -56,7 +59,21 @@ def create_course_registration(
 
     Returns:
         dict: A dictionary containing the status code and success message
+
+    Raises:
+        HTTPException: 409 if the chosen health check slot is full or the
+            registration conflicts with existing data
     """
+    # Fail before creating any record when the slot is already full, the
+    # place itself is taken atomically with the health check document
+    if not has_capacity(db, course_registration.health_check_schedule_id):
+        raise HTTPException(
+            status_code=409,
+            detail="This health check schedule is full or no longer open for booking",
+        )
+
+    # Every record is only flushed, so nothing is left behind when the slot
+    # turns out to be full or any insert fails: all are committed at the end
     try:
         # Create related records
         user = _create_user_for_registration(db, course_registration)
@@ -68,7 +85,7 @@ def create_course_registration(
 
         # Determine registration method based on current user role
         method = _determine_registration_method(course_registration.role)
-        logger.info(f"Registration method determined: {method}")
+        logger.debug(f"Registration method determined: {method}")
         # Create course registration
         db_course_registration = CourseRegistration(
             id=uuid.uuid4(),
@@ -95,6 +112,16 @@ def create_course_registration(
             "message": "Course registration created successfully.",
             "registration_id": str(db_course_registration.id),
         }
+    except HTTPException:
+        db.rollback()
+        raise
+    except IntegrityError:
+        # Usually a form submitted twice without an Idempotency-Key
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Registration conflicts with existing data, the email may already be registered",
+        )
     except Exception as e:
         db.rollback()
         logger.error(f"Error creating course registration: {str(e)}")
@@ -121,13 +148,13 @@ def _create_user_for_registration(
         password=course_registration.identity_number,
         role=ROLE_USER,
     )
-    return create_user(db, new_user)
+    return create_user(db, new_user, commit=False)
 
 
 def _create_student_for_registration(db: Session, user_id: uuid.UUID):
     """Create a new student record linked to the user"""
     # Create StudentCreate without user_id and pass it separately
-    return create_student(db, StudentCreate(user_id=user_id))
+    return create_student(db, StudentCreate(user_id=user_id), commit=False)
 
 
 def _create_personal_information(
@@ -147,6 +174,7 @@ def _create_personal_information(
             identity_img_front=course_registration.identity_image_front,
             avatar=course_registration.avatar,
         ),
+        commit=False,
     )
 
 
@@ -154,7 +182,7 @@ def _create_health_check_document(
     db: Session, student_id: str, course_registration: CourseRegistrationCreate
 ):
     """Create health check document for the student"""
-    logger.info(f"Creating health check document for student ID: {student_id}")
+    logger.debug(f"Creating health check document for student ID: {student_id}")
     return create_health_check_document(
         db,
         HealthCheckDocumentCreate(
@@ -163,13 +191,14 @@ def _create_health_check_document(
             status=STATUS_REGISTERED,
             document="",
         ),
+        commit=False,
     )
 
 
 def _determine_registration_method(role: str) -> str:
     """Determine registration method based on user role"""
     # Add debug logging to see the exact role value
-    logger.info(f"Determining method for role: '{role}'")
+    logger.debug(f"Determining method for role: '{role}'")
     
     # Make comparison case-insensitive and strip whitespace
     normalized_role = role.lower().strip() if role else ""
@@ -178,11 +207,23 @@ def _determine_registration_method(role: str) -> str:
     is_admin = normalized_role == normalized_admin
     method = METHOD_OFFLINE if is_admin else METHOD_ONLINE
     
-    logger.info(f"Role comparison: '{normalized_role}' == '{normalized_admin}' = {is_admin}, Method: {method}")
+    logger.debug(f"Role comparison: '{normalized_role}' == '{normalized_admin}' = {is_admin}, Method: {method}")
     
     return method
 
 
+def course_registration_exists(db: Session, course_registration_id: uuid.UUID) -> bool:
+    """
+    Whether a course registration exists, as a single EXISTS on the primary
+    key without loading the registration or its related records.
+    """
+    return db.query(
+        db.query(CourseRegistration.id)
+        .filter(CourseRegistration.id == course_registration_id)
+        .exists()
+    ).scalar()
+
+
 def get_course_registration_by_id(
     db: Session, course_registration_id: uuid.UUID
 ) -> CourseRegistrationSchema:
@@ -316,16 +357,65 @@ def get_course_registration_by_identity_number(
     return get_course_registration_by_id(db, course_registration.id)
 
 
+def _image_for_listing(image: str, thumbnail: bool) -> str:
+    """Return the thumbnail URL of an image when requested and available"""
+    if not image:
+        return ""
+    if thumbnail:
+        return thumbnail_url(image) or image
+    return image
+
+
+def _format_datetime(value, fmt: str) -> str:
+    """Format a date/datetime column that may still be stored as a string"""
+    if isinstance(value, str):
+        return value
+    return value.strftime(fmt) if value else ""
+
+
+def _created_between(model, created_from: Optional[date], created_to: Optional[date]):
+    """Half-open created_at range covering whole days, usable by its index"""
+    conditions = []
+    if created_from:
+        conditions.append(model.created_at >= datetime.combine(created_from, time.min))
+    if created_to:
+        conditions.append(
+            model.created_at < datetime.combine(created_to + timedelta(days=1), time.min)
+        )
+    return conditions
+
+
 def get_all_course_registrations(
-    db: Session, type: str, status: str, skip: int = 0, limit: int = 100
+    db: Session,
+    type: str,
+    status: str,
+    skip: int = 0,
+    limit: int = 100,
+    thumbnail: bool = False,
+    fields: Fields = None,
+    include_history: bool = False,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    newest_first: bool = False,
 ) -> list[CourseRegistrationSchema]:
     """
     Get all course registrations with pagination.
 
+    Related rows are loaded with one query per table for the whole page.
+    Rows only needed for studentInfor or scheduleInfor are not queried when
+    those fields are left out of ``fields``.
+
     Args:
         db: SQLAlchemy database session
         skip: Number of records to skip (for pagination)
         limit: Maximum number of records to return
+        thumbnail: Return thumbnail URLs instead of the original images
+        fields: CourseRegistrationResponse fields to return, all when None
+        include_history: Also return registrations of archived courses,
+            after the current ones
+        created_from: Only registrations created on or after this day
+        created_to: Only registrations created on or before this day
+        newest_first: Order by registration date, newest first
 
     Returns:
         list[CourseRegistrationResponse]: List of course registration response records
@@ -343,181 +433,205 @@ def get_all_course_registrations(
     )
     from app.models.schedule import Schedule
     from app.models.license_type import LicenseType
-
-    db_course_registrations = (
-        db.query(CourseRegistration)
-        .filter((CourseRegistration.method == type if type != "all" else True))
-        .filter((CourseRegistration.status == status if status != "all" else True))
-        .offset(skip)
-        .limit(limit)
-        .all()
+    from app.models.archive import (
+        CourseRegistrationArchive,
+        HealthCheckDocumentArchive,
+        ScheduleArchive,
     )
-    print(f"db_course_registrations: {len(db_course_registrations)}")
-    result = []
+    from app.crud.archive import paginate_with_history
+
+    with_student = wants(fields, "studentInfor")
+    with_schedules = wants(fields, "scheduleInfor")
+
+    def registrations(model):
+        student_load = joinedload(model.student)
+        options = [
+            student_load.joinedload(Student.user) if with_student else student_load,
+            joinedload(model.course),
+        ]
+        if fields is not None:
+            options.append(
+                load_only(
+                    model.method,
+                    model.status,
+                    model.created_at,
+                    model.student_id,
+                    model.course_id,
+                )
+            )
+        query = (
+            db.query(model)
+            .options(*options)
+            .filter((model.method == type if type != "all" else True))
+            .filter((model.status == status if status != "all" else True))
+            .filter(*_created_between(model, created_from, created_to))
+        )
+        if newest_first:
+            query = query.order_by(model.created_at.desc())
+        return query
+
+    db_course_registrations = paginate_with_history(
+        registrations(CourseRegistration),
+        registrations(CourseRegistrationArchive) if include_history else None,
+        skip,
+        limit,
+    )
+    logger.debug(f"Fetched {len(db_course_registrations)} course registrations")
+
+    students = [r.student for r in db_course_registrations if r.student]
+    courses = {r.course.id: r.course for r in db_course_registrations if r.course}
+
+    # Batch-load the related rows of the whole page, keeping the first row
+    # per key like the former per-registration .first() lookups
+    schedules_by_course: Dict[Any, list] = {}
+    if courses and with_schedules:
+        for model in (Schedule, ScheduleArchive) if include_history else (Schedule,):
+            for schedule in db.query(model).filter(model.course_id.in_(list(courses))):
+                schedules_by_course.setdefault(schedule.course_id, []).append(schedule)
+
+    personal_info_by_user: Dict[Any, PersonalInforDocument] = {}
+    user_ids = {s.user_id for s in students if s.user_id}
+    if user_ids:
+        # Registrations without personal information are skipped, so their
+        # existence is checked even when studentInfor is not requested
+        personal_info_query = db.query(PersonalInforDocument)
+        if not with_student:
+            personal_info_query = personal_info_query.options(
+                load_only(PersonalInforDocument.user_id)
+            )
+        for doc in personal_info_query.filter(
+            PersonalInforDocument.user_id.in_(list(user_ids))
+        ):
+            personal_info_by_user.setdefault(doc.user_id, doc)
+
+    health_check_doc_by_student: Dict[Any, HealthCheckDocumentModel] = {}
+    if students and with_student:
+        health_check_models = (
+            (HealthCheckDocumentModel, HealthCheckDocumentArchive)
+            if include_history
+            else (HealthCheckDocumentModel,)
+        )
+        for model in health_check_models:
+            for doc in (
+                db.query(model)
+                .options(joinedload(model.health_check))
+                .filter(model.student_id.in_([s.id for s in students]))
+            ):
+                health_check_doc_by_student.setdefault(doc.student_id, doc)
+
+    license_types: Dict[Any, LicenseType] = {}
+    license_type_ids = {c.license_type_id for c in courses.values() if c.license_type_id}
+    if license_type_ids and (with_student or with_schedules):
+        license_types = {
+            lt.id: lt
+            for lt in db.query(LicenseType).filter(
+                LicenseType.id.in_(list(license_type_ids))
+            )
+        }
 
+    result = []
     for registration in db_course_registrations:
-        # Get associated data
         student = registration.student
         course = registration.course
-        schedules = (
-            db.query(Schedule).filter(Schedule.course_id == course.id).all()
-            if course
-            else []
+        personal_info = (
+            personal_info_by_user.get(student.user_id)
+            if student and student.user_id
+            else None
         )
-
-        # Get personal information
-        personal_info = None
-        if student and student.user_id:
-            personal_info = (
-                db.query(PersonalInforDocument)
-                .filter(PersonalInforDocument.user_id == student.user_id)
-                .first()
-            )
-
-        # Get health check document
-        health_check_doc = None
-        if student:
-            health_check_doc = (
-                db.query(HealthCheckDocumentModel)
-                .filter(HealthCheckDocumentModel.student_id == student.id)
-                .first()
-            )
+        health_check_doc = health_check_doc_by_student.get(student.id) if student else None
 
         if not personal_info or not student or not course:
             logger.warning(f"Missing related data for registration {registration.id}")
             continue
 
-        # Get license type
-        license_type = (
-            db.query(LicenseType)
-            .filter(LicenseType.id == course.license_type_id)
-            .first()
-            if course
-            else None
-        )
-        # Build personal data
-        personal_data = CoursePersonalData(
-            name=personal_info.full_name,
-            identityNumber=personal_info.identity_number,
-            address=personal_info.address,
-            phone=student.user.phone_number if student.user else "",
-            gender=personal_info.gender,
-            birthDate=personal_info.date_of_birth,  # date_of_birth is already a string
-            licenseType=license_type.type_name if license_type else "",
-            email=student.user.email if student.user else "",
-            healthCheckDocURL=health_check_doc.document if health_check_doc else "",
-        )
+        license_type = license_types.get(course.license_type_id)
+        health_check = health_check_doc.health_check if health_check_doc else None
+
+        student_info = None
+        if with_student:
+            # Build personal data
+            personal_data = CoursePersonalData(
+                name=personal_info.full_name,
+                identityNumber=personal_info.identity_number,
+                address=personal_info.address,
+                phone=student.user.phone_number if student.user else "",
+                gender=personal_info.gender,
+                birthDate=_format_datetime(personal_info.date_of_birth, "%Y-%m-%d"),
+                licenseType=license_type.type_name if license_type else "",
+                email=student.user.email if student.user else "",
+                healthCheckDocURL=health_check_doc.document if health_check_doc else "",
+            )
 
-        # Build personal image data
-        personal_img_data = PersonalImgData(
-            avatar=personal_info.avatar if personal_info else "",
-            cardImgFront=personal_info.identity_img_front if personal_info else "",
-            cardImgBack=personal_info.identity_img_back if personal_info else "",
-        )
+            # Build personal image data
+            personal_img_data = PersonalImgData(
+                avatar=_image_for_listing(personal_info.avatar, thumbnail),
+                cardImgFront=_image_for_listing(personal_info.identity_img_front, thumbnail),
+                cardImgBack=_image_for_listing(personal_info.identity_img_back, thumbnail),
+            )
 
-        # Build course data
-        course_data = CourseType(
-            id=str(course.id),
-            name=course.course_name,
-            licenseTypeId=str(course.license_type_id),
-            examDate=course.end_date.strftime("%Y-%m-%d") if course.end_date else "",
-            startDate=(
-                course.start_date.strftime("%Y-%m-%d") if course.start_date else ""
-            ),
-            endDate=course.end_date.strftime("%Y-%m-%d") if course.end_date else "",
-            registeredCount=(
-                course.registered_count if hasattr(course, "registered_count") else 0
-            ),
-            maxStudents=course.max_students if hasattr(course, "max_students") else 0,
-        )
+            # Build course data
+            course_data = CourseType(
+                id=str(course.id),
+                name=course.course_name,
+                licenseTypeId=str(course.license_type_id),
+                examDate=_format_datetime(course.end_date, "%Y-%m-%d"),
+                startDate=_format_datetime(course.start_date, "%Y-%m-%d"),
+                endDate=_format_datetime(course.end_date, "%Y-%m-%d"),
+                registeredCount=(
+                    course.registered_count if hasattr(course, "registered_count") else 0
+                ),
+                maxStudents=course.max_students if hasattr(course, "max_students") else 0,
+            )
 
-        # Build health check data
-        health_check_data = HealthCheckType(
-            id=str(health_check_doc.health_check_id) if health_check_doc else "",
-            name=(
-                health_check_doc.health_check.description
-                if health_check_doc and hasattr(health_check_doc, "health_check")
-                else ""
-            ),
-            date=(
-                health_check_doc.health_check.scheduled_datetime
-                if isinstance(health_check_doc.health_check.scheduled_datetime, str)
-                else (
-                    health_check_doc.health_check.scheduled_datetime.strftime(
-                        "%Y-%m-%d"
-                    )
-                    if health_check_doc
-                    and hasattr(health_check_doc, "health_check")
-                    and health_check_doc.health_check.scheduled_datetime
+            # Build health check data
+            health_check_data = HealthCheckType(
+                id=str(health_check_doc.health_check_id) if health_check_doc else "",
+                name=health_check.description if health_check else "",
+                date=(
+                    _format_datetime(health_check.scheduled_datetime, "%Y-%m-%d")
+                    if health_check
                     else ""
-                )
-            ),
-            address=(
-                health_check_doc.health_check.address
-                if health_check_doc and hasattr(health_check_doc, "health_check")
-                else ""
-            ),
-            courseId=str(course.id),
-        )
-
-        # Build choose data
-        choose_data = ChooseData(course=course_data, healthCheck=health_check_data)
+                ),
+                address=health_check.address if health_check else "",
+                courseId=str(course.id),
+            )
 
-        # Build student info
-        student_info = CourseStudent(
-            personalData=personal_data,
-            personalImgData=personal_img_data,
-            chooseData=choose_data,
-        )
+            # Build choose data
+            choose_data = ChooseData(course=course_data, healthCheck=health_check_data)
 
-        # Build schedule info
-        schedule_info = []
-        for schedule in schedules:
-            license_type_obj = (
-                db.query(LicenseType)
-                .filter(LicenseType.id == course.license_type_id)
-                .first()
-                if course
-                else None
+            # Build student info
+            student_info = CourseStudent(
+                personalData=personal_data,
+                personalImgData=personal_img_data,
+                chooseData=choose_data,
             )
 
-            schedule_info.append(
+        schedule_info = None
+        if with_schedules:
+            # Build schedule info
+            type_of_license = TypeOfLicense(
+                id=str(license_type.id) if license_type else "",
+                name=license_type.type_name if license_type else "",
+            )
+            schedule_info = [
                 ScheduleType(
                     id=str(schedule.id),
                     courseId=str(schedule.course_id),
-                    typeOfLicense=TypeOfLicense(
-                        id=str(license_type_obj.id) if license_type_obj else "",
-                        name=license_type_obj.type_name if license_type_obj else "",
-                    ),
-                    type=schedule.type if hasattr(schedule, "type") else "",
-                    startTime=(
-                        schedule.start_time.strftime("%Y-%m-%d %H:%M:%S")
-                        if hasattr(schedule, "start_time") and schedule.start_time
-                        else ""
-                    ),
-                    endTime=(
-                        schedule.end_time.strftime("%Y-%m-%d %H:%M:%S")
-                        if hasattr(schedule, "end_time") and schedule.end_time
-                        else ""
-                    ),
-                    location=schedule.location if hasattr(schedule, "location") else "",
-                    teacher=schedule.teacher if hasattr(schedule, "teacher") else None,
+                    typeOfLicense=type_of_license,
+                    type=schedule.type or "",
+                    startTime=_format_datetime(schedule.start_time, "%Y-%m-%d %H:%M:%S"),
+                    endTime=_format_datetime(schedule.end_time, "%Y-%m-%d %H:%M:%S"),
+                    location=schedule.location or "",
+                    teacher=None,
                 )
-            )
+                for schedule in schedules_by_course.get(course.id, [])
+            ]
 
         # Create response object
-        response_obj = CourseRegistrationResponse(
+        values = dict(
             id=registration.id,
             method=registration.method,
-            registrationDate=(
-                registration.created_at
-                if isinstance(registration.created_at, str)
-                else (
-                    registration.created_at.strftime("%Y-%m-%d")
-                    if registration.created_at
-                    else ""
-                )
-            ),
+            registrationDate=_format_datetime(registration.created_at, "%Y-%m-%d"),
             status=registration.status,
             studentInfor=student_info,
             scheduleInfor=schedule_info,
@@ -525,6 +639,12 @@ def get_all_course_registrations(
             receiveDate=None,  # Not provided in the source data
             location=None,  # Not provided in the source data
         )
+        if fields is None:
+            response_obj = CourseRegistrationResponse(**values)
+        else:
+            response_obj = trimmed_model(CourseRegistrationResponse, fields)(
+                **{name: values[name] for name in fields}
+            )
 
         result.append(response_obj)
 
@@ -1,21 +1,25 @@
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 import uuid
-from datetime import date
+from datetime import date, datetime
+from typing import Dict, List
+from app.crud.health_check_schedule import book_slot, release_slot
 from app.models.health_check_document import HealthCheckDocument
+from app.models.health_check_schedule import HealthCheckSchedule
 from app.models.student import Student
 from app.schemas.health_check_document import (
     HealthCheckDocumentCreate,
     HealthCheckDocumentUpdate,
+    HealthCheckResult,
 )
 from fastapi import HTTPException, status
 import logging
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
 
 def create_health_check_document(
-    db: Session, health_check_document: HealthCheckDocumentCreate
+    db: Session, health_check_document: HealthCheckDocumentCreate, commit: bool = True
 ):
     """
     Create a new health check document in the database.
@@ -23,12 +27,16 @@ def create_health_check_document(
     Args:
         db (Session): The database session.
         health_check_document (HealthCheckDocumentCreate): The health check document to create.
+        commit (bool): Commit the document, or only flush it when the caller
+            commits a larger transaction. A full slot rolls the whole
+            transaction back either way.
 
     Returns:
         HealthCheckDocument: The created health check document.
 
     Raises:
-        HTTPException: If the student doesn't exist.
+        HTTPException: If the student doesn't exist, or 409 if the health
+            check slot has no place left.
     """
     # First validate that the student exists
     student = (
@@ -40,6 +48,9 @@ def create_health_check_document(
             detail=f"Student with ID {health_check_document.student_id} not found",
         )
 
+    # The place is taken in the same transaction as the document
+    _book(db, health_check_document.health_check_id)
+
     db_health_check_document = HealthCheckDocument(
         id=uuid.uuid4(),
         student_id=health_check_document.student_id,
@@ -49,12 +60,36 @@ def create_health_check_document(
         created_at=date.today(),  # Assuming you want to set the created_at to the current date
     )
     db.add(db_health_check_document)
-    db.commit()
-    db.refresh(db_health_check_document)
-    print(f"Created health check document: {db_health_check_document}")
+    if commit:
+        db.commit()
+        db.refresh(db_health_check_document)
+    else:
+        # Part of a larger transaction, committed by the caller
+        db.flush()
+    logger.debug(f"Created health check document {db_health_check_document.id}")
     return db_health_check_document
 
 
+def _book(db: Session, health_check_id: uuid.UUID) -> None:
+    if book_slot(db, health_check_id):
+        return
+    db.rollback()
+    exists = (
+        db.query(HealthCheckSchedule.id)
+        .filter(HealthCheckSchedule.id == health_check_id)
+        .first()
+    )
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Health check schedule with ID {health_check_id} not found",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="This health check schedule is full or no longer open for booking",
+    )
+
+
 def get_health_check_documents_by_student_id(db: Session, student_id: uuid.UUID):
     """
     Get all health check documents for a specific student.
@@ -95,9 +130,86 @@ def update_health_check_document(
         .first()
     )
     if db_health_check_document:
-        for key, value in health_check_document.dict(exclude_unset=True).items():
+        update_data = health_check_document.dict(exclude_unset=True)
+        new_health_check_id = update_data.get("health_check_id")
+        if (
+            new_health_check_id is not None
+            and new_health_check_id != db_health_check_document.health_check_id
+        ):
+            # Moving to another slot takes a place there and frees the old one
+            old_health_check_id = db_health_check_document.health_check_id
+            _book(db, new_health_check_id)
+            release_slot(db, old_health_check_id)
+        for key, value in update_data.items():
             setattr(db_health_check_document, key, value)
         db.commit()
         db.refresh(db_health_check_document)
         return db_health_check_document
     return None
+
+
+def record_health_check_results(
+    db: Session, health_check_id: uuid.UUID, results: List[HealthCheckResult]
+) -> Dict:
+    """
+    Record the results of a health check session in one UPDATE statement.
+
+    The status and document of each student's document for this health
+    check are set from CASE expressions keyed by student id; a document
+    left out of a result keeps its current value.
+
+    Args:
+        db (Session): The database session.
+        health_check_id (uuid.UUID): The ID of the health check schedule.
+        results (List[HealthCheckResult]): One result per student.
+
+    Returns:
+        dict: Summary with the number of requested and updated documents,
+            how many are checked, and the students without a document for
+            this health check.
+    """
+    statuses = {result.student_id: result.status for result in results}
+    documents = {
+        result.student_id: result.document
+        for result in results
+        if result.document is not None
+    }
+    values = {
+        "status": case(statuses, value=HealthCheckDocument.student_id),
+        "updated_at": datetime.utcnow(),
+    }
+    if documents:
+        values["document"] = case(
+            documents,
+            value=HealthCheckDocument.student_id,
+            else_=HealthCheckDocument.document,
+        )
+
+    updated = set(
+        db.execute(
+            update(HealthCheckDocument)
+            .where(
+                HealthCheckDocument.health_check_id == health_check_id,
+                HealthCheckDocument.student_id.in_(list(statuses)),
+            )
+            .values(**values)
+            .returning(HealthCheckDocument.student_id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+    db.commit()
+
+    not_found = [student_id for student_id in statuses if student_id not in updated]
+    logger.info(
+        f"Recorded {len(updated)} health check results for {health_check_id}, "
+        f"{len(not_found)} students without a document"
+    )
+    return {
+        "health_check_id": health_check_id,
+        "requested": len(statuses),
+        "updated": len(updated),
+        "checked": sum(
+            1 for student_id in updated if statuses[student_id] == "checked"
+        ),
+        "not_found": not_found,
+    }
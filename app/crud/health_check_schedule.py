@@ -1,6 +1,9 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 import uuid
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from app.core.config import settings
 from app.models.health_check_schedule import HealthCheckSchedule
 from app.schemas.health_check_schedule import (
     HealthCheckScheduleCreate,
@@ -55,6 +58,9 @@ def create_health_check_schedule(
             if hasattr(health_check_schedule_in, "status")
             else "scheduled"
         ),
+        capacity=health_check_schedule_in.capacity
+        or settings.HEALTH_CHECK_DEFAULT_CAPACITY,
+        booked_count=0,
         # Let SQLAlchemy handle id, created_at and updated_at with default values
     )
     db.add(health_check_schedule)
@@ -88,6 +94,11 @@ def update_health_check_schedule(
 
     # Extract only the fields that were provided (not None)
     update_data = schedule_in.model_dump(exclude_unset=True)
+    capacity = update_data.get("capacity")
+    if capacity is not None and capacity < db_schedule.booked_count:
+        raise ValueError(
+            f"Capacity cannot be lower than the {db_schedule.booked_count} students already booked"
+        )
 
     # Apply the updates
     for key, value in update_data.items():
@@ -100,7 +111,9 @@ def update_health_check_schedule(
 
 
 # Get all health check schedules
-def get_health_check_schedules(db: Session, skip: int = 0, limit: int = 100):
+def get_health_check_schedules(
+    db: Session, skip: int = 0, limit: int = 100, upcoming: bool = False
+):
     """
     Retrieve all health check schedules.
 
@@ -108,14 +121,20 @@ def get_health_check_schedules(db: Session, skip: int = 0, limit: int = 100):
         db: Database session
         skip: Number of records to skip (for pagination)
         limit: Maximum number of records to return
+        upcoming: Only the scheduled slots still to come, soonest first,
+            read from the (status, scheduled_datetime) index
 
     Returns:
         List of HealthCheckSchedule objects
     """
-    health_check_schedules = (
-        db.query(HealthCheckSchedule).offset(skip).limit(limit).all()
-    )
-    total = db.query(HealthCheckSchedule).count()
+    query = db.query(HealthCheckSchedule)
+    if upcoming:
+        query = query.filter(
+            HealthCheckSchedule.status == "scheduled",
+            HealthCheckSchedule.scheduled_datetime > datetime.now(),
+        ).order_by(HealthCheckSchedule.scheduled_datetime)
+    health_check_schedules = query.offset(skip).limit(limit).all()
+    total = query.order_by(None).count()
     return {"items": health_check_schedules, "total": total}
 
 
@@ -161,3 +180,142 @@ def delete_health_check_schedule(db: Session, health_check_schedule_id: uuid.UUI
     db.commit()
 
     return schedule
+
+
+def book_slot(db: Session, health_check_schedule_id: uuid.UUID) -> bool:
+    """
+    Take one place on a health check slot.
+
+    A single conditional UPDATE, so concurrent bookings cannot exceed the
+    capacity. Not committed: the caller commits it with the booking's
+    health check document.
+
+    Args:
+        db: Database session
+        health_check_schedule_id: UUID of the health check schedule
+
+    Returns:
+        False when the slot is full, past, not open for booking or does
+        not exist
+    """
+    result = db.execute(
+        update(HealthCheckSchedule)
+        .where(
+            HealthCheckSchedule.id == health_check_schedule_id,
+            HealthCheckSchedule.status == "scheduled",
+            HealthCheckSchedule.scheduled_datetime > datetime.now(),
+            HealthCheckSchedule.booked_count < HealthCheckSchedule.capacity,
+        )
+        .values(booked_count=HealthCheckSchedule.booked_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def release_slot(db: Session, health_check_schedule_id: uuid.UUID) -> None:
+    """Give back the place taken by book_slot, not committed."""
+    db.execute(
+        update(HealthCheckSchedule)
+        .where(
+            HealthCheckSchedule.id == health_check_schedule_id,
+            HealthCheckSchedule.booked_count > 0,
+        )
+        .values(booked_count=HealthCheckSchedule.booked_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def has_capacity(db: Session, health_check_schedule_id: uuid.UUID) -> bool:
+    """
+    Whether a slot can still be booked. Only a hint to fail early, the
+    place is taken by book_slot.
+    """
+    return (
+        db.query(HealthCheckSchedule.id)
+        .filter(
+            HealthCheckSchedule.id == health_check_schedule_id,
+            HealthCheckSchedule.status == "scheduled",
+            HealthCheckSchedule.scheduled_datetime > datetime.now(),
+            HealthCheckSchedule.booked_count < HealthCheckSchedule.capacity,
+        )
+        .first()
+        is not None
+    )
+
+
+def get_course_availability(db: Session, course_id: uuid.UUID) -> List:
+    """
+    Remaining places of every upcoming, bookable health check slot of a
+    course, in one query on the (course_id, scheduled_datetime) index.
+
+    Args:
+        db: Database session
+        course_id: UUID of the course
+
+    Returns:
+        Rows with id, address, scheduled_datetime, capacity, booked_count
+        and remaining, soonest first
+    """
+    return (
+        db.query(
+            HealthCheckSchedule.id,
+            HealthCheckSchedule.address,
+            HealthCheckSchedule.scheduled_datetime,
+            HealthCheckSchedule.capacity,
+            HealthCheckSchedule.booked_count,
+            (HealthCheckSchedule.capacity - HealthCheckSchedule.booked_count).label(
+                "remaining"
+            ),
+        )
+        .filter(
+            HealthCheckSchedule.course_id == course_id,
+            HealthCheckSchedule.scheduled_datetime > datetime.now(),
+            HealthCheckSchedule.status == "scheduled",
+        )
+        .order_by(HealthCheckSchedule.scheduled_datetime)
+        .all()
+    )
+
+
+def advance_health_check_statuses(
+    db: Session, now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Move health checks through their statuses by time, in two set-based
+    UPDATEs on the (status, scheduled_datetime) index.
+
+    A scheduled health check is in progress from its scheduled time and
+    completed HEALTH_CHECK_DURATION_MINUTES later; one whose whole session
+    passed unnoticed (e.g. while no worker ran) goes straight to completed.
+    Canceled health checks are left alone. Safe to run repeatedly.
+
+    Args:
+        db: Database session
+        now: Current time, defaults to datetime.now()
+
+    Returns:
+        Number of health checks moved to each status
+    """
+    now = now or datetime.now()
+    ended = now - timedelta(minutes=settings.HEALTH_CHECK_DURATION_MINUTES)
+
+    completed = db.execute(
+        update(HealthCheckSchedule)
+        .where(
+            HealthCheckSchedule.status.in_(["scheduled", "in_progress"]),
+            HealthCheckSchedule.scheduled_datetime <= ended,
+        )
+        .values(status="completed")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    in_progress = db.execute(
+        update(HealthCheckSchedule)
+        .where(
+            HealthCheckSchedule.status == "scheduled",
+            HealthCheckSchedule.scheduled_datetime <= now,
+        )
+        .values(status="in_progress")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return {"in_progress": in_progress, "completed": completed}
@@ -1,16 +1,38 @@
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.core import etag
+from app.core.config import settings
+from app.core.license_registry import SEQUENCE_DIGITS, license_registry
+from app.models.course import Course
+from app.models.course_registration import CourseRegistration
+from app.models.exam import Exam
+from app.models.exam_result import ExamResult
 from app.models.license import License
+from app.models.license_number_counter import LicenseNumberCounter
+from app.models.personal_infor_document import PersonalInforDocument
+from app.models.student import Student
 from app.schemas.license import LicenseCreate, LicenseUpdate
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+import re
 import uuid
 
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+STATUS_ACTIVE = "active"
+STATUS_EXPIRED = "expired"
+REGISTRATION_SUCCESSFUL = "successful"
+
 
 def get_licenses(db: Session, skip: int = 0, limit: int = 100):
     """Get all licenses with pagination"""
     return db.query(License).offset(skip).limit(limit).all()
 
 
-def get_license_by_id(db: Session, license_id: int) -> Optional[License]:
+def get_license_by_id(db: Session, license_id: uuid.UUID) -> Optional[License]:
     """Get a license by its ID"""
     return db.query(License).filter(License.id == license_id).first()
 
@@ -20,28 +42,55 @@ def get_license_by_number(db: Session, license_number: str) -> Optional[License]
     return db.query(License).filter(License.license_number == license_number).first()
 
 
-def get_licenses_by_student_id(db: Session, student_id: int) -> List[License]:
+def get_licenses_by_student_id(db: Session, student_id: uuid.UUID) -> List[License]:
     """Get all licenses for a specific student"""
     return db.query(License).filter(License.student_id == student_id).all()
 
 
-def get_licenses_by_license_type_id(db: Session, license_type_id: int) -> List[License]:
+def get_licenses_by_license_type_id(
+    db: Session, license_type_id: uuid.UUID
+) -> List[License]:
     """Get all licenses of a specific license type"""
     return db.query(License).filter(License.license_type_id == license_type_id).all()
 
 
+def is_counter_license_number(license_number: str) -> bool:
+    """Whether a license number has the format of the numbers allocated from the counters."""
+    pattern = rf"{re.escape(settings.LICENSE_NUMBER_PREFIX)}\d{{4}}\d{{{SEQUENCE_DIGITS}}}"
+    return re.fullmatch(pattern, license_number) is not None
+
+
 def create_license(db: Session, license_obj: LicenseCreate) -> License:
-    """Create a new license"""
-    db_license = License(
-        license_number=license_obj.license_number,
-        license_type_id=license_obj.license_type_id,
-        student_id=license_obj.student_id,
-        expiration_date=license_obj.expiration_date,
-        status=license_obj.status,
-    )
-    db.add(db_license)
-    db.commit()
+    """
+    Create a new license. Without a license number, the next number of the
+    year's counter is allocated in the same transaction.
+    """
+    try:
+        license_number = license_obj.license_number
+        if license_number is None:
+            prefix = f"{settings.LICENSE_NUMBER_PREFIX}{datetime.utcnow():%Y}"
+            last_value = _lock_counter(db, prefix) + 1
+            db.execute(
+                update(LicenseNumberCounter)
+                .where(LicenseNumberCounter.prefix == prefix)
+                .values(last_value=last_value)
+                .execution_options(synchronize_session=False)
+            )
+            license_number = f"{prefix}{last_value:06d}"
+        db_license = License(
+            license_number=license_number,
+            license_type_id=license_obj.license_type_id,
+            student_id=license_obj.student_id,
+            expiration_date=license_obj.expiration_date,
+            status=license_obj.status,
+        )
+        db.add(db_license)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     db.refresh(db_license)
+    license_registry.add(db_license.license_number)
     return db_license
 
 
@@ -49,21 +98,243 @@ def update_license(
     db: Session, db_license: License, license_update: LicenseUpdate
 ) -> License:
     """Update an existing license"""
+    previous_number = db_license.license_number
     update_data = license_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_license, key, value)
 
     db.commit()
     db.refresh(db_license)
+    license_registry.forget(previous_number)
+    license_registry.add(db_license.license_number)
     return db_license
 
 
 def delete_license(db: Session, db_license: License) -> None:
     """Delete a license"""
+    license_number = db_license.license_number
     db.delete(db_license)
     db.commit()
+    license_registry.forget(license_number)
 
 
 def count_licenses(db: Session) -> int:
     """Count total number of licenses"""
-    return db.query(License).count()
\ No newline at end of file
+    return db.query(License).count()
+
+
+def _lock_counter(db: Session, prefix: str) -> int:
+    """
+    Lock the counter row of a license number prefix until the transaction
+    ends, creating it on first use.
+
+    Returns:
+        The last number issued with the prefix
+    """
+    touch = (
+        update(LicenseNumberCounter)
+        .where(LicenseNumberCounter.prefix == prefix)
+        .values(last_value=LicenseNumberCounter.last_value)
+        .returning(LicenseNumberCounter.last_value)
+        .execution_options(synchronize_session=False)
+    )
+    last_value = db.execute(touch).scalar()
+    if last_value is None:
+        try:
+            with db.begin_nested():
+                db.add(LicenseNumberCounter(prefix=prefix, last_value=0))
+        except IntegrityError:
+            # Created by a concurrent issuance, the update below waits for it
+            pass
+        last_value = db.execute(touch).scalar()
+    return last_value
+
+
+def _expiration_date(issued_at: datetime) -> datetime:
+    year = issued_at.year + settings.LICENSE_VALIDITY_YEARS
+    try:
+        return issued_at.replace(year=year)
+    except ValueError:
+        # Issued on February 29
+        return issued_at.replace(year=year, day=28)
+
+
+def get_eligible_student_ids(db: Session, course_id: uuid.UUID) -> List[uuid.UUID]:
+    """
+    Students of a course who can get their license, in one grouped query:
+    their registration is successful, their best theory and practice scores
+    in the course's exams reach LICENSE_THEORY_PASS_SCORE and
+    LICENSE_PRACTICE_PASS_SCORE, and they hold no license of the course's
+    license type yet.
+
+    Args:
+        db: Database session
+        course_id: UUID of the course
+
+    Returns:
+        Student ids, in id order
+    """
+    theory_score = func.max(case((Exam.type == "theory", ExamResult.score)))
+    practice_score = func.max(case((Exam.type == "practice", ExamResult.score)))
+    already_licensed = (
+        db.query(License.id)
+        .filter(
+            License.student_id == CourseRegistration.student_id,
+            License.license_type_id == Course.license_type_id,
+        )
+        .exists()
+    )
+    rows = (
+        db.query(CourseRegistration.student_id)
+        .join(Course, Course.id == CourseRegistration.course_id)
+        .join(Exam, Exam.course_id == CourseRegistration.course_id)
+        .join(
+            ExamResult,
+            (ExamResult.student_id == CourseRegistration.student_id)
+            & (ExamResult.exam_id == Exam.id),
+        )
+        .filter(
+            CourseRegistration.course_id == course_id,
+            CourseRegistration.status == REGISTRATION_SUCCESSFUL,
+            ~already_licensed,
+        )
+        .group_by(CourseRegistration.student_id)
+        .having(
+            theory_score >= settings.LICENSE_THEORY_PASS_SCORE,
+            practice_score >= settings.LICENSE_PRACTICE_PASS_SCORE,
+        )
+        .order_by(CourseRegistration.student_id)
+        .all()
+    )
+    return [row.student_id for row in rows]
+
+
+def issue_course_licenses(db: Session, course_id: uuid.UUID) -> Optional[List[Dict]]:
+    """
+    Issue the licenses of every student of a course who passed both exams.
+
+    The whole batch is one transaction. The license number counter of the
+    year is locked first, so concurrent issuances run one after the other:
+    each one selects its students once the previous one committed (no
+    student gets two licenses) and takes the numbers following the last
+    one issued (no two licenses get the same number). The licenses are
+    then inserted with a single multi-row INSERT.
+
+    Args:
+        db: Database session
+        course_id: UUID of the course
+
+    Returns:
+        The issued licenses, or None if the course does not exist
+    """
+    course = db.query(Course.id, Course.license_type_id).filter(Course.id == course_id).first()
+    if course is None:
+        return None
+
+    issued_at = datetime.utcnow()
+    prefix = f"{settings.LICENSE_NUMBER_PREFIX}{issued_at:%Y}"
+    try:
+        last_value = _lock_counter(db, prefix)
+        student_ids = get_eligible_student_ids(db, course_id)
+        if not student_ids:
+            db.rollback()
+            return []
+
+        licenses = [
+            {
+                "id": uuid.uuid4(),
+                "license_number": f"{prefix}{last_value + n:06d}",
+                "license_type_id": course.license_type_id,
+                "student_id": student_id,
+                "created_at": issued_at,
+                "expiration_date": _expiration_date(issued_at),
+                "status": STATUS_ACTIVE,
+            }
+            for n, student_id in enumerate(student_ids, start=1)
+        ]
+        db.execute(
+            update(LicenseNumberCounter)
+            .where(LicenseNumberCounter.prefix == prefix)
+            .values(last_value=last_value + len(licenses))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(insert(License), licenses)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # A Core INSERT is not seen by the ETag session hooks
+    etag.bump(License.__tablename__)
+    for db_license in licenses:
+        license_registry.add(db_license["license_number"])
+
+    logger.info(
+        f"Issued {len(licenses)} licenses for course {course_id}: "
+        f"{licenses[0]['license_number']} to {licenses[-1]['license_number']}"
+    )
+    return licenses
+
+
+def expire_licenses(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Mark the active licenses past their expiration date expired, in one
+    UPDATE on the (status, expiration_date) index. Safe to run repeatedly.
+
+    Args:
+        db: Database session
+        now: Current time, defaults to datetime.utcnow()
+
+    Returns:
+        Number of licenses expired
+    """
+    expired = db.execute(
+        update(License)
+        .where(
+            License.status == STATUS_ACTIVE,
+            License.expiration_date <= (now or datetime.utcnow()),
+        )
+        .values(status=STATUS_EXPIRED)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return expired
+
+
+def iter_expiring_licenses(
+    db: Session, within_days: int, batch_size: int = 1000
+) -> Iterator:
+    """
+    Active licenses expiring in the next ``within_days`` days, soonest
+    first, read from the (status, expiration_date) index in batches of
+    ``batch_size`` rows so the whole result is never held in memory.
+
+    Args:
+        db: Database session, must stay open while iterating
+        within_days: Days ahead to look at
+        batch_size: Rows fetched per round trip
+
+    Returns:
+        Iterator of rows with the license, its student id and name
+    """
+    now = datetime.utcnow()
+    return (
+        db.query(
+            License.id,
+            License.license_number,
+            License.license_type_id,
+            License.student_id,
+            PersonalInforDocument.full_name.label("student_name"),
+            License.expiration_date,
+        )
+        .outerjoin(Student, Student.id == License.student_id)
+        .outerjoin(
+            PersonalInforDocument, PersonalInforDocument.user_id == Student.user_id
+        )
+        .filter(
+            License.status == STATUS_ACTIVE,
+            License.expiration_date > now,
+            License.expiration_date <= now + timedelta(days=within_days),
+        )
+        .order_by(License.expiration_date, License.id)
+        .yield_per(batch_size)
+    )
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from app.core import cache
 from app.models.license_type import LicenseType
 from app.schemas.license_type import LicenseTypeCreate, LicenseTypeUpdate
 import uuid
@@ -36,6 +37,7 @@ def create_license_type(db: Session, license_type: LicenseTypeCreate) -> License
     db.add(db_license_type)
     db.commit()
     db.refresh(db_license_type)
+    cache.license_types.invalidate()
     return db_license_type
 
 
@@ -50,6 +52,7 @@ def update_license_type(
 
     db.commit()
     db.refresh(db_license_type)
+    cache.license_types.invalidate()
     return db_license_type
 
 
@@ -57,6 +60,7 @@ def delete_license_type(db: Session, db_license_type: LicenseType) -> None:
     """Delete a license type"""
     db.delete(db_license_type)
     db.commit()
+    cache.license_types.invalidate()
 
 
 def count_license_types(db: Session) -> int:
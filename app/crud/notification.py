@@ -0,0 +1,67 @@
+from typing import List
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.models.course_registration import CourseRegistration
+from app.models.health_check_document import HealthCheckDocument
+from app.models.personal_infor_document import PersonalInforDocument
+from app.models.student import Student
+from app.models.user import User
+
+# Registrations in these states are no longer affected by course changes
+INACTIVE_REGISTRATION_STATUSES = ("rejected",)
+
+
+def _recipient_columns(db: Session):
+    return db.query(
+        Student.id.label("student_id"),
+        User.email,
+        User.phone_number,
+        PersonalInforDocument.full_name,
+    )
+
+
+def get_course_recipients(db: Session, course_id: uuid.UUID) -> List:
+    """
+    Get contact details of every student registered to a course in one query
+    (course -> registrations -> students -> users).
+
+    Returns:
+        Rows with student_id, email, phone_number and full_name
+    """
+    return (
+        _recipient_columns(db)
+        .select_from(CourseRegistration)
+        .join(Student, Student.id == CourseRegistration.student_id)
+        .join(User, User.id == Student.user_id)
+        .outerjoin(PersonalInforDocument, PersonalInforDocument.user_id == User.id)
+        .filter(
+            CourseRegistration.course_id == course_id,
+            CourseRegistration.status.notin_(INACTIVE_REGISTRATION_STATUSES),
+        )
+        .distinct()
+        .all()
+    )
+
+
+def get_health_check_recipients(
+    db: Session, health_check_schedule_id: uuid.UUID
+) -> List:
+    """
+    Get contact details of every student booked on a health check schedule
+    in one query (health check documents -> students -> users).
+
+    Returns:
+        Rows with student_id, email, phone_number and full_name
+    """
+    return (
+        _recipient_columns(db)
+        .select_from(HealthCheckDocument)
+        .join(Student, Student.id == HealthCheckDocument.student_id)
+        .join(User, User.id == Student.user_id)
+        .outerjoin(PersonalInforDocument, PersonalInforDocument.user_id == User.id)
+        .filter(HealthCheckDocument.health_check_id == health_check_schedule_id)
+        .distinct()
+        .all()
+    )
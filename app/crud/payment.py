@@ -1,9 +1,77 @@
+import base64
+import csv
 import datetime
+import io
+import re
+from decimal import Decimal, InvalidOperation
+from fastapi import HTTPException
+from sqlalchemy import case, func, tuple_, update
 from sqlalchemy.orm import Session
-from app.schemas.payment import PaymentCreate, PaymentUpdate, Payment
+from app.schemas.payment import (
+    PaymentCreate,
+    PaymentUpdate,
+    Payment,
+    PaymentLedger,
+    PaymentLedgerTotals,
+    PaymentMethodTotal,
+    ReconciliationIssue,
+    ReconciliationSummary,
+)
+from app.models.course import Course
+from app.models.course_registration import CourseRegistration
+from app.models.license_type import LicenseType
 from app.models.payment import Payment as PaymentModel
+from app.models.payment_method import PaymentMethod
+from app.models.personal_infor_document import PersonalInforDocument
+from app.models.student import Student
 import uuid
 from datetime import date
+from typing import Dict, List, Optional
+
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+# Registrations a student can pay for, and the ones a bank transfer can
+# still confirm (including those whose payment was declared but not checked)
+PAYABLE_STATUSES = ["pending", "approved"]
+OUTSTANDING_STATUSES = ["pending", "approved", "payment"]
+STATUS_PAYMENT = "payment"
+STATUS_SUCCESSFUL = "successful"
+
+# Values per IN list when looking up the registrations of a statement
+LOOKUP_CHUNK_SIZE = 1000
+
+STATEMENT_COLUMNS = {"reference", "amount", "description"}
+# A registration id, or else an identity number (9 or 12 digits), in the
+# description of a transfer
+_REGISTRATION_ID = re.compile(
+    r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}", re.IGNORECASE
+)
+_IDENTITY_NUMBER = re.compile(r"(?<!\d)(\d{12}|\d{9})(?!\d)")
+
+
+def amount_due():
+    """
+    SQL expression of the amount due for a registration: the price of its
+    course, or the fee of the course's license type when the course has no
+    price. Needs Course and LicenseType joined, see _registration_amounts.
+    """
+    return case((Course.price > 0, Course.price), else_=LicenseType.fee)
+
+
+def _registration_amounts(db: Session, *columns):
+    return (
+        db.query(*columns, amount_due().label("amount"))
+        .select_from(CourseRegistration)
+        .join(Course, Course.id == CourseRegistration.course_id)
+        .join(LicenseType, LicenseType.id == Course.license_type_id)
+    )
+
+
+def _chunks(values: List, size: int = LOOKUP_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
 
 
 #List all payments
@@ -12,21 +80,410 @@ def get_payments(db: Session, skip: int = 0, limit: int = 100):
     return payments
 
 
+def _encode_cursor(created_at: date, payment_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{payment_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, payment_id = raw.split("|")
+        return date.fromisoformat(created_at), uuid.UUID(payment_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def _ledger_filters(query, date_from, date_to, course_id, payment_method_id):
+    """The inner joins and filters of the ledger, shared by its page and totals"""
+    query = (
+        query.join(
+            CourseRegistration,
+            CourseRegistration.id == PaymentModel.course_registration_id,
+        )
+        .join(Student, Student.id == CourseRegistration.student_id)
+        .join(Course, Course.id == CourseRegistration.course_id)
+    )
+    if date_from is not None:
+        query = query.filter(PaymentModel.created_at >= date_from)
+    if date_to is not None:
+        query = query.filter(PaymentModel.created_at <= date_to)
+    if course_id is not None:
+        query = query.filter(CourseRegistration.course_id == course_id)
+    if payment_method_id is not None:
+        query = query.filter(PaymentModel.payment_method_id == payment_method_id)
+    return query
+
+
+def get_payment_ledger(
+    db: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    course_id: Optional[uuid.UUID] = None,
+    payment_method_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> PaymentLedger:
+    """
+    Payments with their registration, student, course and method, newest
+    first, in one joined query.
+
+    Pages are walked with a keyset cursor on (created_at, id), read from the
+    ix_payments_created_at_id index, so a page costs the same wherever it
+    is in the ledger. The count and sum of all matching payments, per
+    payment method, are aggregated in SQL for the first page only.
+
+    Args:
+        db: Database session
+        date_from: Only payments made on or after this day
+        date_to: Only payments made on or before this day
+        course_id: Only payments for registrations to this course
+        payment_method_id: Only payments made with this method
+        cursor: next_cursor of the previous page
+        limit: Maximum number of payments to return
+
+    Returns:
+        PaymentLedger with the page, the next cursor and the totals
+
+    Raises:
+        ValueError: When the cursor is not one returned by this function
+    """
+    query = _ledger_filters(
+        db.query(
+            PaymentModel.id,
+            PaymentModel.amount,
+            PaymentModel.evidence,
+            PaymentModel.created_at,
+            PaymentModel.course_registration_id,
+            CourseRegistration.status.label("registration_status"),
+            CourseRegistration.student_id,
+            PersonalInforDocument.full_name.label("student_name"),
+            Course.id.label("course_id"),
+            Course.course_name,
+            PaymentModel.payment_method_id,
+            PaymentMethod.method.label("payment_method"),
+        ),
+        date_from,
+        date_to,
+        course_id,
+        payment_method_id,
+    )
+    query = query.outerjoin(
+        PersonalInforDocument, PersonalInforDocument.user_id == Student.user_id
+    ).outerjoin(PaymentMethod, PaymentMethod.id == PaymentModel.payment_method_id)
+    if cursor:
+        query = query.filter(
+            tuple_(PaymentModel.created_at, PaymentModel.id) < _decode_cursor(cursor)
+        )
+    rows = (
+        query.order_by(PaymentModel.created_at.desc(), PaymentModel.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    totals = None
+    if not cursor:
+        totals_query = _ledger_filters(
+            db.query(
+                PaymentModel.payment_method_id,
+                PaymentMethod.method.label("payment_method"),
+                func.count(PaymentModel.id).label("count"),
+                func.coalesce(func.sum(PaymentModel.amount), 0).label("amount"),
+            ),
+            date_from,
+            date_to,
+            course_id,
+            payment_method_id,
+        ).outerjoin(PaymentMethod, PaymentMethod.id == PaymentModel.payment_method_id)
+        by_method = [
+            PaymentMethodTotal.model_validate(row, from_attributes=True)
+            for row in totals_query.group_by(
+                PaymentModel.payment_method_id, PaymentMethod.method
+            )
+            .order_by(PaymentModel.payment_method_id)
+            .all()
+        ]
+        totals = PaymentLedgerTotals(
+            count=sum(total.count for total in by_method),
+            amount=sum(total.amount for total in by_method),
+            by_method=by_method,
+        )
+
+    return PaymentLedger(items=rows, next_cursor=next_cursor, totals=totals)
+
+
 #Create a new payment
 def create_payment(db: Session, payment: PaymentCreate):
-    db_payment = PaymentModel(
-        id=uuid.uuid4(),
-        amount=0.0,
-        payment_method_id=payment.payment_method_id,
-        evidence=payment.evidence,
-        course_registration_id=payment.course_registration_id,
-        created_at=datetime.datetime.now(),
-        updated_at=datetime.datetime.now(),
-    )
-    db.add(db_payment)
-    db.commit()
+    """
+    Record the payment of a course registration.
+
+    The amount is the one due for the registration's course. The
+    registration moves to payment status in the same transaction, with a
+    conditional UPDATE, so it cannot be paid twice.
+
+    Args:
+        db: Database session
+        payment: Payment method, evidence and course registration
+
+    Returns:
+        Created Payment object
+
+    Raises:
+        HTTPException: 409 when the registration is not awaiting payment
+    """
+    try:
+        moved = db.execute(
+            update(CourseRegistration)
+            .where(
+                CourseRegistration.id == payment.course_registration_id,
+                CourseRegistration.status.in_(PAYABLE_STATUSES),
+            )
+            .values(status=STATUS_PAYMENT, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not moved:
+            raise HTTPException(
+                status_code=409, detail="Course registration is not awaiting payment"
+            )
+        amount = (
+            _registration_amounts(db)
+            .filter(CourseRegistration.id == payment.course_registration_id)
+            .scalar()
+        )
+        db_payment = PaymentModel(
+            id=uuid.uuid4(),
+            amount=float(amount),
+            payment_method_id=payment.payment_method_id,
+            evidence=payment.evidence,
+            course_registration_id=payment.course_registration_id,
+            created_at=datetime.datetime.now(),
+            updated_at=datetime.datetime.now(),
+        )
+        db.add(db_payment)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
     db.refresh(db_payment)
     return db_payment
 
 
+def _parse_amount(value: str) -> Optional[int]:
+    # Whole VND, thousands optionally separated by commas
+    try:
+        amount = Decimal((value or "").replace(",", "").strip())
+    except InvalidOperation:
+        return None
+    if amount != amount.to_integral_value():
+        return None
+    return int(amount)
+
+
+def _statement_lines(content: bytes) -> List[Dict]:
+    """
+    Parse a bank statement CSV with a header row naming at least the
+    reference, amount and description columns. Debit lines are skipped.
+
+    Raises:
+        ValueError: When the file is not such a CSV
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("Bank statement must be UTF-8 encoded")
+    reader = csv.DictReader(io.StringIO(text))
+    headers = {(name or "").strip().lower() for name in reader.fieldnames or []}
+    missing = STATEMENT_COLUMNS - headers
+    if missing:
+        raise ValueError(f"Bank statement is missing columns: {', '.join(sorted(missing))}")
+
+    lines = []
+    for row in reader:
+        row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+        amount = _parse_amount(row["amount"])
+        if amount is not None and amount <= 0:
+            continue
+        description = row["description"]
+        registration_id = _REGISTRATION_ID.search(description)
+        identity_number = (
+            None
+            if registration_id
+            else _IDENTITY_NUMBER.search(description)
+        )
+        lines.append(
+            {
+                "line": reader.line_num,
+                "reference": row["reference"],
+                "amount": amount,
+                "registration_id": (
+                    uuid.UUID(registration_id.group(0)) if registration_id else None
+                ),
+                "identity_number": identity_number.group(0) if identity_number else None,
+            }
+        )
+    return lines
+
+
+def _outstanding_registrations(db: Session, lines: List[Dict]) -> Dict:
+    """
+    The outstanding registrations the lines refer to, keyed by registration
+    id and by identity number (oldest registration first), looked up in
+    chunks on the primary key and the identity number index.
+    """
+    registration_ids = list({l["registration_id"] for l in lines if l["registration_id"]})
+    identity_numbers = list({l["identity_number"] for l in lines if l["identity_number"]})
+    candidates = {}
+
+    for chunk in _chunks(registration_ids):
+        rows = (
+            _registration_amounts(db, CourseRegistration.id)
+            .filter(
+                CourseRegistration.id.in_(chunk),
+                CourseRegistration.status.in_(OUTSTANDING_STATUSES),
+            )
+            .all()
+        )
+        for row in rows:
+            candidates[row.id] = [row]
+
+    for chunk in _chunks(identity_numbers):
+        rows = (
+            _registration_amounts(
+                db, CourseRegistration.id, PersonalInforDocument.identity_number
+            )
+            .join(Student, Student.id == CourseRegistration.student_id)
+            .join(PersonalInforDocument, PersonalInforDocument.user_id == Student.user_id)
+            .filter(
+                PersonalInforDocument.identity_number.in_(chunk),
+                CourseRegistration.status.in_(OUTSTANDING_STATUSES),
+            )
+            .order_by(CourseRegistration.created_at)
+            .all()
+        )
+        for row in rows:
+            candidates.setdefault(row.identity_number, []).append(row)
+    return candidates
+
+
+def reconcile_bank_statement(
+    db: Session, content: bytes, payment_method_id: Optional[int] = None
+) -> ReconciliationSummary:
+    """
+    Confirm the payments of a bank statement.
+
+    Each credit line is matched to an outstanding registration by the
+    registration id or, failing that, the identity number of the student in
+    its description, and must carry exactly the amount due. The matched
+    registrations move to successful status in one set-based UPDATE, and
+    those without a payment get one recorded from the statement line, all
+    in a single transaction. Importing the same statement again matches
+    nothing, the registrations are no longer outstanding.
+
+    Args:
+        db: Database session
+        content: CSV file with reference, amount and description columns
+        payment_method_id: Payment method of the created payments
+
+    Returns:
+        ReconciliationSummary with the matched registrations and the lines
+        that could not be applied
+
+    Raises:
+        ValueError: When the statement cannot be parsed
+    """
+    lines = _statement_lines(content)
+    candidates = _outstanding_registrations(db, lines)
+
+    issues = []
+    matched = {}  # registration id -> statement line
+    references = set()
+    for line in lines:
+        if line["amount"] is None:
+            issues.append(ReconciliationIssue(**line, reason="invalid"))
+            continue
+        if line["reference"] and line["reference"] in references:
+            issues.append(ReconciliationIssue(**line, reason="duplicate"))
+            continue
+        references.add(line["reference"])
+
+        options = [
+            row
+            for row in candidates.get(
+                line["registration_id"] or line["identity_number"], []
+            )
+            if row.id not in matched
+        ]
+        match = next((row for row in options if row.amount == line["amount"]), None)
+        if match is not None:
+            matched[match.id] = line
+        else:
+            reason = "amount_mismatch" if options else "unmatched"
+            issues.append(ReconciliationIssue(**line, reason=reason))
+
+    confirmed = []
+    created = 0
+    try:
+        for chunk in _chunks(list(matched)):
+            confirmed += db.execute(
+                update(CourseRegistration)
+                .where(
+                    CourseRegistration.id.in_(chunk),
+                    CourseRegistration.status.in_(OUTSTANDING_STATUSES),
+                )
+                .values(status=STATUS_SUCCESSFUL, updated_at=func.now())
+                .returning(CourseRegistration.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+
+        paid = set()
+        for chunk in _chunks(confirmed):
+            paid.update(
+                row.course_registration_id
+                for row in db.query(PaymentModel.course_registration_id).filter(
+                    PaymentModel.course_registration_id.in_(chunk)
+                )
+            )
+        now = datetime.datetime.now()
+        payments = [
+            PaymentModel(
+                id=uuid.uuid4(),
+                amount=float(matched[registration_id]["amount"]),
+                payment_method_id=payment_method_id,
+                evidence=f"Bank transfer {matched[registration_id]['reference']}",
+                course_registration_id=registration_id,
+                created_at=now,
+                updated_at=now,
+            )
+            for registration_id in confirmed
+            if registration_id not in paid
+        ]
+        db.add_all(payments)
+        created = len(payments)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # Changed by someone else between the lookup and the update
+    for registration_id in set(matched) - set(confirmed):
+        issues.append(ReconciliationIssue(**matched[registration_id], reason="unmatched"))
+
+    logger.info(
+        f"Bank statement reconciled: {len(lines)} lines, {len(confirmed)} confirmed, "
+        f"{created} payments created, {len(issues)} issues"
+    )
+    return ReconciliationSummary(
+        lines=len(lines),
+        matched=len(confirmed),
+        payments_created=created,
+        registration_ids=confirmed,
+        issues=sorted(issues, key=lambda issue: issue.line),
+    )
+
+
 #get a payment by identity_number in the course_registration join
\ No newline at end of file
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from app.core import cache
 from app.models.payment_method import PaymentMethod
 from app.schemas.payment_method import PaymentMethodCreate, PaymentMethodUpdate, PaymentMethodList
 import uuid
@@ -11,9 +12,10 @@ def get_payment_method_by_name(db: Session, name_in: str) -> Optional[PaymentMet
     return db.query(PaymentMethod).filter(PaymentMethod.method == name_in).first()
 
 def get_payment_methods(db: Session, skip: int = 0, limit: int = 100) -> PaymentMethodList:
-    payment_methods = db.query(PaymentMethod).offset(skip).limit(limit).all()
-    total = db.query(PaymentMethod).count()
-    return PaymentMethodList(payment_methods=payment_methods, total=total)
+    payment_methods = cache.payment_methods.all(db)
+    return PaymentMethodList(
+        payment_methods=payment_methods[skip : skip + limit], total=len(payment_methods)
+    )
 
 def create_payment_method(db: Session, payment_method: PaymentMethodCreate) -> PaymentMethod:
     db_payment_method = PaymentMethod(
@@ -23,6 +25,7 @@ def create_payment_method(db: Session, payment_method: PaymentMethodCreate) -> P
     db.add(db_payment_method)
     db.commit()
     db.refresh(db_payment_method)
+    cache.payment_methods.invalidate()
     return db_payment_method
 
 def update_payment_method(db: Session, payment_method: PaymentMethodUpdate) -> Optional[PaymentMethod]:
@@ -31,6 +34,7 @@ def update_payment_method(db: Session, payment_method: PaymentMethodUpdate) -> O
         db_payment_method.method = payment_method.method
         db.commit()
         db.refresh(db_payment_method)
+        cache.payment_methods.invalidate()
         return db_payment_method
     return None
 
@@ -48,6 +52,7 @@ def delete_payment_method(db: Session, payment_method_id: uuid.UUID) -> bool:
     try:
         result = db.query(PaymentMethod).filter(PaymentMethod.id == payment_method_id).delete()
         db.commit()
+        cache.payment_methods.invalidate()
         return result > 0
     except Exception as e:
         db.rollback()
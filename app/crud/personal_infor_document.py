@@ -1,6 +1,5 @@
 from sqlalchemy.orm import Session
 import uuid
-from app.api import user
 from app.schemas.personal_infor_document import (
     PersonalInformationDocumentBase,
     PersonalInformationDocument,
@@ -10,13 +9,17 @@ from datetime import date
 from app.models.personal_infor_document import PersonalInforDocument
 
 
-def create(db: Session, obj_in: PersonalInformationDocumentCreate):
+def create(
+    db: Session, obj_in: PersonalInformationDocumentCreate, commit: bool = True
+):
     """
     Create a new personal_infor_document record in the database.
 
     Args:
         db (Session): The database session.
         personal_infor_document: The personal_infor_document object to create.
+        commit (bool): Commit the record, or only flush it when the caller
+            commits a larger transaction.
 
     Returns:
         The created personal_infor_document object.
@@ -36,8 +39,12 @@ def create(db: Session, obj_in: PersonalInformationDocumentCreate):
     )
 
     db.add(personal_infor_document)
-    db.commit()
-    db.refresh(personal_infor_document)
+    if commit:
+        db.commit()
+        db.refresh(personal_infor_document)
+    else:
+        # Part of a larger transaction, committed by the caller
+        db.flush()
     return personal_infor_document
 
 
@@ -1,5 +1,7 @@
 from datetime import datetime
 from sqlalchemy.orm import Session, joinedload
+from app.core.fields import Fields, loader_options, project
+from app.models.archive import ScheduleArchive
 from app.models.schedule import Schedule
 from app.models.course import Course
 from app.models.license_type import LicenseType
@@ -8,53 +10,96 @@ from app.schemas.schedule import (
     ScheduleCreate,
     ScheduleUpdate,
     ScheduleList,
+    ScheduleResponse,
     Schedule as ScheduleSchema,
 )
 import uuid
 
 
-def get_schedule(db: Session, start_time: str, end_time: str):
+# ScheduleResponse fields taken from the schedule's course and license type
+COURSE_FIELDS = ("course_name", "license_type_id", "license_type_name")
+
+
+def _schedule_values(schedule: Schedule, names) -> dict:
+    course = schedule.course if not set(COURSE_FIELDS).isdisjoint(names) else None
+    license_type = course.license_type if course else None
+    derived = {
+        "course_name": course.course_name if course else "",
+        "license_type_id": license_type.id if license_type else None,
+        "license_type_name": license_type.type_name if license_type else "",
+    }
+    return {
+        name: derived[name] if name in derived else getattr(schedule, name)
+        for name in names
+    }
+
+
+def get_schedule(
+    db: Session,
+    start_time: str,
+    end_time: str,
+    fields: Fields = None,
+    include_history: bool = False,
+):
+    """
+    Get the theory, practice and exam schedules starting in a date range.
+
+    Args:
+        db: Database session
+        start_time: ISO date or datetime the range starts at
+        end_time: ISO date or datetime the range ends at
+        fields: ScheduleResponse fields to return, all of them when None
+        include_history: Also return schedules of archived courses
+
+    Returns:
+        ScheduleList, or a dict of trimmed items and total when fields is given
+    """
     # convert start_time and end_time to datetime objects
     start_date = datetime.fromisoformat(start_time)
     end_date = datetime.fromisoformat(end_time)
 
-    # Get schedules between the start and end dates and filter by type (theory and practice)
-    # Use joinedload to eagerly load the course and license_type relationships
-    schedules = (
-        db.query(Schedule)
-        .options(joinedload(Schedule.course).joinedload(Course.license_type))
-        .filter(
-            Schedule.start_time >= start_date,
-            Schedule.start_time <= end_date,
-            Schedule.type.in_(["theory", "practice", "exam"]),
+    names = fields or tuple(ScheduleResponse.model_fields)
+    with_course = not set(COURSE_FIELDS).isdisjoint(names)
+
+    def query(model):
+        # Only the requested columns are read, the course and its license
+        # type are joined in only when one of their fields is requested
+        options = loader_options(
+            model, fields, always=("course_id",) if with_course else ()
+        )
+        if with_course:
+            course_load = joinedload(model.course)
+            if fields:
+                course_load = course_load.load_only(
+                    Course.course_name, Course.license_type_id
+                )
+            license_type_load = course_load.joinedload(Course.license_type)
+            if fields:
+                license_type_load = license_type_load.load_only(LicenseType.type_name)
+            options.append(license_type_load)
+        return (
+            db.query(model)
+            .options(*options)
+            .filter(
+                model.start_time >= start_date,
+                model.start_time <= end_date,
+                model.type.in_(["theory", "practice", "exam"]),
+            )
         )
-        .all()
-    )
 
-    # Prepare response with license type information
-    schedule_list = []
-    for schedule in schedules:
-        # Handle the case where course might be None
-        course = schedule.course
-        license_type = course.license_type if course else None
-        
-        schedule_dict = {
-            "id": schedule.id,
-            "course_id": schedule.course_id,
-            "start_time": schedule.start_time,
-            "end_time": schedule.end_time,
-            "location": schedule.location,
-            "type": schedule.type,
-            "instructor_id": schedule.instructor_id,
-            "max_students": schedule.max_students,
-            "license_type_id": license_type.id if license_type else None,
-            "license_type_name": license_type.type_name if license_type else "",
-            "course_name": course.course_name if course else "",
-        }
-        schedule_list.append(schedule_dict)
+    schedules = query(Schedule).all()
+    if include_history:
+        schedules += query(ScheduleArchive).all()
+
+    if fields:
+        items = project(
+            ScheduleResponse, fields, (_schedule_values(s, fields) for s in schedules)
+        )
+        return {"items": items, "total": len(items)}
 
-    # Return a dictionary with items and total that matches ScheduleList schema
-    return {"items": schedule_list, "total": len(schedule_list)}
+    # Validated once here, the endpoint serializes it without revalidating
+    schedule_list = [ScheduleResponse(**_schedule_values(s, names)) for s in schedules]
+    return ScheduleList(items=schedule_list, total=len(schedule_list))
 
 
 def get_schedule_by_id(db: Session, schedule_id: uuid.UUID):
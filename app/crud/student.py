@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.models.course_registration import CourseRegistration
 from app.models.exam_result import ExamResult
 from app.models.exam import Exam
+from app.core.fields import Fields, loader_options, project
 from app.models.student import Student
 from app.schemas.student import StudentCreate, Student as StudentSchema, StudentUpdate
 from sqlalchemy.sql import text
@@ -13,8 +14,11 @@ import uuid
 logger = getLogger(__name__)
 
 
-def get_students(db: Session, skip: int = 0, limit: int = 100):
-    response = db.query(Student).offset(skip).limit(limit).all()
+def get_students(db: Session, skip: int = 0, limit: int = 100, fields: Fields = None):
+    options = loader_options(Student, fields) if fields else [joinedload(Student.user)]
+    response = db.query(Student).options(*options).offset(skip).limit(limit).all()
+    if fields:
+        return project(StudentSchema, fields, response)
     result = []
     for student in response:
         student_schema = StudentSchema.model_validate(student, from_attributes=True)
@@ -26,13 +30,17 @@ def get_student(db: Session, student_id: int):
     return db.query(Student).filter(Student.id == student_id).first()
 
 
-def create_student(db: Session, student_in: StudentCreate):
+def create_student(db: Session, student_in: StudentCreate, commit: bool = True):
 
     student = Student(user_id=student_in.user_id)
     logger.debug(f"Created student: {student}")
     db.add(student)
-    db.commit()
-    db.refresh(student)
+    if commit:
+        db.commit()
+        db.refresh(student)
+    else:
+        # Part of a larger transaction, committed by the caller
+        db.flush()
     return student
 
 
@@ -105,7 +113,6 @@ def update_scores(db: Session, student_id: UUID, student_in: StudentUpdate):
             ExamResult.student_id == student_id,
             ExamResult.exam_id == exam_id
         ).first()
-        print(f"exam_result: {exam_result}")
         if exam_result:
             # Update existing result
             exam_result.score = score
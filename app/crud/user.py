@@ -14,7 +14,7 @@ def get_user_by_username(db: Session, username: str):
     return db.query(User).filter(User.user_name == username).first()
 
 
-def create_user(db: Session, user_in: UserCreate):
+def create_user(db: Session, user_in: UserCreate, commit: bool = True):
     hashed_password = get_password_hash(user_in.password)
     user = User(
         user_name=user_in.user_name,
@@ -22,11 +22,15 @@ def create_user(db: Session, user_in: UserCreate):
         phone_number=user_in.phone_number,
         hashed_password=hashed_password,
         role=user_in.role,
-        created_at=datetime.now().isoformat(),
+        created_at=datetime.now(),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    if commit:
+        db.commit()
+        db.refresh(user)
+    else:
+        # Part of a larger transaction, committed by the caller
+        db.flush()
     return user
 
 
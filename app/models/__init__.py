@@ -13,9 +13,23 @@ from app.models.course_registration import CourseRegistration
 from app.models.license_type import LicenseType
 
 from app.models.exam import Exam
+from app.models.schedule import Schedule
+from app.models.instructor import Instructor
+from app.models.certification import Certification
 from app.models.exam_result import ExamResult
 from app.models.license import License
+from app.models.license_number_counter import LicenseNumberCounter
 from app.models.payment import Payment
 from app.models.payment_method import PaymentMethod
 from app.models.absent_form import AbsentForm
 from app.models.complaint import Complaint
+from app.models.job import Job
+from app.models.idempotency_key import IdempotencyKey
+from app.models.rate_limit_bucket import RateLimitBucket
+from app.models.archive import (
+    CourseRegistrationArchive,
+    ExamResultArchive,
+    HealthCheckDocumentArchive,
+    PaymentArchive,
+    ScheduleArchive,
+)
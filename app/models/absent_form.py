@@ -6,7 +6,7 @@ from app.core.database import Base
 class AbsentForm(Base):
     __tablename__ = "absent_forms"
 
-    id = Column(UUID, primary_key=True, index=True)
+    id = Column(UUID, primary_key=True)
     object_id = Column(UUID, nullable=True)
     type = Column(String, nullable=True)
     phone_number = Column(String, nullable=True)
@@ -0,0 +1,103 @@
+from sqlalchemy import Column, String, Integer, UUID, DateTime, Date, Float, Double
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class ArchiveMixin:
+    """
+    Rows moved out of the hot tables once their course is completed, see
+    app.crud.archive. On PostgreSQL the archive tables are partitioned by the
+    start year of the course, one partition per year.
+    """
+
+    __table_args__ = {"postgresql_partition_by": "LIST (course_year)"}
+
+    # Part of the primary key, as PostgreSQL requires for partitioned tables
+    course_year = Column(Integer, primary_key=True)
+    archived_at = Column(DateTime, nullable=False)
+
+
+class ScheduleArchive(ArchiveMixin, Base):
+    __tablename__ = "schedules_archive"
+
+    id = Column(UUID, primary_key=True)
+    course_id = Column(UUID, index=True, nullable=True)
+    exam_id = Column(UUID, nullable=True)
+    start_time = Column(String, nullable=False)
+    end_time = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    instructor_id = Column(UUID, nullable=True)
+    max_students = Column(Integer, nullable=False)
+
+    course = relationship(
+        "Course",
+        primaryjoin="foreign(ScheduleArchive.course_id) == Course.id",
+        viewonly=True,
+    )
+
+
+class CourseRegistrationArchive(ArchiveMixin, Base):
+    __tablename__ = "course_registrations_archive"
+
+    id = Column(UUID, primary_key=True)
+    student_id = Column(UUID, index=True)
+    course_id = Column(UUID, index=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    method = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    note = Column(String)
+
+    student = relationship(
+        "Student",
+        primaryjoin="foreign(CourseRegistrationArchive.student_id) == Student.id",
+        viewonly=True,
+    )
+    course = relationship(
+        "Course",
+        primaryjoin="foreign(CourseRegistrationArchive.course_id) == Course.id",
+        viewonly=True,
+    )
+
+
+class PaymentArchive(ArchiveMixin, Base):
+    __tablename__ = "payments_archive"
+
+    id = Column(UUID, primary_key=True)
+    amount = Column(Float)
+    payment_method_id = Column(Integer)
+    evidence = Column(String)
+    course_registration_id = Column(UUID, index=True)
+    created_at = Column(Date, nullable=False)
+    updated_at = Column(Date)
+    course_id = Column(UUID, index=True)
+
+
+class ExamResultArchive(ArchiveMixin, Base):
+    __tablename__ = "exam_results_archive"
+
+    id = Column(UUID, primary_key=True)
+    exam_id = Column(UUID)
+    student_id = Column(UUID, index=True)
+    score = Column(Double, nullable=False)
+    course_id = Column(UUID, index=True)
+
+
+class HealthCheckDocumentArchive(ArchiveMixin, Base):
+    __tablename__ = "health_check_documents_archive"
+
+    id = Column(UUID, primary_key=True)
+    student_id = Column(UUID, index=True, nullable=False)
+    health_check_id = Column(UUID, nullable=False)
+    document = Column(String, nullable=True)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    course_id = Column(UUID, index=True)
+
+    health_check = relationship(
+        "HealthCheckSchedule",
+        primaryjoin="foreign(HealthCheckDocumentArchive.health_check_id) == HealthCheckSchedule.id",
+        viewonly=True,
+    )
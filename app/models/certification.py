@@ -1,6 +1,5 @@
 from uuid import UUID
 from sqlalchemy import Column, UUID, String, ForeignKey
-from app.api import user
 from app.core.database import Base
 from sqlalchemy.orm import relationship
 
@@ -8,7 +7,7 @@ from sqlalchemy.orm import relationship
 class Certification(Base):
     __tablename__ = "certifications"
 
-    id = Column(UUID, primary_key=True, index=True)
+    id = Column(UUID, primary_key=True)
     user_id = Column(UUID, ForeignKey("users.id"))
     certification_url = Column(String)
 
@@ -5,6 +5,6 @@ from app.core.database import Base
 class Complaint(Base):
     __tablename__ = "complaints"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(UUID, ForeignKey("users.id"))
     description = Column(String)
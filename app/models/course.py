@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, UUID, ForeignKey, Date, CheckConstraint
+from sqlalchemy import Column, Integer, String, UUID, ForeignKey, Date, DateTime, CheckConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import uuid
@@ -19,7 +19,7 @@ class Course(Base):
         ),
     )
 
-    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
 
     course_name = Column(String, index=True, nullable=False)
 
@@ -42,6 +42,9 @@ class Course(Base):
 
     created_at = Column(Date, default=date.today, nullable=False)
     updated_at = Column(Date, default=date.today, nullable=False)
+    # Set once the course's registrations, schedules, exam results and health
+    # check documents have been moved to the archive tables
+    archived_at = Column(DateTime, nullable=True)
 
     # Relationships
     license_type = relationship("LicenseType", back_populates="courses")
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, UUID
+from sqlalchemy import Column, String, Integer, ForeignKey, UUID, DateTime
 from sqlalchemy.orm import relationship
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, Index
 from app.core.database import Base
 from app.models import schedule  # Ensure you import Base from the correct module
 
@@ -13,14 +13,18 @@ class CourseRegistration(Base):
             "status IN ('pending', 'approved','payment','successful', 'rejected')",
             name="check_status_valid",
         ),
+        # Course rosters and notification recipients filter a course by status,
+        # the registration list filters by status and method
+        Index("ix_course_registrations_course_id_status", "course_id", "status"),
+        Index("ix_course_registrations_status_method", "status", "method"),
     )
 
-    id = Column(UUID, primary_key=True, index=True)
-    student_id = Column(UUID, ForeignKey("students.id"))
+    id = Column(UUID, primary_key=True)
+    student_id = Column(UUID, ForeignKey("students.id"), index=True)
     course_id = Column(UUID, ForeignKey("courses.id"))
 
-    created_at = Column(String, nullable=False)
-    updated_at = Column(String, nullable=False)
+    created_at = Column(DateTime, index=True, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
     method = Column(String, nullable=False)
     status = Column(String, nullable=False, default="pending")
     note = Column(String)
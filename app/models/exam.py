@@ -19,11 +19,10 @@ class Exam(Base):
 
     id = Column( UUID,
         primary_key=True,
-        index=True,
         nullable=False,
         default=uuid.uuid4,
     )
-    course_id= Column(UUID, ForeignKey("courses.id"), nullable=False)
+    course_id= Column(UUID, ForeignKey("courses.id"), index=True, nullable=False)
     type = Column(String(20), nullable=False)
 
     #relationship
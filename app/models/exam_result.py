@@ -1,12 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UUID, Double
+from sqlalchemy import Column, Integer, String, ForeignKey, UUID, Double, Index
 from app.core.database import Base
 from sqlalchemy.orm import relationship
 
 class ExamResult(Base):
     __tablename__ = "exam_results"
 
-    id = Column(UUID, primary_key=True, index=True)
-    exam_id = Column(UUID, ForeignKey("exams.id"))
+    # Results of a student, also serves the (student, exam) join of the
+    # registered students query
+    __table_args__ = (
+        Index("ix_exam_results_student_id_exam_id", "student_id", "exam_id"),
+    )
+
+    id = Column(UUID, primary_key=True)
+    exam_id = Column(UUID, ForeignKey("exams.id"), index=True)
     student_id = Column(UUID, ForeignKey("students.id"))
     score = Column(Double, nullable=False)
 
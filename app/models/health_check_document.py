@@ -16,7 +16,7 @@ class HealthCheckDocument(Base):
     )
 
     id = Column(
-        PostgresUUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
+        PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
 
     student_id = Column(
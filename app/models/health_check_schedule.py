@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, CheckConstraint, Integer, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 from app.core.database import Base
@@ -9,31 +9,49 @@ from datetime import datetime
 class HealthCheckSchedule(Base):
     __tablename__ = "health_check_schedules"
     __table_args__ = (
-        CheckConstraint(
-            "scheduled_datetime > CURRENT_TIMESTAMP", name="check_schedule_in_future"
-        ),
         CheckConstraint(
             "status IN ('scheduled', 'in_progress', 'completed', 'canceled')",
             name="check_status_valid",
         ),
+        CheckConstraint(
+            "booked_count >= 0 AND booked_count <= capacity",
+            name="check_booked_within_capacity",
+        ),
+        # Upcoming slots of a course, see get_course_availability
+        Index(
+            "ix_health_check_schedules_course_id_scheduled_datetime",
+            "course_id",
+            "scheduled_datetime",
+        ),
+        # Upcoming slots listing and the status transitions of the scheduler
+        Index(
+            "ix_health_check_schedules_status_scheduled_datetime",
+            "status",
+            "scheduled_datetime",
+        ),
     )
 
     id = Column(
-        PostgresUUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
+        PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
 
     course_id = Column(
         PostgresUUID(as_uuid=True),
         ForeignKey("courses.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     address = Column(String, index=True, nullable=False)
 
+    # Only required to be in the future on creation (see
+    # HealthCheckScheduleCreate), past slots still get their status updated
     scheduled_datetime = Column(DateTime, nullable=False)
     description = Column(String)
 
+    # booked_count is only changed by book_slot/release_slot, atomically
+    capacity = Column(Integer, nullable=False)
+    booked_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
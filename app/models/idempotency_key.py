@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+from app.core.database import Base
+from datetime import datetime
+
+
+class IdempotencyKey(Base):
+    """
+    Response to a POST sent with an Idempotency-Key header, replayed when
+    the request is retried, see app.core.idempotency. status_code is NULL
+    while the first request is still running.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    # Request path and Idempotency-Key header
+    key = Column(String, primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # The purge job deletes the expired keys
+    expires_at = Column(DateTime, nullable=False, index=True)
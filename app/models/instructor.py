@@ -1,7 +1,6 @@
 from sqlalchemy import Column, String, Boolean, UUID, ForeignKey
 from sqlalchemy.orm import relationship
 import uuid
-from app.api import user
 from app.core.database import Base
 from app.models import certification
 
@@ -9,7 +8,7 @@ from app.models import certification
 class Instructor(Base):
     __tablename__ = "instructors"
 
-    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
     user_id = Column(
         UUID, ForeignKey("users.id"), index=True, nullable=False
     )  # Fixed: Added ForeignKey constraint
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, Integer, UUID, DateTime, JSON, Index
+from app.core.database import Base
+import uuid
+from datetime import datetime
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers poll for runnable jobs ordered by run_at
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
+    name = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+
+    status = Column(
+        String, nullable=False, default="queued"
+    )  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
@@ -1,16 +1,23 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, String, ForeignKey, DateTime, UUID, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
+import uuid
 
 
 class License(Base):
     __tablename__ = "licenses"
+    __table_args__ = (
+        # Licenses of a student, and whether they already hold one of a type
+        Index("ix_licenses_student_id_license_type_id", "student_id", "license_type_id"),
+        # Expiry job and the expiring licenses listing
+        Index("ix_licenses_status_expiration_date", "status", "expiration_date"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
     license_number = Column(String, unique=True)
-    license_type_id = Column(Integer, ForeignKey("license_types.id"))
-    student_id = Column(Integer, ForeignKey("students.id"))
+    license_type_id = Column(UUID, ForeignKey("license_types.id"), index=True)
+    student_id = Column(UUID, ForeignKey("students.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
     expiration_date = Column(DateTime)
     status = Column(String)  # e.g., "active", "expired", etc.
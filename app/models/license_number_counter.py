@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger
+from app.core.database import Base
+
+
+class LicenseNumberCounter(Base):
+    """
+    Last license number issued for a prefix. Numbers are reserved by
+    incrementing last_value in the issuing transaction, see
+    app.crud.license.issue_course_licenses and create_license.
+    """
+
+    __tablename__ = "license_number_counters"
+
+    prefix = Column(String, primary_key=True)
+    last_value = Column(BigInteger, nullable=False, default=0)
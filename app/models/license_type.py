@@ -14,7 +14,7 @@ class LicenseType(Base):
         CheckConstraint("fee >= 0", name="check_fee_non_negative"),
     )
 
-    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
 
     type_name = Column(String, unique=True, nullable=False, index=True)
     age_requirement = Column(String, nullable=False)
@@ -1,16 +1,20 @@
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, UUID, Date, String, Float, ForeignKey, Integer
+from sqlalchemy import Column, UUID, Date, String, Float, ForeignKey, Integer, Index
 from app.core.database import Base
 
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Keyset pagination of the payments ledger, newest first
+        Index("ix_payments_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(UUID, primary_key=True, index=True)
+    id = Column(UUID, primary_key=True)
     amount = Column(Float)
     payment_method_id = Column(Integer, ForeignKey("payment_methods.id"))
     evidence = Column(String)
-    course_registration_id = Column(UUID, ForeignKey("course_registrations.id"))
+    course_registration_id = Column(UUID, ForeignKey("course_registrations.id"), index=True)
     created_at = Column(Date, nullable=False)
     updated_at = Column(Date)
 
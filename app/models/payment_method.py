@@ -6,7 +6,7 @@ from app.core.database import Base
 class PaymentMethod(Base):
     __tablename__ = "payment_methods"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     method = Column(String, unique=True)
 
     # Relationships
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UUID, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, UUID, DateTime, Date
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -8,15 +8,15 @@ from app.core.database import Base
 class PersonalInforDocument(Base):
     __tablename__ = "personal_infor_documents"
 
-    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
-    user_id = Column(UUID, ForeignKey("users.id"))
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID, ForeignKey("users.id"), index=True)
 
     full_name = Column(String)
-    date_of_birth = Column(String)  # ISO format date string
+    date_of_birth = Column(Date)
     gender = Column(String)
     address = Column(String)
 
-    identity_number = Column(String)
+    identity_number = Column(String, index=True)
     identity_img_front = Column(String)
     identity_img_back = Column(String)
     avatar = Column(String)
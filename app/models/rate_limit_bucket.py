@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Float
+from app.core.database import Base
+
+
+class RateLimitBucket(Base):
+    """
+    Token bucket of the database rate limit backend, see
+    app.core.rate_limit.DatabaseBackend.
+    """
+
+    __tablename__ = "rate_limit_buckets"
+
+    # Route, and client IP for per-client limits
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix time of the last refill, shared by every process
+    updated_at = Column(Float, nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, UUID, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, Integer, UUID, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 import uuid
 from app.core.database import Base
@@ -10,17 +10,19 @@ class Schedule(Base):
         CheckConstraint(
             "type IN ('theory', 'practice','exam')", name="check_type_of_schedule"
         ),
+        # The timetable filters the schedule types and a start_time range
+        Index("ix_schedules_type_start_time", "type", "start_time"),
     )
 
-    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
     course_id = Column(UUID, ForeignKey("courses.id"), index=True, nullable=True)
     exam_id = Column(
         UUID, ForeignKey("exams.id"), index=True, nullable=True
     )  # Nullable for non-exam schedules
-    start_time = Column(String, index=True, nullable=False)  # ISO format time string
-    end_time = Column(String, index=True, nullable=False)  # ISO format time string
-    location = Column(String, index=True, nullable=False)
-    type = Column(String, index=True, nullable=False)  # e.g., "theory", "practice"
+    start_time = Column(String, nullable=False)  # ISO format time string
+    end_time = Column(String, nullable=False)  # ISO format time string
+    location = Column(String, nullable=False)
+    type = Column(String, nullable=False)  # e.g., "theory", "practice"
     instructor_id = Column(
         UUID, ForeignKey("instructors.id"), index=True, nullable=True
     )
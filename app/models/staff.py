@@ -6,7 +6,7 @@ from app.core.database import Base
 class Staff(Base):
     __tablename__ = "staffs"
 
-    id = Column(UUID, primary_key=True, index=True)
+    id = Column(UUID, primary_key=True)
     user_id = Column(UUID, ForeignKey("users.id"))
     department = Column(String)
 
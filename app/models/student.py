@@ -10,7 +10,7 @@ from app.models import exam_result
 class Student(Base):
     __tablename__ = "students"
 
-    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
 
     user_id = Column(
         UUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True
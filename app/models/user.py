@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, UUID
+from sqlalchemy import Column, String, Boolean, UUID, DateTime
 from sqlalchemy.orm import relationship
 import uuid
 from app.core.database import Base
@@ -7,7 +7,7 @@ from app.core.database import Base
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
     user_name = Column(String, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
 
@@ -16,9 +16,9 @@ class User(Base):
 
     is_active = Column(Boolean, default=True)
     role = Column(
-        String, nullable=False
+        String, index=True, nullable=False
     )  # e.g., "student", "staff", "admin", "teacher"
-    created_at = Column(String, nullable=False)  # ISO format date string
+    created_at = Column(DateTime, nullable=False)
 
     # One-to-One relationships
     student = relationship("Student", back_populates="user", uselist=False)
@@ -9,7 +9,8 @@ from app.crud import course as course_crud
 from app.crud import health_check_schedule as health_check_schedule_crud
 from app.crud import license_type as license_type_crud
 from sqlalchemy.orm import Session
-from app.api.deps import get_db
+from app.core import cache
+from app.core.database import SessionLocal
 
 # Import Pydantic schemas instead of SQLAlchemy models
 from app.schemas.health_check_document import (
@@ -40,27 +41,31 @@ class CourseRegistrationCreate(BaseModel):
 
     @field_validator("course_id")
     def validate_course_id(cls, v):
-        db = next(get_db())
-        course = course_crud.get_course(db, course_id=v)
+        with SessionLocal() as db:
+            # Registrations almost always target an active (cached) course
+            course = cache.active_courses.get(db, v) or course_crud.get_course(
+                db, course_id=v
+            )
         if not course:
             raise ValueError(f"Course with ID {v} does not exist")
         return v
 
     @field_validator("health_check_schedule_id")
     def validate_health_check_schedule_id(cls, v):
-        db = next(get_db())
-        health_check = health_check_schedule_crud.get_health_check_schedule(
-            db, health_check_schedule_id=v
-        )
+        with SessionLocal() as db:
+            health_check = health_check_schedule_crud.get_health_check_schedule(
+                db, health_check_schedule_id=v
+            )
         if not health_check:
             raise ValueError(f"Health check schedule with ID {v} does not exist")
         return v
 
     @field_validator("license_type_id")
     def validate_license_type_id(cls, v):
-        # Use dependency injection to get db and then use the crud function
-        db = next(get_db())
-        license_type = license_type_crud.get_license_type_by_id(db, license_type_id=v)
+        with SessionLocal() as db:
+            license_type = cache.license_types.get(
+                db, v
+            ) or license_type_crud.get_license_type_by_id(db, license_type_id=v)
         if not license_type:
             raise ValueError(f"License type with ID {v} does not exist")
         return v
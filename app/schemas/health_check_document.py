@@ -1,5 +1,5 @@
-from pydantic import BaseModel, UUID4, Field
-from typing import Optional, List
+from pydantic import BaseModel, UUID4, Field, field_validator
+from typing import Literal, Optional, List
 from datetime import datetime, date
 
 from app.schemas.health_check_schedule import HealthCheckSchedule
@@ -65,3 +65,45 @@ class HealthCheckDocumentList(BaseModel):
     total: int
 
     model_config = {"from_attributes": True, "arbitrary_types_allowed": True}
+
+
+# Most results accepted in one batch, keeps the UPDATE statement bounded
+MAX_RESULTS_PER_BATCH = 1000
+
+
+class HealthCheckResult(BaseModel):
+    """Result of one student at a health check session."""
+
+    student_id: UUID4 = Field(..., description="The ID of the student.")
+    status: Literal["registered", "checked"] = Field(
+        "checked", description="The status of the health check document."
+    )
+    document: Optional[str] = Field(
+        None, description="The link of the health check document, kept when omitted."
+    )
+
+
+class HealthCheckResultBatch(BaseModel):
+    """Results of a whole health check session."""
+
+    results: List[HealthCheckResult] = Field(
+        ..., min_length=1, max_length=MAX_RESULTS_PER_BATCH
+    )
+
+    @field_validator("results")
+    @classmethod
+    def validate_unique_students(cls, results):
+        student_ids = [result.student_id for result in results]
+        if len(set(student_ids)) != len(student_ids):
+            raise ValueError("Each student can only appear once in a batch")
+        return results
+
+
+class HealthCheckResultSummary(BaseModel):
+    health_check_id: UUID4
+    requested: int
+    updated: int
+    checked: int = Field(..., description="Documents marked as checked")
+    not_found: List[UUID4] = Field(
+        ..., description="Students without a document for this health check"
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, UUID4, Field, field_validator
 from typing import Optional, List
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 
 
 class HealthCheckScheduleBase(BaseModel):
@@ -9,6 +9,8 @@ class HealthCheckScheduleBase(BaseModel):
     scheduled_datetime: datetime = Field(..., example="2025-05-01T10:00:00Z")
     description: str = Field(None, example="Annual health check")
     status: str = Field(..., example="scheduled")
+    capacity: int = Field(..., example=30)
+    booked_count: int = Field(0, example=12)
     created_at: datetime
     updated_at: datetime
 
@@ -19,6 +21,18 @@ class HealthCheckScheduleCreate(BaseModel):
     scheduled_datetime: datetime = Field(..., example="2025-05-01T10:00:00Z")
     description: Optional[str] = Field(None, example="Annual health check")
     status: str = Field("scheduled", example="scheduled")
+    capacity: Optional[int] = Field(
+        None, gt=0, example=30, description="Defaults to HEALTH_CHECK_DEFAULT_CAPACITY"
+    )
+
+    @field_validator("scheduled_datetime")
+    def validate_scheduled_datetime(cls, v):
+        # Only checked on creation: once past, a slot is still updated by
+        # the status transitions and when bookings are released
+        now = datetime.now(timezone.utc) if v.tzinfo else datetime.now()
+        if v <= now:
+            raise ValueError("Scheduled datetime must be in the future")
+        return v
 
     @field_validator("status")
     def validate_status(cls, v):
@@ -37,6 +51,7 @@ class HealthCheckScheduleUpdate(BaseModel):
     scheduled_datetime: Optional[datetime] = Field(None, example="2025-05-01T10:00:00Z")
     description: Optional[str] = Field(None, example="Annual health check")
     status: Optional[str] = Field(None, example="in_progress")
+    capacity: Optional[int] = Field(None, gt=0, example=30)
 
     @field_validator("status")
     def validate_status(cls, v):
@@ -63,3 +78,16 @@ class HealthCheckScheduleList(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Remaining places of an upcoming health check slot
+class HealthCheckSlotAvailability(BaseModel):
+    id: UUID4
+    address: str
+    scheduled_datetime: datetime
+    capacity: int
+    booked_count: int
+    remaining: int
+
+    class Config:
+        from_attributes = True
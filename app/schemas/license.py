@@ -23,7 +23,8 @@ class LicenseBase(BaseModel):
 
 
 class LicenseCreate(LicenseBase):
-    pass
+    # Allocated from the year's counter when omitted
+    license_number: Optional[str] = Field(None, example="DL12345678")
 
 
 class LicenseUpdate(BaseModel):
@@ -63,4 +64,32 @@ class LicenseList(BaseModel):
         "json_encoders": {
             UUID4: lambda v: str(v),
         }
-    }
\ No newline at end of file
+    }
+
+
+# Licenses issued to the students of a course
+class LicenseIssuance(BaseModel):
+    course_id: UUID4
+    issued: int
+    licenses: List[License]
+
+
+# An active license expiring soon
+class ExpiringLicense(BaseModel):
+    id: UUID4
+    license_number: str
+    license_type_id: Optional[UUID4] = None
+    student_id: Optional[UUID4] = None
+    student_name: Optional[str] = None
+    expiration_date: datetime
+
+    model_config = {"from_attributes": True}
+
+
+# Answer of the public license verification
+class LicenseVerification(BaseModel):
+    license_number: str
+    license_type: Optional[str] = None
+    status: Optional[str] = None
+    expiration_date: Optional[datetime] = None
+    valid: bool = Field(..., description="Active and not past its expiration date")
@@ -4,7 +4,7 @@ from typing import Optional, List
 from datetime import date
 
 class PaymentBase(BaseModel):
-    payment_method_id: UUID4
+    payment_method_id: Optional[int] = None
     evidence: str
     course_registration_id: UUID4
 
@@ -36,4 +36,67 @@ class PaymentList(RootModel):
         from_attributes = True
         json_encoders = {
             UUID4: lambda v: str(v)
-        }
\ No newline at end of file
+        }
+
+
+# A bank statement line that could not be applied
+class ReconciliationIssue(BaseModel):
+    line: int
+    reference: str
+    amount: Optional[int] = None
+    reason: str = Field(
+        ...,
+        example="amount_mismatch",
+        description="invalid, unmatched, amount_mismatch or duplicate",
+    )
+
+
+# Result of importing a bank statement
+class ReconciliationSummary(BaseModel):
+    lines: int
+    matched: int
+    payments_created: int
+    registration_ids: List[UUID4]
+    issues: List[ReconciliationIssue]
+
+
+# A payment with its registration, student, course and method
+class PaymentLedgerEntry(BaseModel):
+    id: UUID4
+    amount: float
+    evidence: Optional[str] = None
+    created_at: date
+    course_registration_id: UUID4
+    registration_status: str
+    student_id: UUID4
+    student_name: Optional[str] = None
+    course_id: UUID4
+    course_name: str
+    payment_method_id: Optional[int] = None
+    payment_method: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PaymentMethodTotal(BaseModel):
+    payment_method_id: Optional[int] = None
+    payment_method: Optional[str] = None
+    count: int
+    amount: float
+
+
+class PaymentLedgerTotals(BaseModel):
+    count: int
+    amount: float
+    by_method: List[PaymentMethodTotal]
+
+
+class PaymentLedger(BaseModel):
+    items: List[PaymentLedgerEntry]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to get the next page, null on the last page"
+    )
+    totals: Optional[PaymentLedgerTotals] = Field(
+        None, description="Totals of all matching payments, on the first page only"
+    )
@@ -37,7 +37,7 @@ class UserUpdate(BaseModel):
 class UserInDBBase(UserBase):
     id: UUID4
     hashed_password: str
-    created_at: str
+    created_at: datetime
 
     class Config:
         orm_mode = True
@@ -0,0 +1,8 @@
+# Import all job handlers here so they are registered with the job queue
+from app.tasks import registration
+from app.tasks import notification
+from app.tasks import archive
+from app.tasks import health_check
+from app.tasks import license
+from app.tasks import idempotency
+from app.tasks import rate_limit
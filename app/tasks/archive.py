@@ -0,0 +1,22 @@
+from logging import getLogger
+from typing import Any, Dict
+
+from app.core.database import SessionLocal
+from app.core.jobs import job
+from app.crud.archive import archive_completed_courses
+
+logger = getLogger(__name__)
+
+ARCHIVE_COMPLETED_COURSES = "archive.completed_courses"
+
+
+@job(ARCHIVE_COMPLETED_COURSES)
+def archive_courses(payload: Dict[str, Any]) -> None:
+    """
+    Move the data of completed courses to the archive tables.
+
+    Payload keys (optional): ``limit``, the maximum number of courses.
+    """
+    with SessionLocal() as db:
+        totals = archive_completed_courses(db, limit=payload.get("limit"))
+    logger.info(f"Archive run done: {totals}")
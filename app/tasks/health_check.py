@@ -0,0 +1,27 @@
+from logging import getLogger
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.jobs import job
+from app.core.scheduler import periodic
+from app.crud.health_check_schedule import advance_health_check_statuses
+
+logger = getLogger(__name__)
+
+ADVANCE_HEALTH_CHECK_STATUSES = "health_check.advance_statuses"
+
+
+@job(ADVANCE_HEALTH_CHECK_STATUSES)
+def advance_statuses(payload: Dict[str, Any]) -> None:
+    """
+    Start the health checks whose time has come and complete the ones that
+    are over.
+    """
+    with SessionLocal() as db:
+        counts = advance_health_check_statuses(db)
+    if any(counts.values()):
+        logger.info(f"Health check statuses advanced: {counts}")
+
+
+periodic(ADVANCE_HEALTH_CHECK_STATUSES, settings.HEALTH_CHECK_STATUS_INTERVAL)
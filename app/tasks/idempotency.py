@@ -0,0 +1,24 @@
+from logging import getLogger
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.idempotency import purge_expired_keys
+from app.core.jobs import job
+from app.core.scheduler import periodic
+
+logger = getLogger(__name__)
+
+PURGE_IDEMPOTENCY_KEYS = "idempotency.purge"
+
+
+@job(PURGE_IDEMPOTENCY_KEYS)
+def purge(payload: Dict[str, Any]) -> None:
+    """Delete the expired idempotency keys."""
+    with SessionLocal() as db:
+        purged = purge_expired_keys(db)
+    if purged:
+        logger.info(f"Purged {purged} expired idempotency keys")
+
+
+periodic(PURGE_IDEMPOTENCY_KEYS, settings.IDEMPOTENCY_PURGE_INTERVAL)
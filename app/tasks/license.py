@@ -0,0 +1,24 @@
+from logging import getLogger
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.jobs import job
+from app.core.scheduler import periodic
+from app.crud.license import expire_licenses
+
+logger = getLogger(__name__)
+
+EXPIRE_LICENSES = "license.expire"
+
+
+@job(EXPIRE_LICENSES)
+def expire(payload: Dict[str, Any]) -> None:
+    """Mark the licenses past their expiration date expired."""
+    with SessionLocal() as db:
+        expired = expire_licenses(db)
+    if expired:
+        logger.info(f"Expired {expired} licenses")
+
+
+periodic(EXPIRE_LICENSES, settings.LICENSE_EXPIRY_INTERVAL)
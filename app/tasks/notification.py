@@ -0,0 +1,115 @@
+from logging import getLogger
+from typing import Any, Dict, List, Optional
+import uuid
+
+from app.core import jobs
+from app.core.database import SessionLocal
+from app.core.jobs import job
+from app.core.notifications import (
+    CHANNEL_EMAIL,
+    CHANNEL_SMS,
+    Message,
+    deliver,
+    enabled_channels,
+)
+from app.crud.notification import get_course_recipients, get_health_check_recipients
+
+logger = getLogger(__name__)
+
+SCHEDULE_CHANGED = "notifications.schedule_changed"
+HEALTH_CHECK_CHANGED = "notifications.health_check_changed"
+
+# Fields whose change is worth telling the students about
+SCHEDULE_NOTIFY_FIELDS = ("start_time", "end_time", "location")
+HEALTH_CHECK_NOTIFY_FIELDS = ("scheduled_datetime", "address")
+
+
+def changed_fields(
+    old: Dict[str, Any], new: Dict[str, Any], fields
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """Compare two snapshots and return {field: {"old": ..., "new": ...}} for changes."""
+    changes = {}
+    for field in fields:
+        if field not in new:
+            continue
+        old_value = str(old.get(field)) if old.get(field) is not None else None
+        new_value = str(new[field]) if new[field] is not None else None
+        if old_value != new_value:
+            changes[field] = {"old": old_value, "new": new_value}
+    return changes
+
+
+def _build_messages(recipients, subject: str, body: str) -> List[Message]:
+    channels = enabled_channels()
+    messages = []
+    for recipient in recipients:
+        greeting = f"Xin chào {recipient.full_name}," if recipient.full_name else ""
+        text = f"{greeting}\n{body}".strip()
+        if CHANNEL_EMAIL in channels and recipient.email:
+            messages.append(Message(CHANNEL_EMAIL, recipient.email, subject, text))
+        if CHANNEL_SMS in channels and recipient.phone_number:
+            messages.append(Message(CHANNEL_SMS, recipient.phone_number, subject, body))
+    return messages
+
+
+def _describe(changes: Dict[str, Dict[str, Optional[str]]]) -> str:
+    return "\n".join(
+        f"- {field}: {change['old']} -> {change['new']}"
+        for field, change in changes.items()
+    )
+
+
+@job(SCHEDULE_CHANGED)
+def send_schedule_changed(payload: Dict[str, Any]) -> None:
+    """Tell every student of the course that a class schedule changed."""
+    course_id = uuid.UUID(payload["course_id"])
+    with SessionLocal() as db:
+        recipients = get_course_recipients(db, course_id)
+
+    body = f"Lịch học của khóa học đã thay đổi:\n{_describe(payload['changes'])}"
+    sent = deliver(
+        _build_messages(recipients, "Thay đổi lịch học", body),
+        payload.setdefault("delivered", []),
+    )
+    logger.info(f"Schedule {payload['schedule_id']} change sent to {sent} recipients")
+
+
+@job(HEALTH_CHECK_CHANGED)
+def send_health_check_changed(payload: Dict[str, Any]) -> None:
+    """Tell every student booked on a health check that its time or place changed."""
+    schedule_id = uuid.UUID(payload["health_check_schedule_id"])
+    with SessionLocal() as db:
+        recipients = get_health_check_recipients(db, schedule_id)
+
+    body = f"Lịch khám sức khỏe đã thay đổi:\n{_describe(payload['changes'])}"
+    sent = deliver(
+        _build_messages(recipients, "Thay đổi lịch khám sức khỏe", body),
+        payload.setdefault("delivered", []),
+    )
+    logger.info(f"Health check {schedule_id} change sent to {sent} recipients")
+
+
+def notify_schedule_changed(
+    schedule_id: uuid.UUID, course_id: Optional[uuid.UUID], changes: Dict
+) -> None:
+    """Queue a single notification job for a schedule change, if anything changed."""
+    if not changes or course_id is None:
+        return
+    jobs.enqueue(
+        SCHEDULE_CHANGED,
+        {
+            "schedule_id": str(schedule_id),
+            "course_id": str(course_id),
+            "changes": changes,
+        },
+    )
+
+
+def notify_health_check_changed(schedule_id: uuid.UUID, changes: Dict) -> None:
+    """Queue a single notification job for a health check change, if anything changed."""
+    if not changes:
+        return
+    jobs.enqueue(
+        HEALTH_CHECK_CHANGED,
+        {"health_check_schedule_id": str(schedule_id), "changes": changes},
+    )
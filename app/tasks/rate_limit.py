@@ -0,0 +1,26 @@
+from logging import getLogger
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.jobs import job
+from app.core.rate_limit import purge_idle_buckets
+from app.core.scheduler import periodic
+
+logger = getLogger(__name__)
+
+PURGE_RATE_LIMIT_BUCKETS = "rate_limit.purge"
+
+
+@job(PURGE_RATE_LIMIT_BUCKETS)
+def purge(payload: Dict[str, Any]) -> None:
+    """Delete the rate limit buckets of the clients gone quiet."""
+    with SessionLocal() as db:
+        purged = purge_idle_buckets(db)
+    if purged:
+        logger.info(f"Purged {purged} idle rate limit buckets")
+
+
+# Only the database backend keeps its buckets in a table
+if settings.RATE_LIMIT_BACKEND == "database":
+    periodic(PURGE_RATE_LIMIT_BUCKETS, 3600)
@@ -0,0 +1,42 @@
+from logging import getLogger
+from typing import Any, Dict
+import uuid
+
+from app.core import thumbnails
+from app.core.database import SessionLocal
+from app.core.jobs import job
+from app.models.course_registration import CourseRegistration
+from app.models.personal_infor_document import PersonalInforDocument
+from app.models.student import Student
+
+logger = getLogger(__name__)
+
+POST_PROCESS = "registration.post_process"
+
+
+@job(POST_PROCESS)
+def post_process_registration(payload: Dict[str, Any]) -> None:
+    """
+    Work done after a course registration is committed.
+
+    Generates the thumbnails of the registration images.
+    """
+    registration_id = uuid.UUID(payload["registration_id"])
+    with SessionLocal() as db:
+        personal_doc = (
+            db.query(PersonalInforDocument)
+            .join(Student, Student.user_id == PersonalInforDocument.user_id)
+            .join(CourseRegistration, CourseRegistration.student_id == Student.id)
+            .filter(CourseRegistration.id == registration_id)
+            .first()
+        )
+        if personal_doc is None:
+            logger.warning(f"No personal document for registration {registration_id}")
+            return
+        images = [
+            personal_doc.avatar,
+            personal_doc.identity_img_front,
+            personal_doc.identity_img_back,
+        ]
+
+    thumbnails.generate_for_refs(images)
@@ -0,0 +1,281 @@
+"""
+Index audit of the benchmark workload.
+
+Runs the API scenarios of bench.run and the CRUD lookups below against a
+seeded database while recording query patterns, then prints the indexes
+missing from Base.metadata for them and for unindexed foreign keys:
+
+    python -m bench.index_audit --seed
+    python -m bench.index_audit --operations    # as Alembic operations
+
+--check runs EXPLAIN on the CRUD filters the indexes were added for and
+exits with 1 when the planner does not use the expected index.
+"""
+
+import argparse
+import os
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bench.run import DEFAULT_DATABASE_URL
+
+
+def lookups(db) -> Dict[str, Callable]:
+    """CRUD lookups by foreign key, with ids taken from the seeded data."""
+    from app.crud import course_registration as course_registration_crud
+    from app.crud import health_check_document as health_check_document_crud
+    from app.crud import notification as notification_crud
+    from app.crud import personal_infor_document as personal_infor_document_crud
+    from app.models import (
+        CourseRegistration,
+        HealthCheckDocument,
+        PersonalInforDocument,
+        Student,
+    )
+
+    registration = db.query(CourseRegistration).first()
+    student = db.query(Student).filter(Student.id == registration.student_id).first()
+    personal = (
+        db.query(PersonalInforDocument)
+        .filter(PersonalInforDocument.user_id == student.user_id)
+        .first()
+    )
+    health_check = db.query(HealthCheckDocument).first()
+
+    return {
+        "registration by identity number": lambda: (
+            course_registration_crud.get_course_registration_by_identity_number(
+                db, personal.identity_number
+            )
+        ),
+        "personal document by user": lambda: personal_infor_document_crud.getByUserID(
+            db, student.user_id
+        ),
+        "health check documents by student": lambda: (
+            health_check_document_crud.get_health_check_documents_by_student_id(
+                db, health_check.student_id
+            )
+        ),
+        "course recipients": lambda: notification_crud.get_course_recipients(
+            db, registration.course_id
+        ),
+        "health check recipients": lambda: notification_crud.get_health_check_recipients(
+            db, health_check.health_check_id
+        ),
+    }
+
+
+def explain_checks() -> List[Tuple[str, object]]:
+    """(expected index, statement) pairs mirroring the CRUD filters."""
+    import uuid
+    from datetime import datetime
+
+    from sqlalchemy import select
+
+    from app.models import (
+        CourseRegistration,
+        Exam,
+        ExamResult,
+        HealthCheckSchedule,
+        License,
+        Payment,
+        PersonalInforDocument,
+        Schedule,
+        User,
+    )
+
+    some_id = uuid.uuid4()
+    return [
+        (
+            "ix_course_registrations_student_id",
+            select(CourseRegistration).where(CourseRegistration.student_id == some_id),
+        ),
+        (
+            "ix_course_registrations_course_id_status",
+            select(CourseRegistration.student_id).where(
+                CourseRegistration.course_id == some_id,
+                CourseRegistration.status == "successful",
+            ),
+        ),
+        (
+            "ix_course_registrations_status_method",
+            select(CourseRegistration).where(
+                CourseRegistration.status == "pending", CourseRegistration.method == "online"
+            ),
+        ),
+        (
+            "ix_personal_infor_documents_user_id",
+            select(PersonalInforDocument).where(PersonalInforDocument.user_id == some_id),
+        ),
+        (
+            "ix_personal_infor_documents_identity_number",
+            select(PersonalInforDocument).where(
+                PersonalInforDocument.identity_number == "000000000000"
+            ),
+        ),
+        (
+            "ix_payments_course_registration_id",
+            select(Payment).where(Payment.course_registration_id == some_id),
+        ),
+        (
+            "ix_exam_results_student_id_exam_id",
+            select(ExamResult).where(ExamResult.student_id == some_id),
+        ),
+        (
+            "ix_exam_results_exam_id",
+            select(ExamResult).where(ExamResult.exam_id == some_id),
+        ),
+        ("ix_exams_course_id", select(Exam).where(Exam.course_id == some_id)),
+        ("ix_users_role", select(User).where(User.role == "admin")),
+        (
+            "ix_schedules_type_start_time",
+            select(Schedule).where(
+                Schedule.start_time >= "2026-01-01",
+                Schedule.start_time <= "2026-01-31",
+                Schedule.type.in_(["theory", "practice", "exam"]),
+            ),
+        ),
+        (
+            "ix_health_check_schedules_status_scheduled_datetime",
+            select(HealthCheckSchedule)
+            .where(
+                HealthCheckSchedule.status == "scheduled",
+                HealthCheckSchedule.scheduled_datetime > datetime.now(),
+            )
+            .order_by(HealthCheckSchedule.scheduled_datetime),
+        ),
+        (
+            "ix_health_check_schedules_course_id_scheduled_datetime",
+            select(HealthCheckSchedule.id, HealthCheckSchedule.capacity)
+            .where(
+                HealthCheckSchedule.course_id == some_id,
+                HealthCheckSchedule.scheduled_datetime > datetime.now(),
+                HealthCheckSchedule.status == "scheduled",
+            )
+            .order_by(HealthCheckSchedule.scheduled_datetime),
+        ),
+        (
+            "ix_course_registrations_created_at",
+            select(CourseRegistration)
+            .where(
+                CourseRegistration.created_at >= datetime(2026, 1, 1),
+                CourseRegistration.created_at < datetime(2026, 2, 1),
+            )
+            .order_by(CourseRegistration.created_at.desc())
+            .limit(50),
+        ),
+        (
+            "ix_licenses_student_id_license_type_id",
+            select(License.id).where(
+                License.student_id == some_id, License.license_type_id == some_id
+            ),
+        ),
+        (
+            "ix_licenses_status_expiration_date",
+            select(License.id).where(
+                License.status == "active", License.expiration_date <= datetime.now()
+            ),
+        ),
+        (
+            "ix_payments_created_at_id",
+            select(Payment)
+            .where(Payment.created_at <= datetime.now().date())
+            .order_by(Payment.created_at.desc(), Payment.id.desc())
+            .limit(50),
+        ),
+    ]
+
+
+def run_checks(engine) -> int:
+    from sqlalchemy import text
+
+    from app.core.index_audit import explain
+
+    failures = 0
+    with engine.connect() as connection:
+        # Plan with the statistics of the seeded data, as the server does once
+        # autovacuum analyzed the tables: without them an equality on a low
+        # cardinality column (status) looks as selective as one on a key
+        connection.execute(text("ANALYZE"))
+        connection.commit()
+        for index_name, statement in explain_checks():
+            plan = explain(connection, statement)
+            used = index_name in plan
+            failures += not used
+            print(f"{'ok  ' if used else 'FAIL'} {index_name}")
+            if not used:
+                print("     " + plan.replace("\n", "\n     "))
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Propose missing indexes")
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL),
+    )
+    parser.add_argument("--seed", action="store_true", help="Reseed the database first")
+    parser.add_argument("--profile", default="small")
+    parser.add_argument(
+        "--operations", action="store_true", help="Print Alembic operations"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Check index use with EXPLAIN"
+    )
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("JOB_WORKER_IN_PROCESS", "false")
+
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.index_audit import (
+        QueryPatternRecorder,
+        propose_indexes,
+        render_operations,
+    )
+    from bench.run import scenarios
+    from bench.seed import seed
+
+    if args.seed:
+        seed(engine, args.profile)
+
+    if args.check:
+        failures = run_checks(engine)
+        print(f"{failures} failed")
+        return 1 if failures else 0
+
+    recorder = QueryPatternRecorder().attach(engine)
+    with TestClient(app_main.app) as client:
+        for request in scenarios(client).values():
+            request()
+    with SessionLocal() as db:
+        for lookup in lookups(db).values():
+            lookup()
+    recorder.detach()
+
+    proposals = propose_indexes(Base.metadata, recorder.patterns)
+    if args.operations:
+        print(render_operations(proposals))
+        return 0
+
+    print(f"{'table':32} {'columns':44} {'reason':12} {'hits':>5}  replaces")
+    for proposal in proposals:
+        print(
+            f"{proposal.table:32} {', '.join(proposal.columns):44} "
+            f"{proposal.reason:12} {proposal.hits:>5}  "
+            f"{', '.join(proposal.replaces) if proposal.replaces else ''}"
+        )
+    if recorder.text_statements:
+        print(
+            f"\n{recorder.text_statements} text() statements were executed and "
+            "could not be analysed"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
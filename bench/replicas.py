@@ -0,0 +1,149 @@
+"""
+Local stand-in for a primary with a read replica, using two SQLite files.
+
+The primary is seeded, then copied to the replica file; "replication" only
+happens when replicate() copies it again, which makes replica lag easy to
+observe. A third replica URL points to a path that cannot be opened so the
+health check has something to reject. The script checks that:
+
+- read-only endpoints are served by the replica, never the unhealthy one
+- writes go to the primary
+- a client reads from the primary right after writing (read-your-writes)
+- other clients keep reading the replica until it catches up
+
+    python -m bench.replicas --dir /tmp/replicas
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from typing import List, Optional
+
+
+def replicate(primary_path: str, replica_path: str) -> None:
+    """Copy the primary database file onto the replica."""
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+class EngineCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def delta(self, since: int) -> int:
+        return self.count - since
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check read-replica routing locally")
+    parser.add_argument("--dir", default="replica_standin")
+    parser.add_argument("--profile", default="small")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dir, exist_ok=True)
+    primary_path = os.path.abspath(os.path.join(args.dir, "primary.db"))
+    replica_path = os.path.abspath(os.path.join(args.dir, "replica.db"))
+    broken_url = "sqlite:///" + os.path.join(primary_path, "missing", "replica.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{primary_path}"
+    os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{replica_path},{broken_url}"
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("JOB_WORKER_IN_PROCESS", "false")
+    os.environ.setdefault("REPLICA_HEALTH_CHECK_INTERVAL", "3600")
+
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+    from app.core.database import engine, replica_set
+    from app.core.replicas import PIN_COOKIE
+    from bench.seed import BENCH_ADMIN_PASSWORD, BENCH_ADMIN_USERNAME, seed
+
+    seed(engine, args.profile)
+    engine.dispose()
+    replicate(primary_path, replica_path)
+
+    primary = EngineCounter(engine)
+    replica = EngineCounter(replica_set.replicas[0].engine)
+    failures = []
+
+    def check(name: str, ok: bool, detail: str = "") -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {name}{f' ({detail})' if detail else ''}")
+        if not ok:
+            failures.append(name)
+
+    with TestClient(app_main.app) as client:
+        check(
+            "broken replica marked down",
+            [r.healthy for r in replica_set.replicas] == [True, False],
+        )
+
+        for _ in range(4):
+            before_primary, before_replica = primary.count, replica.count
+            response = client.get("/api/courses/")
+            check(
+                "list served by replica",
+                response.status_code == 200
+                and primary.delta(before_primary) == 0
+                and replica.delta(before_replica) > 0,
+                f"primary {primary.delta(before_primary)}, replica {replica.delta(before_replica)}",
+            )
+
+        token = client.post(
+            "/api/users/login",
+            data={"username": BENCH_ADMIN_USERNAME, "password": BENCH_ADMIN_PASSWORD},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        before_primary, before_replica = primary.count, replica.count
+        created = client.post(
+            "/api/license_type/",
+            json={
+                "type_name": "Replica check",
+                "age_requirement": "18",
+                "health_requirements": "none",
+                "training_duration": 30,
+                "fee": 1,
+            },
+            headers=headers,
+        )
+        check(
+            "write goes to primary",
+            created.status_code == 201 and replica.delta(before_replica) == 0,
+            f"status {created.status_code}, replica {replica.delta(before_replica)}",
+        )
+        check("write pins client to primary", PIN_COOKIE in client.cookies)
+        url = f"/api/license_type/{created.json()['id']}"
+
+        before_primary = primary.count
+        response = client.get(url, headers=headers)
+        check(
+            "pinned client reads its write",
+            response.status_code == 200 and primary.delta(before_primary) > 0,
+            f"status {response.status_code}",
+        )
+
+        client.cookies.clear()
+        response = client.get(url, headers=headers)
+        check("other clients read the lagging replica", response.status_code == 404)
+
+        replicate(primary_path, replica_path)
+        response = client.get(url, headers=headers)
+        check("replica catches up", response.status_code == 200)
+
+    print(f"{len(failures)} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+API benchmark: drives the hot endpoints through TestClient and reports
+latency percentiles, SQL statements per request and peak memory.
+
+    python -m bench.run --seed --profile small
+    python -m bench.run --save-baseline
+    python -m bench.run --compare          # exit code 1 on regression
+
+The database defaults to a local SQLite file. Results are compared with a
+JSON baseline stored under bench/baselines/.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+DEFAULT_DATABASE_URL = "sqlite:///bench.db"
+
+# Allowed slowdown before a scenario counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StatementCounter:
+    """Counts SQL statements executed by the engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def scenarios(client) -> Dict[str, Callable]:
+    from bench.seed import BENCH_ADMIN_PASSWORD, BENCH_ADMIN_USERNAME
+
+    week_start = date.today()
+    week_end = week_start + timedelta(days=7)
+
+    return {
+        "GET /api/course_registration/": lambda: client.get("/api/course_registration/"),
+        "GET /api/course_registration/?fields=id,status": lambda: client.get(
+            "/api/course_registration/", params={"fields": "id,status"}
+        ),
+        "GET /api/schedule/": lambda: client.get(
+            "/api/schedule/",
+            params={"start_time": week_start.isoformat(), "end_time": week_end.isoformat()},
+        ),
+        "GET /api/students/registered/": lambda: client.get("/api/students/registered/"),
+        "POST /api/users/login": lambda: client.post(
+            "/api/users/login",
+            data={"username": BENCH_ADMIN_USERNAME, "password": BENCH_ADMIN_PASSWORD},
+        ),
+    }
+
+
+def run_scenario(call: Callable, counter: StatementCounter, iterations: int, warmup: int) -> Dict:
+    for _ in range(warmup):
+        call()
+
+    latencies = []
+    statements = []
+    for _ in range(iterations):
+        before = counter.count
+        started = time.perf_counter()
+        response = call()
+        latencies.append((time.perf_counter() - started) * 1000)
+        statements.append(counter.count - before)
+        if response.status_code >= 500:
+            raise RuntimeError(f"Request failed with {response.status_code}: {response.text[:200]}")
+
+    # Separate pass: tracemalloc slows down the interpreter
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "statements": max(statements),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "response_bytes": len(response.content),
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a description of every metric that regressed against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {base['p50_ms']}ms -> {result['p50_ms']}ms")
+        if result["statements"] > base["statements"]:
+            regressions.append(
+                f"{name}: SQL statements {base['statements']} -> {result['statements']}"
+            )
+        if result["peak_memory_kb"] > base["peak_memory_kb"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak memory {base['peak_memory_kb']}KB -> {result['peak_memory_kb']}KB"
+            )
+    return regressions
+
+
+def print_table(results: Dict) -> None:
+    header = f"{'scenario':36} {'p50':>9} {'p90':>9} {'p99':>9} {'sql':>6} {'peak KB':>9} {'bytes':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:36} {r['p50_ms']:>9.2f} {r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['statements']:>6} {r['peak_memory_kb']:>9.1f} {r['response_bytes']:>9}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--seed", action="store_true", help="recreate and seed the database first")
+    parser.add_argument("--profile", default="small", help="seed profile: small, medium or full")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", action="append", help="run only scenarios containing this text")
+    parser.add_argument("--baseline", help="baseline file (default: bench/baselines/<profile>.json)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="fail on regression against the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    # Settings are read at import time, configure before importing the app
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("JOB_WORKER_IN_PROCESS", "false")
+    # The scenarios log in far more often than a client may
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from fastapi.testclient import TestClient
+
+    from app.core.database import engine
+    import main as app_main
+
+    if args.seed:
+        from bench.seed import seed
+
+        started = time.perf_counter()
+        counts = seed(engine, args.profile)
+        print(f"Seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s: {counts}")
+
+    counter = StatementCounter(engine)
+    results = {}
+    with TestClient(app_main.app) as client:
+        for name, call in scenarios(client).items():
+            if args.only and not any(text in name for text in args.only):
+                continue
+            results[name] = run_scenario(call, counter, args.iterations, args.warmup)
+
+    print_table(results)
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.profile}.json")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {baseline_path}")
+
+    if args.compare:
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Synthetic data generator for benchmarks.
+
+Rows are generated in chunks and written with Core executemany inserts,
+bypassing the ORM unit of work, so the full profile (200k registrations)
+loads in minutes on SQLite.
+"""
+
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List
+
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base
+from app.core.security import get_password_hash
+
+BENCH_ADMIN_USERNAME = "bench_admin"
+BENCH_ADMIN_PASSWORD = "bench_admin_password"
+STUDENT_PASSWORD = "student_password"
+
+CHUNK_SIZE = 5000
+
+FIRST_NAMES = ["An", "Bình", "Chi", "Dũng", "Giang", "Hà", "Hùng", "Lan", "Minh", "Nam"]
+LAST_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng"]
+LOCATIONS = ["Sân tập A", "Sân tập B", "Phòng học 1", "Phòng học 2", "Phòng học 3"]
+REGISTRATION_STATUSES = ["pending", "payment", "successful", "successful", "rejected"]
+
+
+@dataclass
+class Profile:
+    license_types: int
+    courses: int
+    schedules_per_course: int
+    registrations: int
+
+
+PROFILES: Dict[str, Profile] = {
+    "small": Profile(license_types=5, courses=100, schedules_per_course=8, registrations=2_000),
+    "medium": Profile(license_types=10, courses=1_000, schedules_per_course=8, registrations=20_000),
+    "full": Profile(license_types=10, courses=10_000, schedules_per_course=8, registrations=200_000),
+}
+
+
+def _chunks(rows: Iterator[dict], size: int = CHUNK_SIZE) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(conn, table_name: str, rows: Iterator[dict]) -> int:
+    table = Base.metadata.tables[table_name]
+    count = 0
+    for chunk in _chunks(rows):
+        conn.execute(table.insert(), chunk)
+        count += len(chunk)
+    return count
+
+
+def seed(engine: Engine, profile_name: str = "small", random_seed: int = 42) -> Dict[str, int]:
+    """
+    Drop and recreate the schema, then fill it with synthetic data. All
+    application models must be imported beforehand (importing ``main`` does).
+
+    Args:
+        engine: Engine of the benchmark database
+        profile_name: Key of PROFILES giving the data volumes
+        random_seed: Seed making the generated data reproducible
+
+    Returns:
+        Number of rows inserted per table
+    """
+    profile = PROFILES[profile_name]
+    rng = random.Random(random_seed)
+    now = datetime.now()
+    today = date.today()
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    # bcrypt is slow on purpose: hash once and share it between generated users
+    student_hash = get_password_hash(STUDENT_PASSWORD)
+
+    license_types = [
+        {
+            "id": uuid.uuid4(),
+            "type_name": f"B{i}",
+            "age_requirement": "18",
+            "health_requirements": "Đủ sức khỏe",
+            "training_duration": 90,
+            "fee": 5_000_000 + i * 500_000,
+        }
+        for i in range(profile.license_types)
+    ]
+
+    courses = []
+    for i in range(profile.courses):
+        start = today - timedelta(days=rng.randint(-180, 6 * 365))
+        courses.append(
+            {
+                "id": uuid.uuid4(),
+                "course_name": f"Khóa {i}",
+                "license_type_id": rng.choice(license_types)["id"],
+                "start_date": start,
+                "end_date": start + timedelta(days=90),
+                "max_students": 50,
+                "current_students": 0,
+                "price": 15_000_000,
+                "status": "active" if start > today - timedelta(days=90) else "inactive",
+                "created_at": start - timedelta(days=30),
+                "updated_at": start - timedelta(days=30),
+            }
+        )
+
+    health_checks = [
+        {
+            "id": uuid.uuid4(),
+            "course_id": course["id"],
+            "address": rng.choice(LOCATIONS),
+            "scheduled_datetime": datetime.combine(course["start_date"], datetime.min.time())
+            + timedelta(days=365 * 10),
+            "description": "Khám sức khỏe",
+            "status": "scheduled",
+            "capacity": 0,
+            "booked_count": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for course in courses
+    ]
+    health_check_by_course = {hc["course_id"]: hc["id"] for hc in health_checks}
+
+    def schedules():
+        for course in courses:
+            for n in range(profile.schedules_per_course):
+                start = datetime.combine(course["start_date"], datetime.min.time()) + timedelta(
+                    days=n * 7, hours=8
+                )
+                yield {
+                    "id": uuid.uuid4(),
+                    "course_id": course["id"],
+                    "start_time": start.isoformat(),
+                    "end_time": (start + timedelta(hours=2)).isoformat(),
+                    "location": rng.choice(LOCATIONS),
+                    "type": "theory" if n % 2 == 0 else "practice",
+                    "max_students": 30,
+                }
+
+    # One user, student, personal document, health check document and
+    # registration per applicant, plus two exam results for finished courses
+    applicants = []
+    for i in range(profile.registrations):
+        course = courses[i % len(courses)]
+        applicants.append(
+            {
+                "user_id": uuid.uuid4(),
+                "student_id": uuid.uuid4(),
+                "course": course,
+                "identity_number": f"{i:012d}",
+                "status": rng.choice(REGISTRATION_STATUSES),
+            }
+        )
+
+    # Every applicant is booked on the health check of their course
+    health_check_by_id = {hc["id"]: hc for hc in health_checks}
+    for a in applicants:
+        health_check_by_id[health_check_by_course[a["course"]["id"]]]["booked_count"] += 1
+    for hc in health_checks:
+        hc["capacity"] = max(50, hc["booked_count"])
+
+    def users():
+        yield {
+            "id": uuid.uuid4(),
+            "user_name": BENCH_ADMIN_USERNAME,
+            "hashed_password": get_password_hash(BENCH_ADMIN_PASSWORD),
+            "phone_number": "0900000000",
+            "email": "bench_admin@example.com",
+            "is_active": True,
+            "role": "admin",
+            "created_at": now,
+        }
+        for a in applicants:
+            yield {
+                "id": a["user_id"],
+                "user_name": a["identity_number"],
+                "hashed_password": student_hash,
+                "phone_number": f"09{rng.randint(0, 99_999_999):08d}",
+                "email": f"{a['identity_number']}@example.com",
+                "is_active": True,
+                "role": "user",
+                "created_at": now,
+            }
+
+    def students():
+        for a in applicants:
+            yield {"id": a["student_id"], "user_id": a["user_id"], "created_at": now}
+
+    def personal_documents():
+        for a in applicants:
+            yield {
+                "id": uuid.uuid4(),
+                "user_id": a["user_id"],
+                "full_name": f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}",
+                "date_of_birth": today - timedelta(days=rng.randint(18 * 365, 50 * 365)),
+                "gender": rng.choice(["Nam", "Nữ"]),
+                "address": "Hồ Chí Minh",
+                "identity_number": a["identity_number"],
+                "identity_img_front": f"https://cdn.example.com/id/{a['identity_number']}_front.jpg",
+                "identity_img_back": f"https://cdn.example.com/id/{a['identity_number']}_back.jpg",
+                "avatar": f"https://cdn.example.com/avatar/{a['identity_number']}.jpg",
+                "created_at": now,
+                "updated_at": now,
+            }
+
+    def health_check_documents():
+        for a in applicants:
+            yield {
+                "id": uuid.uuid4(),
+                "student_id": a["student_id"],
+                "health_check_id": health_check_by_course[a["course"]["id"]],
+                "document": "",
+                "status": rng.choice(["registered", "checked"]),
+                "created_at": now,
+                "updated_at": now,
+            }
+
+    def registrations():
+        for a in applicants:
+            created = datetime.combine(a["course"]["start_date"], datetime.min.time()) - timedelta(
+                days=rng.randint(1, 60)
+            )
+            yield {
+                "id": uuid.uuid4(),
+                "student_id": a["student_id"],
+                "course_id": a["course"]["id"],
+                "created_at": created,
+                "updated_at": created,
+                "method": rng.choice(["online", "offline"]),
+                "status": a["status"],
+            }
+
+    exams = {}
+    for course in courses:
+        for exam_type in ("theory", "practice"):
+            exams[(course["id"], exam_type)] = {
+                "id": uuid.uuid4(),
+                "course_id": course["id"],
+                "type": exam_type,
+            }
+
+    def exam_results():
+        for a in applicants:
+            if a["course"]["end_date"] >= today:
+                continue
+            for exam_type in ("theory", "practice"):
+                yield {
+                    "id": uuid.uuid4(),
+                    "exam_id": exams[(a["course"]["id"], exam_type)]["id"],
+                    "student_id": a["student_id"],
+                    "score": round(rng.uniform(4, 10), 1),
+                }
+
+    counts = {}
+    with engine.begin() as conn:
+        counts["license_types"] = _insert(conn, "license_types", iter(license_types))
+        counts["courses"] = _insert(conn, "courses", iter(courses))
+        counts["health_check_schedules"] = _insert(conn, "health_check_schedules", iter(health_checks))
+        counts["schedules"] = _insert(conn, "schedules", schedules())
+        counts["users"] = _insert(conn, "users", users())
+        counts["students"] = _insert(conn, "students", students())
+        counts["personal_infor_documents"] = _insert(conn, "personal_infor_documents", personal_documents())
+        counts["health_check_documents"] = _insert(conn, "health_check_documents", health_check_documents())
+        counts["course_registrations"] = _insert(conn, "course_registrations", registrations())
+        counts["exams"] = _insert(conn, "exams", iter(exams.values()))
+        counts["exam_results"] = _insert(conn, "exam_results", exam_results())
+    return counts
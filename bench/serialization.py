@@ -0,0 +1,231 @@
+"""
+Per-row serialization cost of the registration and schedule lists.
+
+Compares the default FastAPI path (models built by the handler, validated
+again against response_model, then jsonable_encoder and json.dumps) with
+the path used by the endpoints (models built by the handler, then a single
+pydantic-core dump_json), and the same with models assembled through
+model_construct. No database is needed:
+
+    python -m bench.serialization --rows 1000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.serialization import json_response
+from app.schemas.course_registration import (
+    ChooseData,
+    CoursePersonalData,
+    CourseRegistrationResponse,
+    CourseStudent,
+    CourseType,
+    HealthCheckType,
+    PersonalImgData,
+    ScheduleType,
+    TypeOfLicense,
+)
+from app.schemas.schedule import ScheduleList, ScheduleResponse
+
+SCHEDULES_PER_REGISTRATION = 8
+
+
+def _validated(cls, **fields):
+    return cls(**fields)
+
+
+def _constructed(cls, **fields):
+    return cls.model_construct(**fields)
+
+
+def raw_registrations(rows: int) -> List[dict]:
+    """Column values as read from the database, generated once per run."""
+    start = datetime(2025, 1, 6, 8)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "course_id": str(uuid.uuid4()),
+            "license_type_id": str(uuid.uuid4()),
+            "health_check_id": str(uuid.uuid4()),
+            "identity_number": f"{i:012d}",
+            "schedules": [
+                (
+                    str(uuid.uuid4()),
+                    (start + timedelta(days=7 * n)).strftime("%Y-%m-%d %H:%M:%S"),
+                    (start + timedelta(days=7 * n, hours=2)).strftime("%Y-%m-%d %H:%M:%S"),
+                )
+                for n in range(SCHEDULES_PER_REGISTRATION)
+            ],
+        }
+        for i in range(rows)
+    ]
+
+
+def build_registrations(raw: List[dict], build: Callable) -> List[CourseRegistrationResponse]:
+    result = []
+    for row in raw:
+        license_type = build(TypeOfLicense, id=row["license_type_id"], name="B2")
+        result.append(
+            build(
+                CourseRegistrationResponse,
+                id=row["id"],
+                method="online",
+                registrationDate="2025-01-01T10:00:00",
+                status="pending",
+                studentInfor=build(
+                    CourseStudent,
+                    personalData=build(
+                        CoursePersonalData,
+                        name="Nguyễn An",
+                        identityNumber=row["identity_number"],
+                        address="Hồ Chí Minh",
+                        phone="0900000000",
+                        gender="Nam",
+                        birthDate="2000-01-01",
+                        licenseType="B2",
+                        email=f"{row['identity_number']}@example.com",
+                        healthCheckDocURL="",
+                    ),
+                    personalImgData=build(
+                        PersonalImgData,
+                        avatar="https://cdn.example.com/a.jpg",
+                        cardImgFront="https://cdn.example.com/f.jpg",
+                        cardImgBack="https://cdn.example.com/b.jpg",
+                    ),
+                    chooseData=build(
+                        ChooseData,
+                        course=build(
+                            CourseType,
+                            id=row["course_id"],
+                            name="Khóa 1",
+                            licenseTypeId=row["license_type_id"],
+                            examDate="2025-04-01",
+                            startDate="2025-01-06",
+                            endDate="2025-04-01",
+                            registeredCount=0,
+                            maxStudents=50,
+                        ),
+                        healthCheck=build(
+                            HealthCheckType,
+                            id=row["health_check_id"],
+                            name="Khám sức khỏe",
+                            date="2025-01-03",
+                            address="Phòng khám",
+                            courseId=row["course_id"],
+                        ),
+                    ),
+                ),
+                scheduleInfor=[
+                    build(
+                        ScheduleType,
+                        id=schedule_id,
+                        courseId=row["course_id"],
+                        typeOfLicense=license_type,
+                        type="theory",
+                        startTime=start_time,
+                        endTime=end_time,
+                        location="Sân tập A",
+                    )
+                    for schedule_id, start_time, end_time in row["schedules"]
+                ],
+            )
+        )
+    return result
+
+
+def raw_schedules(rows: int) -> List[dict]:
+    start = datetime(2025, 1, 6, 8)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "course_id": uuid.uuid4(),
+            "license_type_id": uuid.uuid4(),
+            "start_time": start + timedelta(hours=i),
+            "end_time": start + timedelta(hours=i + 2),
+        }
+        for i in range(rows)
+    ]
+
+
+def build_schedules(raw: List[dict], build: Callable) -> ScheduleList:
+    items = [
+        build(
+            ScheduleResponse,
+            id=row["id"],
+            course_id=row["course_id"],
+            course_name="Khóa 1",
+            license_type_id=row["license_type_id"],
+            license_type_name="B2",
+            exam_id=None,
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            location="Sân tập A",
+            type="practice",
+            instructor_id=None,
+            max_students=30,
+        )
+        for row in raw
+    ]
+    return build(ScheduleList, items=items, total=len(items))
+
+
+def default_path(response_type, data) -> bytes:
+    field = create_model_field(name="Response", type_=response_type, mode="serialization")
+    content = asyncio.run(serialize_response(field=field, response_content=data))
+    return JSONResponse(content).body
+
+
+def fast_path(response_type, data) -> bytes:
+    return json_response(response_type, data).body
+
+
+def timed(func: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare response serialization paths")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("registrations", list[CourseRegistrationResponse], raw_registrations, build_registrations),
+        ("schedules", ScheduleList, raw_schedules, build_schedules),
+    ]
+    print(
+        f"{'list':14} {'default us/row':>15} {'dump_json us/row':>17} "
+        f"{'model_construct us/row':>23} {'speedup':>8}"
+    )
+    for name, response_type, generate, build in cases:
+        raw = generate(args.rows)
+        default = timed(
+            lambda: default_path(response_type, build(raw, _validated)), args.repeat
+        )
+        fast = timed(lambda: fast_path(response_type, build(raw, _validated)), args.repeat)
+        constructed = timed(
+            lambda: fast_path(response_type, build(raw, _constructed)), args.repeat
+        )
+        print(
+            f"{name:14} {default / args.rows * 1e6:>15.1f} {fast / args.rows * 1e6:>17.1f} "
+            f"{constructed / args.rows * 1e6:>23.1f} {default / fast:>7.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
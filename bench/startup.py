@@ -0,0 +1,88 @@
+"""
+Worker cold-start benchmark.
+
+Every run starts a fresh interpreter, imports ``main`` and serves a first
+request through TestClient, like a new pod coming up:
+
+    python -m bench.startup --runs 10
+    python -m bench.startup --create-tables    # include create_all at startup
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+DEFAULT_DATABASE_URL = "sqlite:///bench.db"
+
+CHILD_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    client.get("/docs")
+    first_response = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (first_response - ready) * 1000,
+    "total_ms": (first_response - started) * 1000,
+}))
+"""
+
+
+def measure(runs: int, env: Dict[str, str]) -> Dict[str, Dict[str, float]]:
+    samples: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        # The timings are the last line, anything before is application output
+        result = json.loads(output.strip().splitlines()[-1])
+        for key, value in result.items():
+            samples.setdefault(key, []).append(value)
+    return {
+        key: {
+            "median": round(statistics.median(values), 1),
+            "min": round(min(values), 1),
+            "max": round(max(values), 1),
+        }
+        for key, values in samples.items()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure worker cold-start time")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--create-tables", action="store_true", help="run create_all at startup")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env.update(
+        DATABASE_URL=args.database_url,
+        DB_CREATE_TABLES=str(args.create_tables).lower(),
+        JOB_WORKER_IN_PROCESS="false",
+        LOG_LEVEL="ERROR",
+        PYTHONWARNINGS="ignore",
+    )
+    results = measure(args.runs, env)
+
+    print(f"{'phase':18} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for phase, r in results.items():
+        print(f"{phase:18} {r['median']:>10.1f} {r['min']:>10.1f} {r['max']:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Write throughput of registration intake, with and without the indexes
+dropped by the drop_redundant_indexes migration.
+
+A seeded database is copied twice; the "before" copy gets the redundant
+primary key and single-column schedule indexes back. Each intake inserts
+the user, student, personal document, health check document and course
+registration of an applicant, and every tenth intake also adds a schedule
+to the course. By default every intake is its own transaction, as in the
+API; --batch groups several per transaction:
+
+    python -m bench.writes --dir /tmp/writes --intakes 2000
+    python -m bench.writes --dir /tmp/writes --intakes 20000 --batch 500
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+MIGRATION_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "migrations",
+    "versions",
+    "b71f0d2c8e46_drop_redundant_indexes.py",
+)
+
+
+def redundant_indexes() -> List[tuple]:
+    """(name, table, columns) of the indexes dropped by the migration."""
+    spec = importlib.util.spec_from_file_location("drop_redundant_indexes", MIGRATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.REDUNDANT_INDEXES
+
+
+def copy_database(source_path: str, target_path: str) -> None:
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+def intake(conn, tables, course_ids: List, health_check_ids: Dict, n: int, rng) -> None:
+    now = datetime.now()
+    user_id, student_id = uuid.uuid4(), uuid.uuid4()
+    course_id = rng.choice(course_ids)
+    identity_number = f"9{n:011d}"
+    conn.execute(
+        tables["users"].insert(),
+        {
+            "id": user_id,
+            "user_name": identity_number,
+            "hashed_password": "x",
+            "phone_number": f"08{n:08d}",
+            "email": f"{identity_number}@intake.example.com",
+            "is_active": True,
+            "role": "user",
+            "created_at": now,
+        },
+    )
+    conn.execute(
+        tables["students"].insert(),
+        {"id": student_id, "user_id": user_id, "created_at": now},
+    )
+    conn.execute(
+        tables["personal_infor_documents"].insert(),
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "full_name": "Nguyễn An",
+            "identity_number": identity_number,
+            "created_at": now,
+            "updated_at": now,
+        },
+    )
+    conn.execute(
+        tables["health_check_documents"].insert(),
+        {
+            "id": uuid.uuid4(),
+            "student_id": student_id,
+            "health_check_id": health_check_ids[course_id],
+            "status": "registered",
+            "created_at": now,
+            "updated_at": now,
+        },
+    )
+    conn.execute(
+        tables["course_registrations"].insert(),
+        {
+            "id": uuid.uuid4(),
+            "student_id": student_id,
+            "course_id": course_id,
+            "created_at": now,
+            "updated_at": now,
+            "method": "online",
+            "status": "pending",
+        },
+    )
+    if n % 10 == 0:
+        start = now + timedelta(days=rng.randint(1, 90), hours=8)
+        conn.execute(
+            tables["schedules"].insert(),
+            {
+                "id": uuid.uuid4(),
+                "course_id": course_id,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=2)).isoformat(),
+                "location": "Sân tập A",
+                "type": "practice",
+                "max_students": 30,
+            },
+        )
+
+
+def measure(database_path: str, intakes: int, batch: int) -> Dict[str, float]:
+    from sqlalchemy import create_engine, select
+
+    from app.core.database import Base
+
+    tables = Base.metadata.tables
+    engine = create_engine(f"sqlite:///{database_path}")
+    rng = random.Random(42)
+    try:
+        with engine.connect() as conn:
+            health_check_ids = dict(
+                conn.execute(
+                    select(
+                        tables["health_check_schedules"].c.course_id,
+                        tables["health_check_schedules"].c.id,
+                    )
+                ).all()
+            )
+            course_ids = list(health_check_ids)
+            conn.commit()
+            started = time.perf_counter()
+            for first in range(0, intakes, batch):
+                with conn.begin():
+                    for n in range(first, min(first + batch, intakes)):
+                        intake(conn, tables, course_ids, health_check_ids, n, rng)
+            elapsed = time.perf_counter() - started
+    finally:
+        engine.dispose()
+    return {"seconds": elapsed, "intakes_per_second": intakes / elapsed}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure intake write throughput")
+    parser.add_argument("--dir", default="writes_bench")
+    parser.add_argument("--profile", default="small")
+    parser.add_argument("--intakes", type=int, default=2000)
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=1,
+        help="Intakes per transaction, above 1 the commit cost stops hiding index upkeep",
+    )
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dir, exist_ok=True)
+    seeded_path = os.path.abspath(os.path.join(args.dir, "seeded.db"))
+    if os.path.exists(seeded_path):
+        os.remove(seeded_path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{seeded_path}"
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+    import main as app_main  # noqa: F401  (imports every model)
+    from app.core.database import engine
+    from bench.seed import seed
+
+    seed(engine, args.profile)
+    engine.dispose()
+
+    results = {}
+    for label in ("before", "after"):
+        path = os.path.join(args.dir, f"{label}.db")
+        copy_database(seeded_path, path)
+        if label == "before":
+            with sqlite3.connect(path) as conn:
+                for name, table, columns in redundant_indexes():
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+                    )
+        results[label] = measure(path, args.intakes, args.batch)
+
+    print(f"{'schema':8} {'seconds':>9} {'intakes/s':>10}")
+    for label, result in results.items():
+        print(f"{label:8} {result['seconds']:9.2f} {result['intakes_per_second']:10.1f}")
+    gain = results["after"]["intakes_per_second"] / results["before"]["intakes_per_second"] - 1
+    print(f"\nthroughput change: {gain:+.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from app.api import (
+    archive,
     course_registration,
     payment_method,
     user,
@@ -14,16 +15,27 @@ from app.api import (
     health_check_document,
     personal_infor_document,
     schedule,
-    instructor
+    instructor,
+    metrics,
+    thumbnail,
 )
-from app.core.database import engine, Base
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.lifespan import lifespan
+from app.core.logging import RequestIdMiddleware, configure_logging
+from app.core.metrics import MetricsMiddleware
+from app.core.rate_limit import ConcurrencyLimitMiddleware, RateLimitMiddleware
+from app.core.replicas import ReadYourWritesMiddleware
+from app.core.thumbnails import ensure_thumbnail_dir
 from fastapi.middleware.cors import CORSMiddleware
+from app import tasks  # noqa: F401  (register job handlers)
 
-# Create all tables (for production, use migrations instead)
-Base.metadata.create_all(bind=engine)
+configure_logging()
 
-app = FastAPI(title="Driving License Management API", version="1.0.0")
+app = FastAPI(
+    title="Driving License Management API", version="1.0.0", lifespan=lifespan
+)
 
 # Include API routers
 app.include_router(user.router, prefix="/api/users", tags=["users"])
@@ -59,10 +71,29 @@ app.include_router(
     tags=["course_registration"],
 )
 app.include_router(schedule.router, prefix="/api/schedule", tags=["schedule"])
+app.include_router(archive.router, prefix="/api/archive", tags=["archive"])
 app.include_router(payment_method.router, prefix="/api/payment_method", tags=["payment_method"])
 app.include_router(instructor.router, prefix="/api/instructor", tags=["instructor"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+
+# Generated thumbnails, behind signed URLs
+ensure_thumbnail_dir()
+app.include_router(
+    thumbnail.router, prefix=settings.THUMBNAIL_URL_PREFIX, tags=["thumbnails"]
+)
 
 
+# Innermost first: admission control only holds back requests that run the
+# endpoint, replays skip it, and rate limiting rejects floods before any of
+# them touch the database. All three are inside CORS so browsers can read
+# their responses.
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(ConcurrencyLimitMiddleware)
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -70,20 +101,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition"],
+    expose_headers=[
+        "Content-Disposition",
+        "ETag",
+        "Idempotent-Replayed",
+        "Retry-After",
+        "X-Debug-Queries",
+        "X-Request-ID",
+    ],
 )
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
 
-
-@app.on_event("startup")
-async def startup_event():
-    # Initialize any startup events here
-    pass
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    # Cleanup tasks on shutdown
-    pass
+# Added last so they wrap every other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 
 if __name__ == "__main__":
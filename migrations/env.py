@@ -24,6 +24,7 @@ import app.models.health_check_schedule
 import app.models.absent_form
 import app.models.complaint
 import app.models.payment_method
+import app.models.job
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,68 @@
+"""add_foreign_key_indexes
+
+Revision ID: 3e9d6a0c4f18
+Revises: 8c41f2b7a9d5
+Create Date: 2026-10-19 15:21:44.310927
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e9d6a0c4f18"
+down_revision: Union[str, None] = "8c41f2b7a9d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns), as proposed by app.core.index_audit for the CRUD
+# lookups. course_registrations.course_id is served by the composite index
+# leading with it, exam_results.student_id likewise.
+INDEXES = [
+    ("ix_course_registrations_student_id", "course_registrations", ["student_id"]),
+    (
+        "ix_course_registrations_course_id_status",
+        "course_registrations",
+        ["course_id", "status"],
+    ),
+    (
+        "ix_course_registrations_status_method",
+        "course_registrations",
+        ["status", "method"],
+    ),
+    ("ix_personal_infor_documents_user_id", "personal_infor_documents", ["user_id"]),
+    (
+        "ix_personal_infor_documents_identity_number",
+        "personal_infor_documents",
+        ["identity_number"],
+    ),
+    ("ix_payments_course_registration_id", "payments", ["course_registration_id"]),
+    (
+        "ix_exam_results_student_id_exam_id",
+        "exam_results",
+        ["student_id", "exam_id"],
+    ),
+    ("ix_exam_results_exam_id", "exam_results", ["exam_id"]),
+    ("ix_exams_course_id", "exams", ["course_id"]),
+    ("ix_users_role", "users", ["role"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built without blocking writes to the tables, one index at a time
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,44 @@
+"""create_rate_limit_buckets_table
+
+Revision ID: 4c8a2e7f1b93
+Revises: 9d41f6a2c8e7
+Create Date: 2026-10-19 22:03:52.771904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4c8a2e7f1b93"
+down_revision: Union[str, None] = "9d41f6a2c8e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        op.f("ix_rate_limit_buckets_updated_at"),
+        "rate_limit_buckets",
+        ["updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_rate_limit_buckets_updated_at"), table_name="rate_limit_buckets"
+    )
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,35 @@
+"""license_status_expiration_index
+
+Revision ID: 7b5e0c3d8f21
+Revises: e6b2d9f4a713
+Create Date: 2026-10-19 20:02:31.148790
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b5e0c3d8f21"
+down_revision: Union[str, None] = "e6b2d9f4a713"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_licenses_status_expiration_date",
+            "licenses",
+            ["status", "expiration_date"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_licenses_status_expiration_date", table_name="licenses")
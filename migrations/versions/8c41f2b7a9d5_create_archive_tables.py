@@ -0,0 +1,154 @@
+"""create_archive_tables
+
+Revision ID: 8c41f2b7a9d5
+Revises: 5a7c1e9d3b20
+Create Date: 2026-10-19 13:02:17.508163
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41f2b7a9d5"
+down_revision: Union[str, None] = "5a7c1e9d3b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# On PostgreSQL the archive tables are partitioned by course start year, the
+# partitions of a year are created by the archive job before its first insert
+PARTITION_BY = {"postgresql_partition_by": "LIST (course_year)"}
+
+
+def _archive_columns():
+    return [
+        sa.Column("course_year", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("courses", sa.Column("archived_at", sa.DateTime(), nullable=True))
+
+    op.create_table(
+        "schedules_archive",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("course_id", sa.UUID(), nullable=True),
+        sa.Column("exam_id", sa.UUID(), nullable=True),
+        sa.Column("start_time", sa.String(), nullable=False),
+        sa.Column("end_time", sa.String(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("instructor_id", sa.UUID(), nullable=True),
+        sa.Column("max_students", sa.Integer(), nullable=False),
+        *_archive_columns(),
+        sa.PrimaryKeyConstraint("id", "course_year"),
+        **PARTITION_BY,
+    )
+    op.create_index(
+        "ix_schedules_archive_course_id", "schedules_archive", ["course_id"]
+    )
+
+    op.create_table(
+        "course_registrations_archive",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("student_id", sa.UUID(), nullable=True),
+        sa.Column("course_id", sa.UUID(), nullable=True),
+        sa.Column("created_at", sa.String(), nullable=False),
+        sa.Column("updated_at", sa.String(), nullable=False),
+        sa.Column("method", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("note", sa.String(), nullable=True),
+        *_archive_columns(),
+        sa.PrimaryKeyConstraint("id", "course_year"),
+        **PARTITION_BY,
+    )
+    op.create_index(
+        "ix_course_registrations_archive_student_id",
+        "course_registrations_archive",
+        ["student_id"],
+    )
+    op.create_index(
+        "ix_course_registrations_archive_course_id",
+        "course_registrations_archive",
+        ["course_id"],
+    )
+
+    op.create_table(
+        "payments_archive",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=True),
+        sa.Column("payment_method_id", sa.Integer(), nullable=True),
+        sa.Column("evidence", sa.String(), nullable=True),
+        sa.Column("course_registration_id", sa.UUID(), nullable=True),
+        sa.Column("created_at", sa.Date(), nullable=False),
+        sa.Column("updated_at", sa.Date(), nullable=True),
+        sa.Column("course_id", sa.UUID(), nullable=True),
+        *_archive_columns(),
+        sa.PrimaryKeyConstraint("id", "course_year"),
+        **PARTITION_BY,
+    )
+    op.create_index(
+        "ix_payments_archive_course_registration_id",
+        "payments_archive",
+        ["course_registration_id"],
+    )
+    op.create_index("ix_payments_archive_course_id", "payments_archive", ["course_id"])
+
+    op.create_table(
+        "exam_results_archive",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("exam_id", sa.UUID(), nullable=True),
+        sa.Column("student_id", sa.UUID(), nullable=True),
+        sa.Column("score", sa.Double(), nullable=False),
+        sa.Column("course_id", sa.UUID(), nullable=True),
+        *_archive_columns(),
+        sa.PrimaryKeyConstraint("id", "course_year"),
+        **PARTITION_BY,
+    )
+    op.create_index(
+        "ix_exam_results_archive_student_id", "exam_results_archive", ["student_id"]
+    )
+    op.create_index(
+        "ix_exam_results_archive_course_id", "exam_results_archive", ["course_id"]
+    )
+
+    op.create_table(
+        "health_check_documents_archive",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("student_id", sa.UUID(), nullable=False),
+        sa.Column("health_check_id", sa.UUID(), nullable=False),
+        sa.Column("document", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("course_id", sa.UUID(), nullable=True),
+        *_archive_columns(),
+        sa.PrimaryKeyConstraint("id", "course_year"),
+        **PARTITION_BY,
+    )
+    op.create_index(
+        "ix_health_check_documents_archive_student_id",
+        "health_check_documents_archive",
+        ["student_id"],
+    )
+    op.create_index(
+        "ix_health_check_documents_archive_course_id",
+        "health_check_documents_archive",
+        ["course_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping a partitioned table drops its partitions
+    op.drop_table("health_check_documents_archive")
+    op.drop_table("exam_results_archive")
+    op.drop_table("payments_archive")
+    op.drop_table("course_registrations_archive")
+    op.drop_table("schedules_archive")
+    op.drop_column("courses", "archived_at")
@@ -0,0 +1,51 @@
+"""health_check_status_transitions
+
+Revision ID: a9e4c7d2b158
+Revises: f2c4b8d61a37
+Create Date: 2026-10-19 18:41:06.318452
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9e4c7d2b158"
+down_revision: Union[str, None] = "f2c4b8d61a37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The check made every update of a past slot fail, including its status
+    # transitions; a future datetime is now only required on creation
+    op.drop_constraint(
+        "check_schedule_in_future",
+        "health_check_schedules",
+        type_="check",
+        if_exists=True,
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_health_check_schedules_status_scheduled_datetime",
+            "health_check_schedules",
+            ["status", "scheduled_datetime"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_health_check_schedules_status_scheduled_datetime",
+        table_name="health_check_schedules",
+    )
+    # NOT VALID: the slots that are past by now would fail the check
+    op.execute(
+        "ALTER TABLE health_check_schedules ADD CONSTRAINT check_schedule_in_future "
+        "CHECK (scheduled_datetime > CURRENT_TIMESTAMP) NOT VALID"
+    )
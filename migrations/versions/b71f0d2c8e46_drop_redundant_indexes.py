@@ -0,0 +1,91 @@
+"""drop_redundant_indexes
+
+Revision ID: b71f0d2c8e46
+Revises: 3e9d6a0c4f18
+Create Date: 2026-10-19 16:04:12.884519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b71f0d2c8e46"
+down_revision: Union[str, None] = "3e9d6a0c4f18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose models declared the primary key with index=True, adding an
+# ix_<table>_id index beside the primary key index
+PRIMARY_KEY_INDEXED_TABLES = [
+    "absent_forms",
+    "certifications",
+    "complaints",
+    "course_registrations",
+    "courses",
+    "exam_results",
+    "exams",
+    "health_check_documents",
+    "health_check_schedules",
+    "instructors",
+    "license_types",
+    "licenses",
+    "payment_methods",
+    "payments",
+    "personal_infor_documents",
+    "schedules",
+    "staffs",
+    "students",
+    "users",
+]
+
+# Single-column schedule indexes replaced by ix_schedules_type_start_time
+SCHEDULE_COLUMN_INDEXES = ["start_time", "end_time", "location", "type"]
+
+# (name, table, columns) of every index dropped by upgrade()
+REDUNDANT_INDEXES = [
+    (f"ix_{table}_id", table, ["id"]) for table in PRIMARY_KEY_INDEXED_TABLES
+] + [
+    (f"ix_schedules_{column}", "schedules", [column])
+    for column in SCHEDULE_COLUMN_INDEXES
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built and dropped without blocking the writes to the tables. Part of
+    # the schema predates the migrations, so an index may be missing
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_schedules_type_start_time",
+            "schedules",
+            ["type", "start_time"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        for name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(
+                name, table_name=table, if_exists=True, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+        op.drop_index(
+            "ix_schedules_type_start_time",
+            table_name="schedules",
+            postgresql_concurrently=True,
+        )
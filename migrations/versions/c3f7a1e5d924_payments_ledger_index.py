@@ -0,0 +1,35 @@
+"""payments_ledger_index
+
+Revision ID: c3f7a1e5d924
+Revises: a9e4c7d2b158
+Create Date: 2026-10-19 19:07:44.902163
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f7a1e5d924"
+down_revision: Union[str, None] = "a9e4c7d2b158"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_payments_created_at_id",
+            "payments",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_payments_created_at_id", table_name="payments")
@@ -0,0 +1,160 @@
+"""native_timestamp_columns
+
+Revision ID: d5a8e3f1c092
+Revises: b71f0d2c8e46
+Create Date: 2026-10-19 17:12:38.540216
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a8e3f1c092"
+down_revision: Union[str, None] = "b71f0d2c8e46"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows converted per committed batch
+BATCH_SIZE = 5000
+
+ISO_TIMESTAMP = 'YYYY-MM-DD"T"HH24:MI:SS.US'
+
+# (table, column, new type, nullable, to_char format of the old strings)
+CONVERSIONS = [
+    ("course_registrations", "created_at", "TIMESTAMP", False, ISO_TIMESTAMP),
+    ("course_registrations", "updated_at", "TIMESTAMP", False, ISO_TIMESTAMP),
+    ("course_registrations_archive", "created_at", "TIMESTAMP", False, ISO_TIMESTAMP),
+    ("course_registrations_archive", "updated_at", "TIMESTAMP", False, ISO_TIMESTAMP),
+    ("users", "created_at", "TIMESTAMP", False, ISO_TIMESTAMP),
+    ("personal_infor_documents", "date_of_birth", "DATE", True, "YYYY-MM-DD"),
+]
+
+# NOT VALID checks cannot be added to partitioned tables; the archive is only
+# written by the archive job, so it is scanned under the lock instead
+PARTITIONED_TABLES = {"course_registrations_archive"}
+
+
+def _converted(column: str, type_: str) -> str:
+    """The string value cast to the new type, NULL when it is not an ISO date."""
+    pattern = "^[0-9]{4}-[0-9]{2}-[0-9]{2}"
+    if type_ == "DATE":
+        return f"CASE WHEN {column} ~ '{pattern}$' THEN {column}::date END"
+    return f"CASE WHEN {column} ~ '{pattern}' THEN {column}::timestamp END"
+
+
+def _backfill(table: str, column: str, type_: str) -> None:
+    """
+    Fill the new column in batches of BATCH_SIZE rows, walking the primary
+    key so each batch is a short transaction holding only its row locks.
+    """
+    update = (
+        f"UPDATE {table} SET {column}_new = {_converted(column, type_)} "
+        f"WHERE id = ANY(:ids)"
+    )
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE {table} SET {column}_new = {_converted(column, type_)}")
+        return
+
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        ids = conn.execute(
+            sa.text(
+                f"SELECT id FROM {table} "
+                + ("WHERE id > :last_id " if last_id else "")
+                + "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).scalars().all()
+        if not ids:
+            break
+        conn.execute(sa.text(update), {"ids": ids})
+        last_id = ids[-1]
+
+
+def _check_converted(table: str, column: str) -> None:
+    """Abort before dropping anything if a value could not be converted."""
+    unconverted = f"{column}_new IS NULL AND {column} IS NOT NULL"
+    if op.get_context().as_sql:
+        op.execute(
+            f"DO $$ BEGIN IF EXISTS (SELECT 1 FROM {table} WHERE {unconverted}) THEN "
+            f"RAISE EXCEPTION '{table}.{column} has values that are not ISO dates'; "
+            f"END IF; END $$"
+        )
+        return
+
+    count = op.get_bind().execute(
+        sa.text(f"SELECT count(*) FROM {table} WHERE {unconverted}")
+    ).scalar()
+    if count:
+        raise RuntimeError(
+            f"{count} rows of {table}.{column} are not ISO dates, fix them and "
+            f"run the migration again"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # New columns are added nullable without a default, which does not
+    # rewrite the tables
+    for table, column, type_, _, _ in CONVERSIONS:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN {column}_new {type_}")
+
+    with op.get_context().autocommit_block():
+        for table, column, type_, _, _ in CONVERSIONS:
+            _backfill(table, column, type_)
+
+    # Swap in one short transaction. The tables are locked first, so no row
+    # is written between the catch-up of the rows written since the backfill
+    # and the drop of the old columns
+    for table in sorted({table for table, _, _, _, _ in CONVERSIONS}):
+        op.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+    for table, column, type_, _, _ in CONVERSIONS:
+        op.execute(
+            f"UPDATE {table} SET {column}_new = {_converted(column, type_)} "
+            f"WHERE {column}_new IS NULL AND {column} IS NOT NULL"
+        )
+        _check_converted(table, column)
+    for table, column, _, nullable, _ in CONVERSIONS:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        op.execute(f"ALTER TABLE {table} RENAME COLUMN {column}_new TO {column}")
+        if nullable:
+            continue
+        if table in PARTITIONED_TABLES:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        else:
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT ck_{table}_{column}_not_null "
+                f"CHECK ({column} IS NOT NULL) NOT VALID"
+            )
+
+    # Validating the check only takes a SHARE UPDATE EXCLUSIVE lock, SET NOT
+    # NULL then uses it instead of scanning the table under an exclusive lock
+    with op.get_context().autocommit_block():
+        for table, column, _, nullable, _ in CONVERSIONS:
+            if nullable or table in PARTITIONED_TABLES:
+                continue
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT ck_{table}_{column}_not_null")
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT ck_{table}_{column}_not_null")
+        op.create_index(
+            "ix_course_registrations_created_at",
+            "course_registrations",
+            ["created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_course_registrations_created_at", table_name="course_registrations")
+    for table, column, _, _, string_format in CONVERSIONS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR "
+            f"USING to_char({column}, '{string_format}')"
+        )
@@ -0,0 +1,129 @@
+"""license_uuid_keys_and_number_counters
+
+Revision ID: e6b2d9f4a713
+Revises: c3f7a1e5d924
+Create Date: 2026-10-19 19:34:12.660581
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b2d9f4a713"
+down_revision: Union[str, None] = "c3f7a1e5d924"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (column, referenced table, USING expression). The integer keys could not
+# reference the UUID primary keys of license_types and students, so there is
+# nothing to convert: the references are cleared and the ids regenerated.
+UUID_COLUMNS = [
+    ("id", None, "gen_random_uuid()"),
+    ("license_type_id", "license_types", "NULL"),
+    ("student_id", "students", "NULL"),
+]
+
+
+def _columns_to_convert():
+    """The UUID_COLUMNS of licenses that are not UUID yet, all of them offline."""
+    if op.get_context().as_sql:
+        return UUID_COLUMNS
+    types = {
+        column["name"]: column["type"]
+        for column in sa.inspect(op.get_bind()).get_columns("licenses")
+    }
+    return [
+        entry
+        for entry in UUID_COLUMNS
+        if not isinstance(types.get(entry[0]), (postgresql.UUID, sa.Uuid))
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conversions = _columns_to_convert()
+    if conversions:
+        if op.get_context().as_sql:
+            foreign_keys = [
+                "licenses_license_type_id_fkey",
+                "licenses_student_id_fkey",
+            ]
+        else:
+            foreign_keys = [
+                fk["name"]
+                for fk in sa.inspect(op.get_bind()).get_foreign_keys("licenses")
+                if fk.get("name")
+            ]
+        for name in foreign_keys:
+            op.drop_constraint(name, "licenses", type_="foreignkey", if_exists=True)
+
+        for column, _, using in conversions:
+            op.execute(f"ALTER TABLE licenses ALTER COLUMN {column} DROP DEFAULT")
+            op.execute(
+                f"ALTER TABLE licenses ALTER COLUMN {column} TYPE UUID USING {using}"
+            )
+        for column, referenced_table, _ in UUID_COLUMNS:
+            if referenced_table:
+                op.create_foreign_key(
+                    f"licenses_{column}_fkey",
+                    "licenses",
+                    referenced_table,
+                    [column],
+                    ["id"],
+                )
+
+    op.create_table(
+        "license_number_counters",
+        sa.Column("prefix", sa.String(), nullable=False),
+        sa.Column("last_value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("prefix"),
+    )
+    # Continue after the numbers already issued in the current format
+    op.execute(
+        """
+        INSERT INTO license_number_counters (prefix, last_value)
+        SELECT substr(license_number, 1, length(license_number) - 6),
+               max(CAST(right(license_number, 6) AS BIGINT))
+        FROM licenses
+        WHERE license_number ~ '^[A-Z]+[0-9]{4}[0-9]{6}$'
+        GROUP BY 1
+        """
+    )
+
+    # Built without blocking the writes to licenses
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_licenses_license_type_id",
+            "licenses",
+            ["license_type_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_licenses_student_id_license_type_id",
+            "licenses",
+            ["student_id", "license_type_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_licenses_student_id_license_type_id",
+            table_name="licenses",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_licenses_license_type_id", table_name="licenses", postgresql_concurrently=True
+        )
+    op.drop_table("license_number_counters")
+    # The UUID keys are kept: the integer ones never matched the referenced
+    # tables
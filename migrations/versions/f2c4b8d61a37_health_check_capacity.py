@@ -0,0 +1,104 @@
+"""health_check_capacity
+
+Revision ID: f2c4b8d61a37
+Revises: d5a8e3f1c092
+Create Date: 2026-10-19 18:03:51.207734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c4b8d61a37"
+down_revision: Union[str, None] = "d5a8e3f1c092"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Capacity given to the existing slots, see HEALTH_CHECK_DEFAULT_CAPACITY
+DEFAULT_CAPACITY = 50
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "health_check_schedules",
+        sa.Column(
+            "capacity",
+            sa.Integer(),
+            nullable=False,
+            server_default=str(DEFAULT_CAPACITY),
+        ),
+    )
+    op.add_column(
+        "health_check_schedules",
+        sa.Column("booked_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.alter_column("health_check_schedules", "capacity", server_default=None)
+
+    # Count the students already booked on every slot, past ones included:
+    # a slot rescheduled into the future, or released when a booking moves
+    # to another slot, must not count from 0
+    op.execute(
+        """
+        UPDATE health_check_schedules
+        SET booked_count = booked.count
+        FROM (
+            SELECT health_check_id, count(*) AS count
+            FROM health_check_documents
+            GROUP BY health_check_id
+        ) AS booked
+        WHERE health_check_schedules.id = booked.health_check_id
+        """
+    )
+    # Slots already booked beyond the default keep their bookings
+    op.execute(
+        "UPDATE health_check_schedules SET capacity = booked_count "
+        "WHERE booked_count > capacity"
+    )
+    op.create_check_constraint(
+        "check_booked_within_capacity",
+        "health_check_schedules",
+        "booked_count >= 0 AND booked_count <= capacity",
+    )
+
+    # Built without blocking the bookings
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_health_check_schedules_course_id_scheduled_datetime",
+            "health_check_schedules",
+            ["course_id", "scheduled_datetime"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_health_check_schedules_course_id",
+            table_name="health_check_schedules",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_health_check_schedules_course_id",
+            "health_check_schedules",
+            ["course_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_health_check_schedules_course_id_scheduled_datetime",
+            table_name="health_check_schedules",
+            postgresql_concurrently=True,
+        )
+    op.drop_constraint(
+        "check_booked_within_capacity", "health_check_schedules", type_="check"
+    )
+    op.drop_column("health_check_schedules", "booked_count")
+    op.drop_column("health_check_schedules", "capacity")
@@ -0,0 +1,9 @@
+"""Standalone job worker: python worker.py"""
+
+from app.core.jobs import Worker
+import app.models  # noqa: F401  (register all mappers)
+import app.tasks  # noqa: F401  (register all job handlers)
+
+
+if __name__ == "__main__":
+    Worker().run_forever()